@@ -188,6 +188,11 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 # Use manifest storage only on Render/production. Local development should not depend on collectstatic manifest.
 STORAGES = {
     'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    # Patient progress report PDFs: private, outside MEDIA_ROOT, served only through login-checked views.
+    'reports': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        'OPTIONS': {'location': os.environ.get('MINDMEND_REPORTS_ROOT', str(BASE_DIR / 'private' / 'reports'))},
+    },
     'staticfiles': {
         'BACKEND': (
             'whitenoise.storage.CompressedManifestStaticFilesStorage'
@@ -220,6 +225,13 @@ MINDMEND_LLM_PROVIDER = os.environ.get('MINDMEND_LLM_PROVIDER', '')
 MINDMEND_GEMINI_API_KEY = os.environ.get('MINDMEND_GEMINI_API_KEY', '') or os.environ.get('GEMINI_API_KEY', '')
 MINDMEND_OPENAI_API_KEY = os.environ.get('MINDMEND_OPENAI_API_KEY', '') or os.environ.get('OPENAI_API_KEY', '')
 
+# Progress report PDFs are rendered by `python manage.py render_reports`.
+# Set to true to render in the request instead (handy for local development without the worker).
+MINDMEND_RENDER_REPORTS_INLINE = os.environ.get('MINDMEND_RENDER_REPORTS_INLINE', 'False').lower() in ('true', '1', 'yes')
+
+# Razorpay refunds are delivered from the outbox by `python manage.py run_outbox`.
+# Set to true to also try each refund right after its booking change commits (local development).
+MINDMEND_OUTBOX_INLINE = os.environ.get('MINDMEND_OUTBOX_INLINE', 'False').lower() in ('true', '1', 'yes')
 
 # Google Form survey integration
 MINDMEND_GOOGLE_FORM_URL = os.environ.get('MINDMEND_GOOGLE_FORM_URL', 'https://forms.gle/BeJXSgCqb4pCKtK69')
@@ -231,6 +243,11 @@ MINDMEND_GOOGLE_SERVICE_ACCOUNT_JSON = os.environ.get('MINDMEND_GOOGLE_SERVICE_A
 
 # Optional public CSV fallback (less secure; keep empty if using private API)
 MINDMEND_GOOGLE_FORM_RESPONSES_CSV_URL = os.environ.get('MINDMEND_GOOGLE_FORM_RESPONSES_CSV_URL', 'https://docs.google.com/spreadsheets/d/1QfZ01IA4to-E_GHrlZZ35BVzOHFvlJfafWFlbuhGgl8/export?format=csv')
+# Day/month order of the form's Timestamp column ('MDY' for US-locale sheets, 'DMY' for e.g. en-IN).
+MINDMEND_SURVEY_DATE_ORDER = os.environ.get('MINDMEND_SURVEY_DATE_ORDER', 'MDY').upper()
+
+# Key for the pseudonymous user ids in analytics exports (defaults to one derived from SECRET_KEY).
+MINDMEND_EXPORT_PSEUDONYM_KEY = os.environ.get('MINDMEND_EXPORT_PSEUDONYM_KEY', '')
 
 
 # ── Razorpay Payment Gateway ────────────────────────────────────────────────
@@ -239,6 +256,8 @@ MINDMEND_GOOGLE_FORM_RESPONSES_CSV_URL = os.environ.get('MINDMEND_GOOGLE_FORM_RE
 RAZORPAY_KEY_ID     = os.environ.get('RAZORPAY_KEY_ID',     'rzp_test_REPLACE_ME')
 RAZORPAY_KEY_SECRET = os.environ.get('RAZORPAY_KEY_SECRET', 'REPLACE_ME_SECRET')
 RAZORPAY_WEBHOOK_SECRET = os.environ.get('RAZORPAY_WEBHOOK_SECRET', '')
+# Override the API host, e.g. http://127.0.0.1:8765 for `python manage.py fake_razorpay`.
+RAZORPAY_API_BASE_URL = os.environ.get('RAZORPAY_API_BASE_URL', '')
 
 # ── Field-level Encryption (Fernet / AES-128-CBC + HMAC-SHA256) ─────────────
 # Store a URL-safe base64-encoded 32-byte key in your .env:
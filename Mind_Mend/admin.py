@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     Counsellor, CounsellorBooking, CounsellorChatMessage, CounsellorNotification, CounsellorReview,
-    ContactMessage, MoodEntry, ForumPost, ForumReply, AssessmentResult, ChatMessage, UserAccessLocation
+    ContactMessage, MoodEntry, ForumPost, ForumReply, AssessmentResult, ChatMessage, UserAccessLocation, OutboxMessage
 )
 
 
@@ -68,3 +68,10 @@ class ContactMessageAdmin(admin.ModelAdmin):
     list_display = ['name', 'email', 'subject', 'created_at']
     search_fields = ['name', 'email', 'subject', 'message']
 
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ['key', 'kind', 'status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+    list_filter = ['kind', 'status', 'created_at']
+    search_fields = ['key']
@@ -1,7 +1,7 @@
 """REST API views for the MindMend Android app."""
 import json
 from django.contrib.auth import authenticate
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, F
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -12,7 +12,7 @@ from django.views.decorators.cache import cache_page
 from .models import (
     Counsellor, CounsellorBooking, CounsellorChatMessage,
     CounsellorReview, MoodEntry, ForumPost, ForumReply,
-    AssessmentResult, ContactMessage, ChatMessage, UserMemory,
+    AssessmentResult, LatestAssessment, ContactMessage, ChatMessage, UserMemory,
 )
 from .serializers import (
     RegisterSerializer, UserSerializer,
@@ -20,13 +20,10 @@ from .serializers import (
     ChatMessageSerializer, ReviewSerializer,
     MoodEntrySerializer,
     ForumPostSerializer, ForumPostCreateSerializer, ForumReplySerializer,
-    AssessmentResultSerializer, AssessmentSubmitSerializer,
+    AssessmentResultSerializer, AssessmentSubmitSerializer, LatestAssessmentSerializer,
     ContactMessageSerializer,
 )
-from .assessment_data import (
-    PHQ9_QUESTIONS, GAD7_QUESTIONS, PSS_QUESTIONS,
-    get_phq9_result, get_gad7_result, get_pss_result, PSS_REVERSE_ITEMS,
-)
+from .assessment_data import score
 from .services import (
     get_chat_response, get_session_id, detect_emotion, 
     detect_context_label, extract_topics, extract_activities, 
@@ -87,6 +84,8 @@ def api_dashboard(request):
 
     # Latest assessment scores
     assessments = AssessmentResult.objects.filter(user=user).order_by('-created_at')[:5]
+    # Latest score per assessment type, with the previous score for trend arrows
+    latest = sorted(LatestAssessment.for_user(user.id).values(), key=lambda r: r.created_at, reverse=True)
 
     # Upcoming appointment
     from django.utils import timezone
@@ -113,6 +112,7 @@ def api_dashboard(request):
         'mental_health_score': score,
         'mood_data': mood_data,
         'assessments': AssessmentResultSerializer(assessments, many=True).data,
+        'latest_assessments': LatestAssessmentSerializer(latest, many=True).data,
         'upcoming_appointment': upcoming_data,
     })
 
@@ -125,9 +125,7 @@ def api_dashboard(request):
 @permission_classes([AllowAny])
 @cache_page(60 * 15)  # Cache for 15 minutes
 def api_counsellors(request):
-    qs = Counsellor.objects.filter(is_active=True).annotate(
-        avg_rating=Avg('counsellorbooking__counsellorreview__rating')
-    )
+    qs = Counsellor.objects.filter(is_active=True).annotate(avg_rating=F('stats__avg_rating'))
     return Response(CounsellorSerializer(qs, many=True).data)
 
 
@@ -277,19 +275,10 @@ def api_assessment_submit(request):
     atype = serializer.validated_data['assessment_type']
     answers = serializer.validated_data['answers']
 
-    if atype == 'phq9':
-        total = sum(answers.get(f'q{i}', 0) for i in range(len(PHQ9_QUESTIONS)))
-        result_level = get_phq9_result(total)
-        max_score = 27
-    elif atype == 'gad7':
-        total = sum(answers.get(f'q{i}', 0) for i in range(len(GAD7_QUESTIONS)))
-        result_level = get_gad7_result(total)
-        max_score = 21
-    else:  # pss
-        raw = [answers.get(f'q{i}', 0) for i in range(len(PSS_QUESTIONS))]
-        result_level = get_pss_result(raw)
-        total = sum((3 - a) if (i + 1) in PSS_REVERSE_ITEMS else a for i, a in enumerate(raw))
-        max_score = 30
+    try:
+        total, result_level, max_score = score(atype, answers)
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=400)
 
     result = AssessmentResult.objects.create(
         user=request.user,
@@ -1,4 +1,8 @@
 """Assessment questionnaires: PHQ-9, GAD-7, PSS-10"""
+from bisect import bisect_right
+from collections import namedtuple
+
+import numpy as np
 
 PHQ9_QUESTIONS = [
     "Little interest or pleasure in doing things",
@@ -53,31 +57,123 @@ PSS_QUESTIONS = [
 PSS_REVERSE_ITEMS = [4, 5, 7, 8]  # 1-indexed for clarity, convert to 0-index in code
 
 
+PSS_SCORING = {
+    (0, 10): "Low stress",
+    (11, 20): "Moderate stress",
+    (21, 30): "High stress",
+}
+
+
+# ─── Scoring engine ─────────────────────────────────────────────────────────
+
+Score = namedtuple('Score', ['total', 'level', 'max_score'])
+
+
+class Instrument:
+    """Declarative scoring rules for one questionnaire.
+
+    Per-item points and the level of every reachable total are precomputed once,
+    so scoring an answer sheet is a few list lookups.
+    """
+
+    def __init__(self, key, name, questions, bands, scale_max=3, reverse_items=()):
+        self.key = key
+        self.name = name
+        self.questions = questions
+        self.scale_max = scale_max
+        self.reverse_items = frozenset(reverse_items)  # 1-indexed, scored as scale_max - answer
+        self.fields = tuple(f'q{i}' for i in range(len(questions)))
+        self.max_score = len(questions) * scale_max
+
+        self._bands = sorted(bands.items())
+        self._lows = [low for (low, _), _ in self._bands]
+        self.item_points = tuple(
+            tuple(scale_max - a if i + 1 in self.reverse_items else a for a in range(scale_max + 1))
+            for i in range(len(questions))
+        )
+        self.levels = tuple(self._band_label(total) for total in range(self.max_score + 1))
+        self.reverse_mask = np.array([i + 1 in self.reverse_items for i in range(len(questions))])
+
+    def _band_label(self, total):
+        i = bisect_right(self._lows, total) - 1
+        if i >= 0 and total <= self._bands[i][0][1]:
+            return self._bands[i][1]
+        return "Unknown"
+
+    def level(self, total):
+        if 0 <= total <= self.max_score:
+            return self.levels[total]
+        return self._band_label(total)
+
+    def raw_answers(self, answers):
+        """Answers as a list in item order; -1 marks a missing or invalid answer."""
+        if isinstance(answers, dict):
+            values = [answers.get(field) for field in self.fields]
+        else:
+            values = list(answers)
+            if len(values) != len(self.fields):
+                return [-1] * len(self.fields)
+        return [
+            v if isinstance(v, int) and not isinstance(v, bool) and 0 <= v <= self.scale_max else -1
+            for v in values
+        ]
+
+
+INSTRUMENTS = {
+    'phq9': Instrument('phq9', 'PHQ-9', PHQ9_QUESTIONS, PHQ9_SCORING),
+    'gad7': Instrument('gad7', 'GAD-7', GAD7_QUESTIONS, GAD7_SCORING),
+    'pss': Instrument('pss', 'PSS-10', PSS_QUESTIONS, PSS_SCORING, reverse_items=PSS_REVERSE_ITEMS),
+}
+
+
+def get_instrument(instrument):
+    if isinstance(instrument, Instrument):
+        return instrument
+    try:
+        return INSTRUMENTS[instrument]
+    except KeyError:
+        raise ValueError(f"Unknown assessment: {instrument}") from None
+
+
+def score(instrument, answers):
+    """Score one answer sheet (a {'q0': ...} dict or a list in item order).
+
+    Raises ValueError if an answer is missing or outside 0..scale_max.
+    """
+    instrument = get_instrument(instrument)
+    raw = instrument.raw_answers(answers)
+    invalid = [field for field, value in zip(instrument.fields, raw) if value < 0]
+    if invalid:
+        raise ValueError(f"{instrument.name}: missing or invalid answers for {', '.join(invalid)}")
+    total = sum(points[value] for points, value in zip(instrument.item_points, raw))
+    return Score(total, instrument.levels[total], instrument.max_score)
+
+
+def score_many(instrument, answer_sheets):
+    """Score many answer sheets at once.
+
+    Returns (totals, levels): an int array with -1 for sheets that fail validation,
+    and a matching list of level labels (None for invalid sheets).
+    """
+    instrument = get_instrument(instrument)
+    matrix = np.array([instrument.raw_answers(a) for a in answer_sheets], dtype=np.int64)
+    if matrix.size == 0:
+        return np.zeros(0, dtype=np.int64), []
+    valid = (matrix >= 0).all(axis=1)
+    points = np.where(instrument.reverse_mask, instrument.scale_max - matrix, matrix)
+    totals = np.where(valid, points.sum(axis=1), -1)
+    levels = [instrument.levels[t] if t >= 0 else None for t in totals.tolist()]
+    return totals, levels
+
+
 def get_phq9_result(score):
-    for (low, high), label in PHQ9_SCORING.items():
-        if low <= score <= high:
-            return label
-    return "Unknown"
+    return INSTRUMENTS['phq9'].level(score)
 
 
 def get_gad7_result(score):
-    for (low, high), label in GAD7_SCORING.items():
-        if low <= score <= high:
-            return label
-    return "Unknown"
+    return INSTRUMENTS['gad7'].level(score)
 
 
 def get_pss_result(answers):
     """PSS-10: items 4,5,7,8 are reverse scored (3-x). Total 0-30."""
-    total = 0
-    for i, ans in enumerate(answers):
-        if (i + 1) in PSS_REVERSE_ITEMS:
-            total += (3 - ans)
-        else:
-            total += ans
-    if total <= 10:
-        return "Low stress"
-    elif total <= 20:
-        return "Moderate stress"
-    else:
-        return "High stress"
+    return score('pss', answers).level
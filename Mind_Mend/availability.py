@@ -0,0 +1,197 @@
+"""
+MindMend slot availability.
+Each counsellor-day is a bitmap over the counsellor's 30-minute slot grid: bit k is the
+slot starting k * 30 minutes after available_time_start. Working days, booked slots and
+already-started slots are separate masks combined with bit operations. The booked mask
+(bookings plus live checkout holds) is cached per counsellor-day under the day's
+SlotVersion, which every booking or hold write on that day bumps, so no worker can serve
+a stale mask.
+"""
+from collections import defaultdict, namedtuple
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import CounsellorBooking, SlotHold, SlotVersion
+
+SLOT_MINUTES = 30
+SLOT_CACHE_TIMEOUT = 60 * 60 * 24
+WEEKDAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+_FULL_TO_SHORT = {
+    'monday': 'mon', 'tuesday': 'tue', 'wednesday': 'wed',
+    'thursday': 'thu', 'friday': 'fri', 'saturday': 'sat', 'sunday': 'sun',
+}
+
+
+def available_weekdays(available_days):
+    """Weekday numbers (Mon=0) from free text such as 'Mon, Wed/Friday'."""
+    tokens = (available_days or '').replace('/', ',').replace(' ', ',').split(',')
+    short = {_FULL_TO_SHORT.get(t.strip().lower(), t.strip().lower()[:3]) for t in tokens if t.strip()}
+    return frozenset(i for i, name in enumerate(WEEKDAYS) if name in short)
+
+
+def _minute(value):
+    return value.hour * 60 + value.minute
+
+
+def slot_grid(counsellor):
+    """(first slot minute of day, number of slots) for the counsellor's working hours."""
+    start = _minute(counsellor.available_time_start)
+    end = _minute(counsellor.available_time_end)
+    return start, max(0, (end - start) // SLOT_MINUTES)
+
+
+def _span(lo, hi):
+    """Mask with bits lo..hi-1 set."""
+    return ((1 << (hi - lo)) - 1) << lo if hi > lo else 0
+
+
+def booking_bits(start, n_slots, minute):
+    """Grid slots overlapping a 30-minute session that starts at `minute`."""
+    # Slot k overlaps when |start + 30k - minute| < 30.
+    lo = (minute - SLOT_MINUTES - start) // SLOT_MINUTES + 1
+    hi = -((start - minute - SLOT_MINUTES) // SLOT_MINUTES)
+    return _span(max(lo, 0), min(hi, n_slots))
+
+
+def booked_mask(counsellor, day, now=None):
+    """Slots taken by bookings that still hold them and by live checkout holds, from cache when possible."""
+    now = now or timezone.now()
+    start, n_slots = slot_grid(counsellor)
+    key = f'slot_bitmap:{counsellor.id}:{day}:{SlotVersion.current(counsellor.id, day)}'
+    cached = cache.get(key)
+    if cached is None or cached[0] != (start, n_slots):
+        fixed, holds = 0, []
+        rows = CounsellorBooking.objects.filter(counsellor=counsellor, date=day).exclude(status='cancelled')
+        for time_slot, status, due in rows.values_list('time_slot', 'status', 'next_transition_at'):
+            bits = booking_bits(start, n_slots, _minute(time_slot))
+            if status == 'pending' and due is not None:
+                holds.append((bits, due))  # unpaid: frees the slot at `due`, even before the worker runs
+            else:
+                fixed |= bits
+        for time_slot, due in SlotHold.objects.filter(counsellor=counsellor, date=day).values_list('time_slot', 'expires_at'):
+            holds.append((booking_bits(start, n_slots, _minute(time_slot)), due))
+        cached = ((start, n_slots), fixed, holds)
+        cache.set(key, cached, SLOT_CACHE_TIMEOUT)
+    _, mask, holds = cached
+    for bits, due in holds:
+        if now < due:
+            mask |= bits
+    return mask
+
+
+def past_mask(start, n_slots, day, now=None):
+    """Slots that have already started (all of them for past days)."""
+    local_now = timezone.localtime(now or timezone.now())
+    if day < local_now.date():
+        return _span(0, n_slots)
+    if day > local_now.date():
+        return 0
+    started = -((start - _minute(local_now)) // SLOT_MINUTES)  # slots with start minute < now
+    return _span(0, min(max(started, 0), n_slots))
+
+
+class DayAvailability(namedtuple('DayAvailability', ['day', 'start', 'n_slots', 'working', 'booked', 'past'])):
+    """Slot masks for one counsellor-day; `free` is what can still be booked."""
+
+    @property
+    def grid(self):
+        return _span(0, self.n_slots)
+
+    @property
+    def free(self):
+        return self.working & ~self.booked & ~self.past
+
+    @property
+    def blocked(self):
+        """Grid slots that are booked or already started, regardless of working days."""
+        return self.grid & (self.booked | self.past)
+
+    def slot_time(self, k):
+        minute = self.start + k * SLOT_MINUTES
+        return time(minute // 60, minute % 60)
+
+    def slot_index(self, value):
+        offset = _minute(value) - self.start
+        if offset < 0 or offset % SLOT_MINUTES:
+            return None
+        k = offset // SLOT_MINUTES
+        return k if k < self.n_slots else None
+
+    def is_free(self, value):
+        k = self.slot_index(value)
+        return k is not None and bool(self.free >> k & 1)
+
+    def next_free(self, after=None):
+        """Earliest free slot starting at or after `after` (a time), or None."""
+        mask = self.free
+        if after is not None:
+            mask &= ~_span(0, -((self.start - _minute(after)) // SLOT_MINUTES))
+        if not mask:
+            return None
+        return self.slot_time((mask & -mask).bit_length() - 1)
+
+    def slots(self, mask):
+        """[(start, end)] times for every bit set in mask."""
+        out = []
+        while mask:
+            k = (mask & -mask).bit_length() - 1
+            mask &= mask - 1
+            begin = self.slot_time(k)
+            out.append((begin, (datetime.combine(self.day, begin) + timedelta(minutes=SLOT_MINUTES)).time()))
+        return out
+
+
+def day_availability(counsellor, day, now=None):
+    now = now or timezone.now()
+    start, n_slots = slot_grid(counsellor)
+    working = _span(0, n_slots) if day.weekday() in available_weekdays(counsellor.available_days) else 0
+    return DayAvailability(
+        day, start, n_slots, working,
+        booked_mask(counsellor, day, now), past_mask(start, n_slots, day, now),
+    )
+
+
+def next_free_slot(counsellor, after=None, days=14):
+    """Aware datetime of the counsellor's next bookable slot within `days`, or None."""
+    after = timezone.localtime(after or timezone.now())
+    for offset in range(days):
+        day = after.date() + timedelta(days=offset)
+        slot = day_availability(counsellor, day, after).next_free(after.time() if offset == 0 else None)
+        if slot is not None:
+            return timezone.make_aware(datetime.combine(day, slot))
+    return None
+
+
+def range_availability(counsellors, start_day, days, now=None):
+    """{counsellor id: [DayAvailability for each day]} over a date range, from one bookings and one holds query."""
+    now = now or timezone.now()
+    day_list = [start_day + timedelta(days=i) for i in range(days)]
+    grids = {c.id: slot_grid(c) for c in counsellors}
+    booked = defaultdict(int)
+    rows = CounsellorBooking.objects.filter(
+        counsellor_id__in=grids, date__range=(day_list[0], day_list[-1]),
+    ).holding_slot(now).values_list('counsellor_id', 'date', 'time_slot')
+    for counsellor_id, day, time_slot in rows:
+        start, n_slots = grids[counsellor_id]
+        booked[counsellor_id, day] |= booking_bits(start, n_slots, _minute(time_slot))
+    held = SlotHold.objects.filter(
+        counsellor_id__in=grids, date__range=(day_list[0], day_list[-1]), expires_at__gt=now,
+    ).values_list('counsellor_id', 'date', 'time_slot')
+    for counsellor_id, day, time_slot in held:
+        start, n_slots = grids[counsellor_id]
+        booked[counsellor_id, day] |= booking_bits(start, n_slots, _minute(time_slot))
+
+    result = {}
+    for c in counsellors:
+        start, n_slots = grids[c.id]
+        weekdays = available_weekdays(c.available_days)
+        result[c.id] = [
+            DayAvailability(
+                day, start, n_slots, _span(0, n_slots) if day.weekday() in weekdays else 0,
+                booked[c.id, day], past_mask(start, n_slots, day, now),
+            )
+            for day in day_list
+        ]
+    return result
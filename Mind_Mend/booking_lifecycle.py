@@ -0,0 +1,95 @@
+"""
+MindMend booking lifecycle scheduler.
+Every open booking carries next_transition_at, the time its next automatic state change
+is due: unpaid 'pending' holds expire and free their slot, and 'confirmed' sessions
+complete 24 hours after their start. The scheduler drains that due-queue oldest first
+in bulk batches, so request handlers never sweep bookings themselves.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Min
+from django.db.models.functions import Round
+from django.utils import timezone
+
+from .models import CounsellorBooking, WellnessVersion
+
+LIFECYCLE_BATCH_SIZE = 500
+COUNSELLOR_SHARE = Decimal('0.90')  # counsellor earnings: 90% of the fee net of the platform fee
+
+
+def _due(status, now, batch_size):
+    return list(
+        CounsellorBooking.objects.filter(status=status, next_transition_at__lte=now)
+        .order_by('next_transition_at').values_list('id', 'user_id', 'counsellor_id')[:batch_size]
+    )
+
+
+def expire_pending_holds(now=None, batch_size=LIFECYCLE_BATCH_SIZE):
+    """Delete unpaid bookings whose 15-minute hold has run out; returns how many."""
+    now = now or timezone.now()
+    expired = 0
+    while True:
+        due = _due('pending', now, batch_size)
+        if not due:
+            return expired
+        ids = [pk for pk, _, _ in due]
+        # Re-check the status so a payment confirmed meanwhile is never discarded.
+        expired += CounsellorBooking.objects.filter(
+            id__in=ids, status='pending', next_transition_at__lte=now,
+        ).delete()[1].get(CounsellorBooking._meta.label, 0)
+        if len(due) < batch_size:
+            return expired
+
+
+def complete_past_sessions(now=None, batch_size=LIFECYCLE_BATCH_SIZE):
+    """Mark confirmed sessions completed once they are a day past their start; returns how many."""
+    from .counsellor_stats import rebuild_stats
+    from .financials import event_day, record_completions
+    now = now or timezone.now()
+    completed = 0
+    while True:
+        due = _due('confirmed', now, batch_size)
+        if not due:
+            return completed
+        with transaction.atomic():
+            updated = CounsellorBooking.objects.filter(
+                id__in=[pk for pk, _, _ in due], status='confirmed', next_transition_at__lte=now,
+            ).update(
+                status='completed',
+                completed_at=now,
+                counsellor_earnings=Round((F('total_fee') - F('platform_fee')) * COUNSELLOR_SHARE, 2),
+                next_transition_at=None,
+                updated_at=now,
+            )
+            # The bulk UPDATE skips post_save, so invalidate cached dashboards and roll up the sessions directly.
+            WellnessVersion.bump_many(user_id for _, user_id, _ in due)
+            rebuild_stats(counsellor_id for _, _, counsellor_id in due)
+            record_completions(
+                CounsellorBooking.objects.filter(id__in=[pk for pk, _, _ in due], status='completed', completed_at=now),
+                event_day(now),
+            )
+        completed += updated
+        if len(due) < batch_size:
+            return completed
+
+
+def process_due_transitions(now=None, batch_size=LIFECYCLE_BATCH_SIZE):
+    """Apply every transition that is due; returns (expired holds, completed sessions)."""
+    now = now or timezone.now()
+    return expire_pending_holds(now, batch_size), complete_past_sessions(now, batch_size)
+
+
+def next_transition_due():
+    """When the earliest queued transition is due, or None if nothing is queued."""
+    return CounsellorBooking.objects.filter(
+        status__in=['pending', 'confirmed'],
+    ).aggregate(due=Min('next_transition_at'))['due']
+
+
+def release_expired_hold(counsellor_id, date, time_slot, now=None):
+    """Free one slot whose unpaid hold has lapsed before the scheduler got to it."""
+    CounsellorBooking.objects.filter(
+        counsellor_id=counsellor_id, date=date, time_slot=time_slot,
+        status='pending', next_transition_at__lte=now or timezone.now(),
+    ).delete()
@@ -0,0 +1,283 @@
+"""
+MindMend cohort outcomes.
+Measures how PHQ-9, GAD-7 and mood scores move around completed counselling sessions,
+how long patients take to reach a clinically meaningful improvement, and how long they
+stay engaged afterwards, grouped by counsellor, specialization and session type.
+Event streams are loaded once as (user, minute)-sorted NumPy timelines and every
+session window is resolved with searchsorted instead of per-row queries.
+"""
+from datetime import datetime
+
+import numpy as np
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import AssessmentResult, CounsellorBooking, MoodEntry
+
+SCORE_METRICS = ('phq9', 'gad7')
+# Minimal clinically important decrease in score.
+IMPROVEMENT_THRESHOLDS = {'phq9': 5, 'gad7': 4}
+PRE_WINDOW_DAYS = 30
+POST_WINDOW_DAYS = 90
+MOOD_PRE_DAYS = 14
+MOOD_POST_DAYS = 30
+RETENTION_WEEKS = (0, 1, 2, 4, 8, 12)
+GROUPINGS = {
+    'counsellor': 'Counsellor',
+    'specialization': 'Specialization',
+    'session_type': 'Session type',
+}
+COHORT_CACHE_TIMEOUT = 60 * 60 * 24
+
+_EPOCH = datetime(2000, 1, 1)
+_DAY = 24 * 60
+_USER_SHIFT = 1 << 32  # key = user_id * _USER_SHIFT + minutes since _EPOCH
+
+
+def _minutes(value):
+    if timezone.is_aware(value):
+        value = timezone.localtime(value).replace(tzinfo=None)
+    return int((value - _EPOCH).total_seconds() // 60)
+
+
+class Timeline:
+    """One event stream for every user, sorted by (user, time), with prefix sums of its values."""
+
+    def __init__(self, user_ids, minutes, values):
+        keys = np.asarray(user_ids, dtype=np.int64) * _USER_SHIFT + np.asarray(minutes, dtype=np.int64)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.values = np.asarray(values, dtype=np.float64)[order]
+        self.prefix = np.concatenate(([0.0], np.cumsum(self.values)))
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from (user_id, datetime, value) rows."""
+        user_ids, minutes, values = [], [], []
+        for user_id, when, value in rows:
+            user_ids.append(user_id)
+            minutes.append(_minutes(when))
+            values.append(value)
+        return cls(user_ids, minutes, values)
+
+    @classmethod
+    def merge(cls, *timelines):
+        keys = np.concatenate([t.keys for t in timelines])
+        return cls(keys // _USER_SHIFT, keys % _USER_SHIFT, np.concatenate([t.values for t in timelines]))
+
+    def minutes(self, idx):
+        return self.keys[idx] % _USER_SHIFT
+
+    def window(self, users, start, end):
+        """Index range [lo, hi) of each user's events with start <= minute < end."""
+        base = users * _USER_SHIFT
+        return np.searchsorted(self.keys, base + start), np.searchsorted(self.keys, base + end)
+
+    def last_minute(self, users):
+        """Minute of each user's latest event, or -1 if they have none."""
+        idx = np.searchsorted(self.keys, (users + 1) * _USER_SHIFT) - 1
+        found = (idx >= 0) & (self.keys[np.maximum(idx, 0)] // _USER_SHIFT == users)
+        return np.where(found, self.minutes(np.maximum(idx, 0)), -1)
+
+
+def build_timelines():
+    """Load every event stream the cohort report needs (one query each)."""
+    timelines = {
+        metric: Timeline.from_rows(
+            AssessmentResult.objects.filter(assessment_type=metric)
+            .values_list('user_id', 'created_at', 'total_score').iterator(chunk_size=5000)
+        )
+        for metric in SCORE_METRICS
+    }
+    timelines['mood'] = Timeline.from_rows(
+        MoodEntry.objects.values_list('user_id', 'created_at', 'mood').iterator(chunk_size=5000)
+    )
+    timelines['assessments'] = Timeline.from_rows(
+        AssessmentResult.objects.values_list('user_id', 'created_at', 'total_score').iterator(chunk_size=5000)
+    )
+    return timelines
+
+
+def load_sessions():
+    """Completed sessions as parallel arrays plus their group labels."""
+    rows = list(
+        CounsellorBooking.objects.filter(status='completed')
+        .values_list('user_id', 'date', 'time_slot', 'counsellor_id', 'counsellor__name',
+                     'counsellor__specialization', 'is_instant', 'include_video')
+    )
+    users = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    at = np.fromiter((_minutes(datetime.combine(r[1], r[2])) for r in rows), dtype=np.int64, count=len(rows))
+    labels = {
+        'counsellor': [f'{r[4]} (#{r[3]})' for r in rows],
+        'specialization': [(r[5] or 'Unspecified').strip() for r in rows],
+        'session_type': [f"{'Instant' if r[6] else 'Scheduled'} · {'Video' if r[7] else 'Chat'}" for r in rows],
+    }
+    return users, at, labels
+
+
+def score_outcomes(timeline, users, at, threshold):
+    """Per-session pre score, latest post score, and days until the first improved score.
+
+    pre is the latest score in the PRE_WINDOW_DAYS up to the session and post the latest
+    within POST_WINDOW_DAYS after it; NaN where either is missing.
+    """
+    n = len(users)
+    pre_lo, pre_hi = timeline.window(users, at - PRE_WINDOW_DAYS * _DAY, at + 1)
+    post_lo, post_hi = timeline.window(users, at + 1, at + POST_WINDOW_DAYS * _DAY + 1)
+    paired = (pre_hi > pre_lo) & (post_hi > post_lo)
+
+    pre = np.full(n, np.nan)
+    post = np.full(n, np.nan)
+    pre[paired] = timeline.values[pre_hi[paired] - 1]
+    post[paired] = timeline.values[post_hi[paired] - 1]
+
+    # Expand every paired session's post window into flat (session, event) pairs.
+    lengths = np.where(paired, post_hi - post_lo, 0)
+    session = np.repeat(np.arange(n), lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    events = np.repeat(post_lo, lengths) + offsets
+    hits = timeline.values[events] <= pre[session] - threshold
+
+    none = np.iinfo(np.int64).max
+    first = np.full(n, none, dtype=np.int64)
+    np.minimum.at(first, session[hits], events[hits])
+    improved = first != none
+    days = np.full(n, np.nan)
+    days[improved] = (timeline.minutes(first[improved]) - at[improved]) / _DAY
+    return pre, post, days
+
+
+def mood_outcomes(timeline, users, at):
+    """Mean mood in the MOOD_PRE_DAYS before and the MOOD_POST_DAYS after each session."""
+    def mean(lo, hi):
+        count = hi - lo
+        total = timeline.prefix[hi] - timeline.prefix[lo]
+        return np.divide(total, count, out=np.full(len(count), np.nan), where=count > 0)
+
+    pre = mean(*timeline.window(users, at - MOOD_PRE_DAYS * _DAY, at + 1))
+    post = mean(*timeline.window(users, at + 1, at + MOOD_POST_DAYS * _DAY + 1))
+    return pre, post
+
+
+def _group_medians(codes, values, n_groups):
+    keep = ~np.isnan(values)
+    codes, values = codes[keep], values[keep]
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+    bounds = np.searchsorted(codes, np.arange(n_groups + 1))
+    medians = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        medians.append(float(np.median(values[lo:hi])) if hi > lo else None)
+    return medians
+
+
+def _mean_or_none(total, count):
+    return [round(float(t / c), 2) if c else None for t, c in zip(total, count)]
+
+
+def _pct_or_none(part, whole):
+    return [round(float(p * 100 / w), 1) if w else None for p, w in zip(part, whole)]
+
+
+def summarize(codes, n_groups, users, outcomes, retention):
+    """Aggregate per-session outcomes into one stats dict per group code."""
+    def count(mask, weights=None):
+        return np.bincount(codes[mask], weights=None if weights is None else weights[mask], minlength=n_groups)
+
+    everything = np.ones(len(codes), dtype=bool)
+    sessions = count(everything)
+    patients = np.bincount(np.unique(np.stack([codes, users]), axis=1)[0], minlength=n_groups)
+    rows = [{'sessions': int(s), 'patients': int(p)} for s, p in zip(sessions, patients)]
+
+    for metric in SCORE_METRICS:
+        pre, post, days = outcomes[metric]
+        paired = ~np.isnan(pre)
+        delta = post - pre
+        n_paired = count(paired)
+        mean_delta = _mean_or_none(count(paired, delta), n_paired)
+        improved_pct = _pct_or_none(count(~np.isnan(days)), n_paired)
+        median_days = _group_medians(codes, days, n_groups)
+        for row, n, d, pct, med in zip(rows, n_paired, mean_delta, improved_pct, median_days):
+            row[metric] = {
+                'paired': int(n), 'mean_delta': d, 'improved_pct': pct,
+                'median_days': round(med, 1) if med is not None else None,
+            }
+
+    mood_pre, mood_post = outcomes['mood']
+    paired = ~np.isnan(mood_pre) & ~np.isnan(mood_post)
+    n_paired = count(paired)
+    for row, n, d in zip(rows, n_paired, _mean_or_none(count(paired, mood_post - mood_pre), n_paired)):
+        row['mood'] = {'paired': int(n), 'mean_delta': d}
+
+    first_codes, eligible, retained = retention
+    curves = [
+        _pct_or_none(
+            np.bincount(first_codes[eligible[k] & retained[k]], minlength=n_groups),
+            np.bincount(first_codes[eligible[k]], minlength=n_groups),
+        )
+        for k in range(len(RETENTION_WEEKS))
+    ]
+    for g, row in enumerate(rows):
+        row['retention'] = [curve[g] for curve in curves]
+    return rows
+
+
+def compute_cohort_outcomes(now=None, timelines=None):
+    """Full cohort report: overall stats and per-group stats for every grouping."""
+    now = now or timezone.now()
+    users, at, labels = load_sessions()
+    report = {
+        'generated_at': now.isoformat(),
+        'sessions': int(len(users)),
+        'patients': int(len(np.unique(users))),
+        'retention_weeks': list(RETENTION_WEEKS),
+        'overall': None,
+        'groups': {key: [] for key in GROUPINGS},
+    }
+    if not len(users):
+        return report
+
+    timelines = timelines or build_timelines()
+    outcomes = {
+        metric: score_outcomes(timelines[metric], users, at, IMPROVEMENT_THRESHOLDS[metric])
+        for metric in SCORE_METRICS
+    }
+    outcomes['mood'] = mood_outcomes(timelines['mood'], users, at)
+
+    # Retention counts from each patient's first completed session; any later mood log,
+    # assessment or completed session means they were still engaged.
+    sessions = Timeline(users, at, np.ones(len(users)))
+    activity = Timeline.merge(timelines['mood'], timelines['assessments'], sessions)
+    order = np.lexsort((at, users))
+    cohort_users, first_idx = np.unique(users[order], return_index=True)
+    first_session = order[first_idx]
+    start = at[first_session]
+    last_seen = activity.last_minute(cohort_users)
+    now_minute = _minutes(now)
+    eligible = [now_minute - start >= k * 7 * _DAY for k in RETENTION_WEEKS]
+    retained = [last_seen >= start + k * 7 * _DAY for k in RETENTION_WEEKS]
+
+    overall_codes = np.zeros(len(users), dtype=np.int64)
+    report['overall'] = summarize(
+        overall_codes, 1, users, outcomes, (overall_codes[first_session], eligible, retained),
+    )[0]
+
+    for key in GROUPINGS:
+        names, codes = np.unique(np.array(labels[key], dtype=object), return_inverse=True)
+        codes = codes.astype(np.int64)
+        rows = summarize(codes, len(names), users, outcomes, (codes[first_session], eligible, retained))
+        for name, row in zip(names, rows):
+            row['label'] = str(name)
+        report['groups'][key] = sorted(rows, key=lambda r: (-r['sessions'], r['label']))
+    return report
+
+
+def cached_cohort_outcomes(today=None):
+    """The cohort report, computed at most once per day."""
+    today = today or timezone.localdate()
+    key = f'cohort_outcomes:{today.isoformat()}'
+    report = cache.get(key)
+    if report is None:
+        report = compute_cohort_outcomes()
+        cache.set(key, report, COHORT_CACHE_TIMEOUT)
+    return report
@@ -3,6 +3,7 @@ import json
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 
+from .dispatch import counsellor_connected, counsellor_disconnected, counsellor_seen, dispatch
 from .models import Counsellor, CounsellorBooking, CounsellorChatMessage, CounsellorNotification
 from .models import get_display_name
 
@@ -127,9 +128,22 @@ class DoctorNotificationConsumer(AsyncWebsocketConsumer):
         self.group_name = f'doctor_{user.id}'
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
+        # The counsellor is now online for instant sessions; waiting patients may be matched.
+        await self._went_online(user.id)
 
     async def disconnect(self, close_code):
+        if not hasattr(self, 'group_name'):
+            return
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        await database_sync_to_async(counsellor_disconnected)(self.scope['user'].id)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            data = json.loads(text_data or '{}')
+        except json.JSONDecodeError:
+            return
+        if data.get('type') == 'heartbeat':
+            await database_sync_to_async(counsellor_seen)(self.scope['user'].id)
 
     async def doctor_notification(self, event):
         await self.send(text_data=json.dumps({
@@ -137,6 +151,11 @@ class DoctorNotificationConsumer(AsyncWebsocketConsumer):
             'notification': event['notification'],
         }))
 
+    @database_sync_to_async
+    def _went_online(self, user_id):
+        counsellor_connected(user_id)
+        dispatch()
+
     @database_sync_to_async
     def _is_counsellor(self, user_id):
         return Counsellor.objects.filter(user_id=user_id).exists()
@@ -0,0 +1,121 @@
+"""
+MindMend counsellor statistics.
+Session counts, earnings balances, penalties and ratings live in one CounsellorStats row
+per counsellor. A rebuild recomputes the rows for the given counsellors from their bookings,
+reviews and cancellations in one grouped query with conditional aggregates. Receivers run
+it inside the transaction of every booking, review, cancellation or settlement change, so
+listing pages and the earnings dashboard read the totals with a plain join.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg, Case, Count, DecimalField, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Round
+
+from .booking_lifecycle import COUNSELLOR_SHARE
+from .models import Counsellor, CounsellorStats
+from .revenue import unsettled_penalties
+
+DIRECTORY_PAGE_SIZE = 24
+REBUILD_BATCH_SIZE = 500
+
+_MONEY = DecimalField(max_digits=12, decimal_places=2)
+_B = 'counsellorbooking__'
+
+
+def _earnings():
+    """Counsellor earnings per booking; bookings saved without them fall back to 90% of the fee."""
+    fee = Case(
+        When(**{_B + 'total_fee__gt': 0}, then=F(_B + 'total_fee')),
+        When(**{_B + 'is_instant': True}, then=F('instant_session_fee')),
+        default=F('session_fee'),
+    )
+    return Case(
+        When(**{_B + 'counsellor_earnings__gt': 0}, then=F(_B + 'counsellor_earnings')),
+        default=Round(fee * Value(COUNSELLOR_SHARE), 2),
+        output_field=_MONEY,
+    )
+
+
+def _money_sum(condition):
+    return Coalesce(Sum(_earnings(), filter=condition), Value(Decimal('0.00')), output_field=_MONEY)
+
+
+def _aggregates():
+    completed = Q(**{_B + 'status': 'completed'})
+    instant = Q(**{_B + 'is_instant': True})
+    video = Q(**{_B + 'include_video': True})
+    rating = _B + 'counsellorreview__rating'
+    return {
+        'total_bookings': Count('counsellorbooking'),
+        'pending_bookings': Count('counsellorbooking', filter=Q(**{_B + 'status': 'pending'})),
+        'completed_sessions': Count('counsellorbooking', filter=completed),
+        'normal_chat_count': Count('counsellorbooking', filter=completed & ~instant & ~video),
+        'normal_video_count': Count('counsellorbooking', filter=completed & ~instant & video),
+        'instant_chat_count': Count('counsellorbooking', filter=completed & instant & ~video),
+        'instant_video_count': Count('counsellorbooking', filter=completed & instant & video),
+        'earnings': _money_sum(completed),
+        'normal_chat_earnings': _money_sum(completed & ~instant & ~video),
+        'normal_video_earnings': _money_sum(completed & ~instant & video),
+        'instant_chat_earnings': _money_sum(completed & instant & ~video),
+        'instant_video_earnings': _money_sum(completed & instant & video),
+        'unsettled_earnings': _money_sum(completed & Q(**{_B + 'is_settled': False})),
+        'pending_payout': _money_sum(completed & Q(**{_B + 'is_settled': False, _B + 'is_disputed': False})),
+        'settled_earnings': _money_sum(completed & Q(**{_B + 'is_settled': True})),
+        'unsettled_penalties': unsettled_penalties(),
+        'review_count': Count(rating),
+        'avg_rating': Avg(rating),
+        'normal_rating': Avg(rating, filter=~instant),
+        'instant_rating': Avg(rating, filter=instant),
+    }
+
+
+STATS_FIELDS = tuple(_aggregates())
+
+
+def rebuild_stats(counsellor_ids):
+    """Recompute CounsellorStats for the given counsellors; returns how many rows were written."""
+    ids = sorted(set(counsellor_ids))
+    if not ids:
+        return 0
+    with transaction.atomic():
+        # Lock existing rows so concurrent rebuilds of one counsellor apply in order.
+        existing = {s.counsellor_id: s for s in CounsellorStats.objects.select_for_update().filter(counsellor_id__in=ids)}
+        rows = Counsellor.objects.filter(pk__in=ids).annotate(**_aggregates()).values('id', *STATS_FIELDS)
+        to_update, to_create = [], []
+        for row in rows:
+            counsellor_id = row.pop('id')
+            stats = existing.get(counsellor_id)
+            if stats is None:
+                to_create.append(CounsellorStats(counsellor_id=counsellor_id, **row))
+            else:
+                for field, value in row.items():
+                    setattr(stats, field, value)
+                to_update.append(stats)
+        CounsellorStats.objects.bulk_create(to_create)
+        CounsellorStats.objects.bulk_update(to_update, [*STATS_FIELDS, 'updated_at'])
+    return len(to_create) + len(to_update)
+
+
+def directory_stats(counsellors):
+    """[{'obj': counsellor, metric: value, ...}] for counsellors loaded with select_related('stats')."""
+    data = []
+    for c in counsellors:
+        stats = getattr(c, 'stats', None) or CounsellorStats(counsellor=c)
+        data.append({
+            'obj': c,
+            'total_sessions': stats.completed_sessions,
+            'earnings': stats.earnings,
+            'pending_payout': stats.pending_payout,
+            'completion_rate': stats.completion_rate,
+            'rating': stats.avg_rating or 0,
+            'normal_chat_count': stats.normal_chat_count,
+            'normal_video_count': stats.normal_video_count,
+            'instant_chat_count': stats.instant_chat_count,
+            'instant_video_count': stats.instant_video_count,
+            'normal_earnings': stats.normal_earnings,
+            'instant_earnings': stats.instant_earnings,
+            'normal_rating': stats.normal_rating or 0,
+            'instant_rating': stats.instant_rating or 0,
+        })
+    return data
@@ -0,0 +1,155 @@
+"""
+MindMend instant-session dispatcher.
+Patients who ask for "the next available counsellor" wait in a FIFO queue of
+InstantRequest rows. A dispatch pass builds a min-heap of counsellors who are online
+(an open DoctorNotificationConsumer connection), instant-enabled, inside their working
+hours and not in a session right now, keyed by how many instant sessions they have
+taken today. Each waiting patient pops the least-loaded counsellor, so an assignment
+costs O(log n). The assignment reserves a slot hold for the patient to pay for and is
+pushed to the counsellor live.
+"""
+import heapq
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .availability import SLOT_MINUTES, available_weekdays
+from .models import Counsellor, CounsellorBooking, CounsellorPresence, InstantRequest, SlotHold
+from .notifications import notify_counsellor
+from .slot_holds import reserve_slot
+
+PRESENCE_TTL = timedelta(minutes=2)  # dashboards send a heartbeat every 30 seconds
+QUEUE_TIMEOUT = timedelta(minutes=10)
+INSTANT_PLATFORM_FEE = Decimal('3.00')  # same convenience fee as instant_booking
+
+
+def _minute(value):
+    return value.hour * 60 + value.minute
+
+
+def _instant_slot(now):
+    local = timezone.localtime(now)
+    return local.date(), local.time().replace(second=0, microsecond=0)
+
+
+# ── Presence (called from DoctorNotificationConsumer) ─────────────────────────
+
+def _presence(user_id):
+    return CounsellorPresence.objects.filter(counsellor__user_id=user_id)
+
+
+def counsellor_connected(user_id, now=None):
+    counsellor_id = Counsellor.objects.filter(user_id=user_id).values_list('id', flat=True).first()
+    if counsellor_id is None:
+        return
+    CounsellorPresence.objects.get_or_create(counsellor_id=counsellor_id)
+    _presence(user_id).update(connections=F('connections') + 1, last_seen_at=now or timezone.now())
+
+
+def counsellor_disconnected(user_id):
+    _presence(user_id).filter(connections__gt=0).update(connections=F('connections') - 1)
+
+
+def counsellor_seen(user_id, now=None):
+    _presence(user_id).update(last_seen_at=now or timezone.now())
+
+
+# ── Availability and load index ───────────────────────────────────────────────
+
+def available_counsellors(now=None):
+    """Online, instant-enabled counsellors whose working hours cover now."""
+    now = now or timezone.now()
+    day, slot = _instant_slot(now)
+    candidates = Counsellor.objects.filter(
+        is_active=True, is_instant_enabled=True,
+        presence__connections__gt=0, presence__last_seen_at__gte=now - PRESENCE_TTL,
+    )
+    return [
+        c for c in candidates
+        if day.weekday() in available_weekdays(c.available_days)
+        and c.available_time_start <= slot <= c.available_time_end
+    ]
+
+
+def load_heap(counsellors, now=None):
+    """Min-heap of (instant sessions today, counsellor id) over counsellors not in a session now."""
+    now = now or timezone.now()
+    day, slot = _instant_slot(now)
+    ids = [c.id for c in counsellors]
+    minute = _minute(slot)
+    busy, sessions = set(), dict.fromkeys(ids, 0)
+    rows = CounsellorBooking.objects.filter(counsellor_id__in=ids, date=day).holding_slot(now)
+    for counsellor_id, time_slot, is_instant in rows.values_list('counsellor_id', 'time_slot', 'is_instant'):
+        if abs(_minute(time_slot) - minute) < SLOT_MINUTES:
+            busy.add(counsellor_id)
+        sessions[counsellor_id] += is_instant
+    held = SlotHold.objects.filter(counsellor_id__in=ids, date=day, expires_at__gt=now)
+    for counsellor_id, time_slot in held.values_list('counsellor_id', 'time_slot'):
+        if abs(_minute(time_slot) - minute) < SLOT_MINUTES:
+            busy.add(counsellor_id)
+    heap = [(count, counsellor_id) for counsellor_id, count in sessions.items() if counsellor_id not in busy]
+    heapq.heapify(heap)
+    return heap
+
+
+def instant_draft(counsellor, instant_request, now):
+    """Unsaved instant booking for the counsellor starting now, priced like instant_booking."""
+    day, slot = _instant_slot(now)
+    chat_fee = counsellor.instant_session_fee if instant_request.include_chat else Decimal('0')
+    video_fee = counsellor.instant_video_session_fee if instant_request.include_video else Decimal('0')
+    return CounsellorBooking(
+        counsellor=counsellor, date=day, time_slot=slot, is_instant=True,
+        include_chat=instant_request.include_chat, include_video=instant_request.include_video,
+        chat_fee=chat_fee, video_fee=video_fee, platform_fee=INSTANT_PLATFORM_FEE,
+        total_fee=chat_fee + video_fee + INSTANT_PLATFORM_FEE,
+    )
+
+
+# ── Queue ─────────────────────────────────────────────────────────────────────
+
+def queue_position(instant_request):
+    """1-based place in the waiting queue."""
+    return InstantRequest.objects.filter(status='waiting', created_at__lte=instant_request.created_at).count()
+
+
+def dispatch(now=None):
+    """Assign waiting patients, oldest first, to the least-loaded available counsellors."""
+    now = now or timezone.now()
+    InstantRequest.objects.filter(status='waiting', created_at__lte=now - QUEUE_TIMEOUT).update(status='expired')
+    assigned, counsellors = [], {}
+    with transaction.atomic():
+        waiting = list(
+            InstantRequest.objects.select_for_update().filter(status='waiting')
+            .select_related('user').order_by('created_at')
+        )
+        if waiting:
+            counsellors = {c.id: c for c in available_counsellors(now)}
+            heap = load_heap(counsellors.values(), now)
+            for instant_request in waiting:
+                hold = None
+                while heap and hold is None:
+                    _, counsellor_id = heapq.heappop(heap)
+                    hold = reserve_slot(instant_request.user, instant_draft(counsellors[counsellor_id], instant_request, now), now)
+                if hold is None:
+                    break
+                # The counsellor is now busy with this patient, so they are not pushed back.
+                instant_request.status = 'assigned'
+                instant_request.counsellor_id = counsellor_id
+                instant_request.hold_token = hold.token
+                instant_request.assigned_at = now
+                instant_request.save(update_fields=['status', 'counsellor', 'hold_token', 'assigned_at'])
+                assigned.append(instant_request)
+
+    for instant_request in assigned:
+        notify_counsellor(
+            counsellors[instant_request.counsellor_id],
+            'instant_assigned',
+            'Instant patient assigned ⚡',
+            'A patient from the instant queue has been matched with you and is completing payment. '
+            'Please stay available for the next 30 minutes.',
+            actor=instant_request.user,
+        )
+    return assigned
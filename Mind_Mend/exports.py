@@ -0,0 +1,136 @@
+"""
+MindMend analytics exports.
+Streams mood, assessment and chat-sentiment rows into columnar files (NumPy .npz, or
+Parquet when pyarrow is installed) for offline population analysis. User ids are
+replaced by keyed pseudonyms and chat content is never exported.
+"""
+import hashlib
+import hmac
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import AnalyticsExport, AssessmentResult, ChatMessage, MoodEntry
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ModuleNotFoundError:
+    pa = None
+    pq = None
+
+EXPORT_CHUNK_SIZE = 50_000
+MISSING_INT = -1  # stored for NULL integer fields such as MoodEntry.energy_level
+_EPOCH_ORDINAL = 719163  # date(1970, 1, 1).toordinal()
+
+# table -> (queryset factory, [(column, model field, kind)])
+EXPORT_TABLES = {
+    'mood': (lambda: MoodEntry.objects.all(), [
+        ('id', 'id', 'int'), ('user', 'user_id', 'user'), ('date', 'date', 'date'),
+        ('mood', 'mood', 'int'), ('energy_level', 'energy_level', 'int'),
+        ('activities', 'activities', 'str'), ('created_at', 'created_at', 'datetime'),
+    ]),
+    'assessment': (lambda: AssessmentResult.objects.all(), [
+        ('id', 'id', 'int'), ('user', 'user_id', 'user'), ('assessment_type', 'assessment_type', 'str'),
+        ('total_score', 'total_score', 'int'), ('result_level', 'result_level', 'str'),
+        ('created_at', 'created_at', 'datetime'),
+    ]),
+    'chat_sentiment': (lambda: ChatMessage.objects.exclude(sentiment=''), [
+        ('id', 'id', 'int'), ('user', 'user_id', 'user'), ('role', 'role', 'str'),
+        ('sentiment', 'sentiment', 'str'), ('created_at', 'created_at', 'datetime'),
+    ]),
+}
+EXPORT_FORMATS = ('npz', 'parquet')
+
+
+def default_format():
+    return 'parquet' if pq is not None else 'npz'
+
+
+def _pseudonym_key():
+    key = getattr(settings, 'MINDMEND_EXPORT_PSEUDONYM_KEY', '') or settings.SECRET_KEY
+    return hashlib.sha256(f'mindmend-export:{key}'.encode('utf-8')).digest()
+
+
+def pseudonymize(user_id, key=None):
+    """Stable, non-reversible 64-bit id for a user; 0 for rows without a user."""
+    if user_id is None:
+        return 0
+    digest = hmac.new(key or _pseudonym_key(), str(user_id).encode('utf-8'), hashlib.sha256).digest()
+    return int.from_bytes(digest[:8], 'big') or 1
+
+
+def _column(kind, values, key, cache):
+    if kind == 'int':
+        return np.fromiter((MISSING_INT if v is None else v for v in values), dtype=np.int64, count=len(values))
+    if kind == 'user':
+        ids = []
+        for v in values:
+            if v not in cache:
+                cache[v] = pseudonymize(v, key)
+            ids.append(cache[v])
+        return np.array(ids, dtype=np.uint64)
+    if kind == 'date':
+        days = np.fromiter((v.toordinal() for v in values), dtype=np.int64, count=len(values))
+        return (days - _EPOCH_ORDINAL).astype('datetime64[D]')
+    if kind == 'datetime':
+        micros = np.fromiter((round(v.timestamp() * 1_000_000) for v in values), dtype=np.int64, count=len(values))
+        return micros.astype('datetime64[us]')
+    return np.array(values, dtype=str)
+
+
+def iter_export_chunks(table, since_id=0, chunk_size=EXPORT_CHUNK_SIZE, using='default'):
+    """Yield dicts of column arrays for rows with id > since_id, one keyset-paginated chunk at a time."""
+    queryset, columns = EXPORT_TABLES[table]
+    fields = [field for _, field, _ in columns]
+    key, cache = _pseudonym_key(), {}
+    last_id = since_id
+    while True:
+        rows = list(
+            queryset().using(using).filter(id__gt=last_id).order_by('id').values_list(*fields)[:chunk_size]
+        )
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        values = list(zip(*rows))
+        yield {name: _column(kind, values[i], key, cache) for i, (name, _, kind) in enumerate(columns)}
+
+
+def write_chunk(chunk, file_format, out):
+    """Write one chunk of column arrays to a path or binary file object."""
+    if file_format == 'parquet':
+        if pq is None:
+            raise RuntimeError('pyarrow is not installed; use the npz format')
+        pq.write_table(pa.table(chunk), out)
+    else:
+        np.savez_compressed(out, **chunk)
+
+
+def last_exported_id(table):
+    return AnalyticsExport.objects.filter(table=table).aggregate(last=Max('last_id'))['last'] or 0
+
+
+def export_table(table, output_dir, file_format=None, full=False, chunk_size=EXPORT_CHUNK_SIZE, using='default'):
+    """Export rows added since the previous run (or all rows with full=True) as part files."""
+    file_format = file_format or default_format()
+    since_id = 0 if full else last_exported_id(table)
+    target = Path(output_dir) / table
+    target.mkdir(parents=True, exist_ok=True)
+    stamp = timezone.now().strftime('%Y%m%dT%H%M%S')
+
+    files, rows, last_id = [], 0, since_id
+    for part, chunk in enumerate(iter_export_chunks(table, since_id, chunk_size, using)):
+        path = target / f'{stamp}-{part:05d}.{file_format}'
+        write_chunk(chunk, file_format, path)
+        files.append(str(path))
+        rows += len(chunk['id'])
+        last_id = int(chunk['id'][-1])
+
+    if not rows:
+        return None
+    return AnalyticsExport.objects.create(
+        table=table, file_format=file_format, since_id=since_id, last_id=last_id, rows=rows, files=files,
+    )
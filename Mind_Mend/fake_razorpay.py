@@ -0,0 +1,160 @@
+"""
+MindMend fake Razorpay refunds API.
+A small in-memory HTTP server answering the refund endpoints the outbox uses, so refund
+delivery can be exercised without the real gateway: point RAZORPAY_API_BASE_URL at it.
+It can fail the first N refund requests with a server error, or record the first N refunds
+and then drop the connection without answering (the ambiguous case the outbox's receipt
+lookup exists for), and add latency to every request.
+"""
+import base64
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REFUND_PATH = re.compile(r'^/v1/payments/(?P<payment_id>[^/]+)/refund$')
+REFUNDS_PATH = re.compile(r'^/v1/payments/(?P<payment_id>[^/]+)/refunds$')
+REFUND_ID_PATH = re.compile(r'^/v1/refunds/(?P<refund_id>[^/]+)$')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        if self.server.fake.verbose:
+            super().log_message(format, *args)
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, code, description):
+        self._reply(status, {'error': {'code': code, 'description': description}})
+
+    def _authorised(self):
+        fake = self.server.fake
+        expected = base64.b64encode(f'{fake.key_id}:{fake.key_secret}'.encode()).decode()
+        if self.headers.get('Authorization') == f'Basic {expected}':
+            return True
+        self._error(401, 'BAD_REQUEST_ERROR', 'The api key provided is invalid')
+        return False
+
+    def do_GET(self):
+        fake = self.server.fake
+        time.sleep(fake.latency)
+        if not self._authorised():
+            return
+        path = self.path.split('?', 1)[0]
+        if match := REFUNDS_PATH.match(path):
+            items = fake.refunds_for(match['payment_id'])
+            return self._reply(200, {'entity': 'collection', 'count': len(items), 'items': items})
+        if match := REFUND_ID_PATH.match(path):
+            refund = fake.refund(match['refund_id'])
+            if refund:
+                return self._reply(200, refund)
+            return self._error(400, 'BAD_REQUEST_ERROR', 'The id provided does not exist')
+        self._error(404, 'BAD_REQUEST_ERROR', 'The requested URL was not found on the server.')
+
+    def do_POST(self):
+        fake = self.server.fake
+        time.sleep(fake.latency)
+        if not self._authorised():
+            return
+        match = REFUND_PATH.match(self.path)
+        if not match:
+            return self._error(404, 'BAD_REQUEST_ERROR', 'The requested URL was not found on the server.')
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+        amount = body.get('amount')
+        if not isinstance(amount, int) or amount < 100:
+            return self._error(400, 'BAD_REQUEST_ERROR', 'The amount must be atleast INR 1.00.')
+        outcome = fake.next_outcome()
+        if outcome == 'fail':
+            return self._error(500, 'SERVER_ERROR', 'We are facing some trouble completing your request at the moment.')
+        refund = fake.record_refund(match['payment_id'], amount, body.get('receipt'), body.get('notes') or {})
+        if outcome == 'drop':
+            # Refunded, but the caller never hears about it.
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+        self._reply(200, refund)
+
+
+class FakeRazorpay:
+    def __init__(self, key_id, key_secret, host='127.0.0.1', port=0, fail_first=0, drop_first=0,
+                 latency=0.0, verbose=False):
+        self.key_id = key_id
+        self.key_secret = key_secret
+        self.fail_first = fail_first
+        self.drop_first = drop_first
+        self.latency = latency
+        self.verbose = verbose
+        self.refund_requests = 0
+        self._refunds = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def next_outcome(self):
+        """'fail', 'drop' or 'ok' for the next refund request: failures first, then drops."""
+        with self._lock:
+            self.refund_requests += 1
+            n = self.refund_requests
+        if n <= self.fail_first:
+            return 'fail'
+        if n <= self.fail_first + self.drop_first:
+            return 'drop'
+        return 'ok'
+
+    def record_refund(self, payment_id, amount, receipt, notes):
+        refund = {
+            'id': f'rfnd_{uuid.uuid4().hex[:14]}',
+            'entity': 'refund',
+            'amount': amount,
+            'currency': 'INR',
+            'payment_id': payment_id,
+            'notes': notes,
+            'receipt': receipt,
+            'status': 'processed',
+            'created_at': int(time.time()),
+        }
+        with self._lock:
+            self._refunds[refund['id']] = refund
+        return refund
+
+    def refund(self, refund_id):
+        with self._lock:
+            return self._refunds.get(refund_id)
+
+    def refunds_for(self, payment_id):
+        with self._lock:
+            return [r for r in self._refunds.values() if r['payment_id'] == payment_id]
+
+    @property
+    def refunds(self):
+        with self._lock:
+            return list(self._refunds.values())
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def start(self):
+        """Serve from a background thread; returns self."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
@@ -0,0 +1,243 @@
+"""
+MindMend daily financial rollups.
+DailyFinancials holds one row per local day with the money that moved that day: booking
+volume, completed-session revenue split between platform and counsellors, refunds,
+compensation credits, cancellations and penalties, and counsellor payouts. Every event
+lands on the day it happened: receivers add what a saved row contributes to its day's row
+(and take away what it contributed before) with F() increments, and any range is served
+from at most one row per day. Only backfill_financials recomputes days from the source tables.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, TruncDate
+from django.utils import timezone
+
+from .models import BookingCancellation, CounsellorBooking, DailyFinancials, PayoutSettlement, WalletTransaction
+
+PERIODS = ('day', 'week', 'month')
+MAX_SERIES_DAYS = 3 * 366
+BACKFILL_CHUNK_DAYS = 31
+WALLET_TYPES = {'refund': 'refunds', 'compensation': 'compensation'}
+
+MONEY_FIELDS = (
+    'gross_revenue', 'counsellor_earnings', 'platform_revenue', 'refunds', 'compensation',
+    'penalties', 'payouts_gross', 'payouts_net',
+)
+COUNT_FIELDS = ('bookings_created', 'sessions_completed', 'cancellations', 'settlements')
+
+_MONEY = DecimalField(max_digits=12, decimal_places=2)
+_ZERO = Value(Decimal('0.00'))
+
+
+def _sum(expression):
+    return Coalesce(Sum(expression), _ZERO, output_field=_MONEY)
+
+
+def event_day(moment):
+    """The local day an event at the given time is rolled up into."""
+    return timezone.localdate(moment) if moment else None
+
+
+def day_start(day):
+    """The aware moment the given local day starts."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _in_days(field, start, end):
+    """Rows whose `field` falls on a local day from start to end inclusive, as an indexable range."""
+    return Q(**{f'{field}__gte': day_start(start), f'{field}__lt': day_start(end + timedelta(days=1))})
+
+
+def _by_day(queryset, moment, **aggregates):
+    """{day: {aggregate: value}} for the queryset grouped by the local day of `moment`."""
+    rows = queryset.annotate(on=TruncDate(moment)).values('on').annotate(**aggregates)
+    return {row.pop('on'): row for row in rows}
+
+
+def compute(start, end):
+    """Rollup figures for every day from start to end inclusive that had any activity."""
+    created = _in_days('created_at', start, end)
+    completed = _in_days('completed_at', start, end) | Q(completed_at=None) & created
+    sources = [
+        _by_day(CounsellorBooking.objects.filter(created), 'created_at', bookings_created=Count('id')),
+        _by_day(
+            CounsellorBooking.objects.filter(completed, status='completed').alias(margin=F('total_fee') - F('counsellor_earnings')),
+            Coalesce('completed_at', 'created_at'),
+            sessions_completed=Count('id'),
+            gross_revenue=_sum('total_fee'),
+            counsellor_earnings=_sum('counsellor_earnings'),
+            platform_revenue=_sum('margin'),
+        ),
+        _by_day(BookingCancellation.objects.filter(created), 'created_at',
+                cancellations=Count('id'), penalties=_sum('counsellor_penalty')),
+        _by_day(PayoutSettlement.objects.filter(created), 'created_at',
+                settlements=Count('id'), payouts_gross=_sum('gross_amount'), payouts_net=_sum('net_amount_paid')),
+    ]
+    wallet = (
+        WalletTransaction.objects.filter(created, transaction_type__in=WALLET_TYPES)
+        .annotate(on=TruncDate('created_at'))
+        .values('on', 'transaction_type').annotate(total=_sum('amount'))
+    )
+    figures = {}
+    for source in sources:
+        for day, values in source.items():
+            figures.setdefault(day, {}).update(values)
+    for row in wallet:
+        figures.setdefault(row['on'], {})[WALLET_TYPES[row['transaction_type']]] = row['total']
+    return figures
+
+
+def rebuild_range(start, end):
+    """Recompute every rollup row from start to end inclusive; returns how many rows were written."""
+    with transaction.atomic():
+        figures = compute(start, end)
+        days = sorted(set(figures) | set(DailyFinancials.objects.filter(day__range=(start, end)).values_list('day', flat=True)))
+        if not days:
+            return 0
+        DailyFinancials.objects.bulk_create([DailyFinancials(day=day) for day in days], ignore_conflicts=True)
+        rows = list(DailyFinancials.objects.select_for_update().filter(day__in=days))
+        for row in rows:
+            values = figures.get(row.day, {})
+            for field in COUNT_FIELDS:
+                setattr(row, field, values.get(field, 0))
+            for field in MONEY_FIELDS:
+                setattr(row, field, values.get(field, Decimal('0.00')))
+        DailyFinancials.objects.bulk_update(rows, [*COUNT_FIELDS, *MONEY_FIELDS, 'updated_at'])
+        return len(rows)
+
+
+def _money(value):
+    return Decimal(str(value or 0))
+
+
+def contributions(instance):
+    """[(day, {field: amount})] that one booking, wallet transaction, cancellation or settlement
+    adds to the rollups; empty for rows that feed none (None for no row)."""
+    if instance is None:
+        return []
+    if isinstance(instance, CounsellorBooking):
+        changes = [(event_day(instance.created_at), {'bookings_created': 1})]
+        if instance.status == 'completed':
+            fee, earnings = _money(instance.total_fee), _money(instance.counsellor_earnings)
+            changes.append((event_day(instance.completed_at or instance.created_at), {
+                'sessions_completed': 1, 'gross_revenue': fee,
+                'counsellor_earnings': earnings, 'platform_revenue': fee - earnings,
+            }))
+        return changes
+    if isinstance(instance, WalletTransaction):
+        field = WALLET_TYPES.get(instance.transaction_type)
+        return [(event_day(instance.created_at), {field: _money(instance.amount)})] if field else []
+    if isinstance(instance, BookingCancellation):
+        return [(event_day(instance.created_at), {'cancellations': 1, 'penalties': _money(instance.counsellor_penalty)})]
+    if isinstance(instance, PayoutSettlement):
+        return [(event_day(instance.created_at), {
+            'settlements': 1, 'payouts_gross': _money(instance.gross_amount), 'payouts_net': _money(instance.net_amount_paid),
+        })]
+    return []
+
+
+def record(added=(), removed=()):
+    """Move the day rows by the contributions added and removed; a row updated in place is its
+    old contributions removed and its new ones added, so unchanged figures cost no query."""
+    deltas = defaultdict(lambda: defaultdict(int))
+    for sign, changes in ((1, added), (-1, removed)):
+        for day, values in changes:
+            for field, value in values.items():
+                deltas[day][field] += sign * value
+    now = timezone.now()
+    for day, values in sorted(deltas.items(), key=lambda item: item[0] or date.min):
+        values = {field: value for field, value in values.items() if value}
+        if day is None or not values:
+            continue
+        DailyFinancials.objects.bulk_create([DailyFinancials(day=day)], ignore_conflicts=True)
+        # Counts never go below zero, even for rows deleted before they were ever rolled up.
+        DailyFinancials.objects.filter(day=day).update(updated_at=now, **{
+            field: Greatest(F(field) + value, 0) if field in COUNT_FIELDS else F(field) + value
+            for field, value in values.items()
+        })
+
+
+def record_completions(bookings, day):
+    """Roll up the sessions a bulk UPDATE just completed on `day` (the UPDATE skips post_save)."""
+    figures = bookings.aggregate(
+        sessions_completed=Count('id'), gross_revenue=_sum('total_fee'), counsellor_earnings=_sum('counsellor_earnings'),
+    )
+    figures['platform_revenue'] = figures['gross_revenue'] - figures['counsellor_earnings']
+    record(added=[(day, figures)])
+
+
+def first_event_day():
+    """The earliest local day any rolled-up event happened on, or None on an empty database."""
+    candidates = [
+        CounsellorBooking.objects.order_by('created_at').values_list('created_at', flat=True).first(),
+        CounsellorBooking.objects.order_by('completed_at').exclude(completed_at=None).values_list('completed_at', flat=True).first(),
+        WalletTransaction.objects.order_by('created_at').values_list('created_at', flat=True).first(),
+        BookingCancellation.objects.order_by('created_at').values_list('created_at', flat=True).first(),
+        PayoutSettlement.objects.order_by('created_at').values_list('created_at', flat=True).first(),
+    ]
+    days = [event_day(moment) for moment in candidates if moment]
+    return min(days) if days else None
+
+
+def period_start(day, period):
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _next_period(day, period):
+    if period == 'month':
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=7 if period == 'week' else 1)
+
+
+def totals(start, end):
+    """Summed rollup figures from start to end inclusive."""
+    return DailyFinancials.objects.filter(day__range=(start, end)).aggregate(
+        **{field: Coalesce(Sum(field), 0) for field in COUNT_FIELDS},
+        **{field: _sum(field) for field in MONEY_FIELDS},
+    )
+
+
+def series(start, end, period='day'):
+    """One point per day, ISO week (from Monday) or month between start and end, gaps as zeros."""
+    points = {}
+    day = period_start(start, period)
+    while day <= end:
+        points[day] = dict.fromkeys(COUNT_FIELDS, 0) | dict.fromkeys(MONEY_FIELDS, Decimal('0.00'))
+        day = _next_period(day, period)
+    for row in DailyFinancials.objects.filter(day__range=(start, end)).values('day', *COUNT_FIELDS, *MONEY_FIELDS):
+        point = points[period_start(row.pop('day'), period)]
+        for field, value in row.items():
+            point[field] += value
+    return [
+        {
+            'period_start': day.isoformat(),
+            **{field: point[field] for field in COUNT_FIELDS},
+            **{field: float(point[field]) for field in MONEY_FIELDS},
+            'cancellation_rate': round(point['cancellations'] / point['bookings_created'] * 100, 2)
+            if point['bookings_created'] else 0,
+        }
+        for day, point in points.items()
+    ]
+
+
+def parse_range(params, today=None):
+    """(start, end, period) from ?start=&end=&period= query params; raises ValueError on bad input."""
+    today = today or timezone.localdate()
+    end = date.fromisoformat(params['end']) if params.get('end') else today
+    start = date.fromisoformat(params['start']) if params.get('start') else end - timedelta(days=29)
+    period = params.get('period') or 'day'
+    if period not in PERIODS:
+        raise ValueError(f'period must be one of {", ".join(PERIODS)}')
+    if start > end:
+        raise ValueError('start must not be after end')
+    if (end - start).days >= MAX_SERIES_DAYS:
+        raise ValueError(f'ranges are limited to {MAX_SERIES_DAYS} days')
+    return start, end, period
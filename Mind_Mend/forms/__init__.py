@@ -27,6 +27,7 @@ class UserProfileForm(forms.ModelForm):
             self.fields['last_name'].initial  = user.last_name
 
 from ..assessment_data import PHQ9_QUESTIONS, GAD7_QUESTIONS, PSS_QUESTIONS
+from ..availability import available_weekdays
 
 
 class SignUpForm(UserCreationForm):
@@ -117,22 +118,7 @@ class CounsellorBookingForm(forms.ModelForm):
         if not counsellor or not booking_date or not time_slot:
             return cleaned
 
-        day_name = booking_date.strftime('%a').lower()  # mon, tue, ...
-        available_tokens = [
-            t.strip().lower()
-            for t in (counsellor.available_days or '').replace('/', ',').replace(' ', ',').split(',')
-            if t.strip()
-        ]
-        # Normalize common full weekday names to 3-letter form.
-        full_to_short = {
-            'monday': 'mon', 'tuesday': 'tue', 'wednesday': 'wed',
-            'thursday': 'thu', 'friday': 'fri', 'saturday': 'sat', 'sunday': 'sun'
-        }
-        normalized = set()
-        for token in available_tokens:
-            normalized.add(full_to_short.get(token, token[:3]))
-
-        day_available = day_name in normalized
+        day_available = booking_date.weekday() in available_weekdays(counsellor.available_days)
         time_available = (
             counsellor.available_time_start <= time_slot <= counsellor.available_time_end
         )
@@ -162,7 +148,7 @@ class CounsellorBookingForm(forms.ModelForm):
         existing_bookings = CounsellorBooking.objects.filter(
             counsellor=counsellor,
             date=booking_date,
-        ).exclude(status='cancelled')
+        ).holding_slot()
 
         for booking in existing_bookings:
             existing_dt = datetime.combine(booking_date, booking.time_slot)
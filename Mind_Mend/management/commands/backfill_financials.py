@@ -0,0 +1,30 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from Mind_Mend.financials import BACKFILL_CHUNK_DAYS, first_event_day, rebuild_range
+
+
+class Command(BaseCommand):
+    help = 'Rebuild DailyFinancials rollups from bookings, wallet transactions, cancellations and settlements (safe to re-run).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help='First day (YYYY-MM-DD); defaults to the earliest event.')
+        parser.add_argument('--end', type=date.fromisoformat, help='Last day (YYYY-MM-DD); defaults to today.')
+
+    def handle(self, *args, **options):
+        start = options['start'] or first_event_day()
+        end = options['end'] or timezone.localdate()
+        if start is None:
+            self.stdout.write('Nothing to backfill.')
+            return
+        if start > end:
+            raise CommandError('--start must not be after --end.')
+
+        written = 0
+        while start <= end:
+            chunk_end = min(start + timedelta(days=BACKFILL_CHUNK_DAYS - 1), end)
+            written += rebuild_range(start, chunk_end)
+            start = chunk_end + timedelta(days=1)
+        self.stdout.write(self.style.SUCCESS(f'Backfill complete. Daily rows written: {written}'))
@@ -0,0 +1,56 @@
+from datetime import timedelta
+from itertools import groupby
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from Mind_Mend.models import MoodEntry, MoodStreak, _streak_runs
+
+
+def legacy_streak(user_id, today):
+    """The original per-day walk used by the dashboard, kept for --verify."""
+    streak, check = 0, today
+    while MoodEntry.objects.filter(user_id=user_id, date=check).exists():
+        streak += 1
+        check -= timedelta(days=1)
+    return streak
+
+
+class Command(BaseCommand):
+    help = 'Rebuild MoodStreak rows from existing mood entries (run once after migrating, safe to re-run).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help='Compare stored streaks against the legacy per-day query instead of writing.')
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        if options['verify']:
+            return self._verify(today)
+
+        rows = (
+            MoodEntry.objects.order_by('user_id', 'date')
+            .values_list('user_id', 'date').distinct().iterator(chunk_size=5000)
+        )
+        written = 0
+        for user_id, group in groupby(rows, key=lambda r: r[0]):
+            current, longest, last = _streak_runs(d for _, d in group)
+            MoodStreak.objects.update_or_create(
+                user_id=user_id,
+                defaults={'current_streak': current, 'longest_streak': longest, 'last_logged_date': last},
+            )
+            written += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Backfill complete. Streak rows written: {written}'))
+
+    def _verify(self, today):
+        mismatches = 0
+        user_ids = MoodEntry.objects.values_list('user_id', flat=True).distinct()
+        for user_id in user_ids.iterator():
+            stored = MoodStreak.current_for(user_id, today=today)
+            expected = legacy_streak(user_id, today)
+            if stored != expected:
+                mismatches += 1
+                self.stdout.write(self.style.WARNING(f'User {user_id}: stored {stored}, expected {expected}'))
+        style = self.style.SUCCESS if mismatches == 0 else self.style.ERROR
+        self.stdout.write(style(f'Verify complete. Mismatches: {mismatches}'))
@@ -0,0 +1,143 @@
+import random
+import time
+from datetime import date, time as dtime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from Mind_Mend.counsellor_stats import directory_stats, rebuild_stats
+from Mind_Mend.models import Counsellor, CounsellorBooking, CounsellorReview
+
+METRICS = (
+    'total_sessions', 'earnings', 'pending_payout', 'completion_rate', 'rating',
+    'normal_chat_count', 'normal_video_count', 'instant_chat_count', 'instant_video_count',
+    'normal_earnings', 'instant_earnings', 'normal_rating', 'instant_rating',
+)
+
+
+def legacy_directory_stats(counsellors):
+    """The original per-counsellor loop from admin_counsellors_dashboard, kept for parity checks."""
+    counsellors = Counsellor.objects.filter(pk__in=[c.id for c in counsellors]).order_by('id').prefetch_related(
+        'counsellorbooking_set', 'counsellorbooking_set__counsellorreview'
+    )
+    counsellor_data = []
+    for c in counsellors:
+        bookings = c.counsellorbooking_set.all()
+        completed = [b for b in bookings if b.status == 'completed']
+        total_sessions = len(completed)
+        total_bookings = len(bookings)
+
+        def get_earnings(b):
+            if b.counsellor_earnings and b.counsellor_earnings > 0:
+                return b.counsellor_earnings
+            fee = b.total_fee if getattr(b, 'total_fee', None) else (b.counsellor.instant_session_fee if b.is_instant else b.counsellor.session_fee)
+            return round((fee or 0) * Decimal('0.90'), 2)
+
+        def ratings(rows):
+            values = [b.counsellorreview.rating for b in rows if hasattr(b, 'counsellorreview')]
+            return sum(values) / len(values) if values else 0
+
+        counsellor_data.append({
+            'obj': c,
+            'total_sessions': total_sessions,
+            'earnings': sum(get_earnings(b) for b in completed),
+            'pending_payout': sum(get_earnings(b) for b in completed if not b.is_settled and not b.is_disputed),
+            'completion_rate': (total_sessions / total_bookings * 100) if total_bookings > 0 else 0,
+            'rating': ratings(completed),
+            'normal_chat_count': sum(1 for b in completed if not b.is_instant and not b.include_video),
+            'normal_video_count': sum(1 for b in completed if not b.is_instant and b.include_video),
+            'instant_chat_count': sum(1 for b in completed if b.is_instant and not b.include_video),
+            'instant_video_count': sum(1 for b in completed if b.is_instant and b.include_video),
+            'normal_earnings': sum(get_earnings(b) for b in completed if not b.is_instant),
+            'instant_earnings': sum(get_earnings(b) for b in completed if b.is_instant),
+            'normal_rating': ratings(b for b in completed if not b.is_instant),
+            'instant_rating': ratings(b for b in completed if b.is_instant),
+        })
+    return counsellor_data
+
+
+def seed(counsellors, bookings_per_counsellor, seed_value):
+    """Synthetic counsellors with a mix of booking states, fees and reviews."""
+    rng = random.Random(seed_value)
+    patient = User.objects.create_user(f'directory-benchmark-{int(time.time())}', is_active=False)
+    created = Counsellor.objects.bulk_create([
+        Counsellor(
+            name=f'Benchmark Counsellor {i}', specialization='Benchmark', available_days='Mon,Tue,Wed,Thu,Fri',
+            available_time_start=dtime(9), available_time_end=dtime(17),
+            session_fee=rng.choice((300, 500, 800)), instant_session_fee=rng.choice((600, 900)),
+        )
+        for i in range(counsellors)
+    ])
+    start = date(2000, 1, 1)
+    bookings = []
+    for c in created:
+        for n in range(bookings_per_counsellor):
+            status = rng.choice(('completed', 'completed', 'completed', 'confirmed', 'cancelled'))
+            fee = Decimal(rng.choice((0, 302, 503, 903)))
+            bookings.append(CounsellorBooking(
+                user=patient, counsellor=c, status=status,
+                date=start + timedelta(days=n // 16), time_slot=dtime(9 + n % 16 // 2, 30 * (n % 2)),
+                is_instant=rng.random() < 0.3, include_video=rng.random() < 0.4,
+                total_fee=fee, counsellor_earnings=fee * Decimal('0.90') if rng.random() < 0.7 else 0,
+                is_settled=rng.random() < 0.5, is_disputed=rng.random() < 0.05,
+            ))
+    CounsellorBooking.objects.bulk_create(bookings, batch_size=1000)
+    completed = CounsellorBooking.objects.filter(counsellor__in=created, status='completed').values_list('id', flat=True)
+    CounsellorReview.objects.bulk_create([
+        CounsellorReview(booking_id=booking_id, user=patient, rating=rng.randint(1, 5))
+        for booking_id in completed if rng.random() < 0.6
+    ], batch_size=1000)
+    # bulk_create skips the receivers that keep CounsellorStats current.
+    rebuild_stats(c.id for c in created)
+    return created
+
+
+def stats_directory(counsellors):
+    """The directory as admin_counsellors_dashboard builds it: counsellors joined to their stats rows."""
+    page = Counsellor.objects.select_related('stats').filter(pk__in=[c.id for c in counsellors]).order_by('id')
+    return directory_stats(page)
+
+
+def timed(fn, counsellors, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            result = fn(counsellors)
+            best = min(best, time.perf_counter() - started)
+    return best, len(queries), result
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the admin counsellor directory (stats table) against the legacy loop on seeded data (rolled back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--counsellors', type=int, default=24)
+        parser.add_argument('--bookings', type=int, default=500, help='Bookings per counsellor.')
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counsellors = seed(options['counsellors'], options['bookings'], options['seed'])
+            self.stdout.write(f'Seeded {len(counsellors)} counsellors x {options["bookings"]} bookings')
+            legacy_time, legacy_queries, legacy = timed(legacy_directory_stats, counsellors, options['repeat'])
+            new_time, new_queries, new = timed(stats_directory, counsellors, options['repeat'])
+            transaction.set_rollback(True)
+
+        mismatches = [
+            (old['obj'].id, metric, old[metric], fresh[metric])
+            for old, fresh in zip(legacy, new)
+            for metric in METRICS
+            if abs(Decimal(str(old[metric])) - Decimal(str(fresh[metric]))) > Decimal('0.0001')
+        ]
+        self.stdout.write(f'Legacy loop: {legacy_time * 1000:.1f} ms, {legacy_queries} queries')
+        self.stdout.write(f'Stats table: {new_time * 1000:.1f} ms, {new_queries} queries')
+        if mismatches:
+            raise CommandError(f'{len(mismatches)} metric mismatches, e.g. {mismatches[:3]}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Outputs match. Speed-up: {legacy_time / new_time:.1f}x'
+        ))
@@ -0,0 +1,95 @@
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from Mind_Mend.trends import ASSESSMENT_METRICS, bucket_trends, empty_charts
+
+
+def legacy_bucket_trends(mood_rows, assessment_rows, end_date):
+    """The original day-by-day loop from analytics._generate_trend_charts, kept for parity checks."""
+    daily_data = defaultdict(lambda: {'phq9': None, 'gad7': None, 'pss': None, 'mood': []})
+    for d, mood in mood_rows:
+        daily_data[d]['mood'].append(mood)
+    for d, a_type, score in assessment_rows:
+        daily_data[d][a_type] = score
+
+    charts = empty_charts()
+    if not daily_data:
+        return charts
+
+    weekly_acc = defaultdict(lambda: {'phq9': [], 'gad7': [], 'pss': [], 'mood': []})
+    monthly_acc = defaultdict(lambda: {'phq9': [], 'gad7': [], 'pss': [], 'mood': []})
+    current = min(daily_data.keys())
+    while current <= end_date:
+        w_str = current.strftime('Week %V, %Y')
+        m_str = current.strftime('%b %Y')
+        charts['daily']['labels'].append(current.strftime('%Y-%m-%d'))
+        raw = daily_data.get(current, {'phq9': None, 'gad7': None, 'pss': None, 'mood': []})
+        values = {m: raw[m] for m in ASSESSMENT_METRICS}
+        values['mood'] = sum(raw['mood']) / len(raw['mood']) if raw['mood'] else None
+        for metric, value in values.items():
+            charts['daily'][metric].append(value)
+            if value is not None:
+                weekly_acc[w_str][metric].append(value)
+                monthly_acc[m_str][metric].append(value)
+        if w_str not in charts['weekly']['labels']:
+            charts['weekly']['labels'].append(w_str)
+        if m_str not in charts['monthly']['labels']:
+            charts['monthly']['labels'].append(m_str)
+        current += timedelta(days=1)
+
+    for period, acc in (('weekly', weekly_acc), ('monthly', monthly_acc)):
+        for label in charts[period]['labels']:
+            for metric, values in acc[label].items():
+                charts[period][metric].append(sum(values) / len(values) if values else None)
+    return charts
+
+
+def dense_year(end_date, moods_per_day, seed):
+    """One year of synthetic data: several moods a day and every assessment most days."""
+    rng = random.Random(seed)
+    mood_rows, assessment_rows = [], []
+    for offset in range(365, -1, -1):
+        day = end_date - timedelta(days=offset)
+        mood_rows.extend((day, rng.randint(1, 5)) for _ in range(moods_per_day))
+        for a_type, top in (('phq9', 27), ('gad7', 21), ('pss', 40)):
+            for _ in range(rng.choice((0, 1, 1, 2))):
+                assessment_rows.append((day, a_type, rng.randint(0, top)))
+    return mood_rows, assessment_rows
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the dashboard trend-chart engine against the legacy loop on one year of dense data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--moods-per-day', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=7)
+        parser.add_argument('--end-date', help='YYYY-MM-DD; defaults to today (try a date in early January).')
+
+    def handle(self, *args, **options):
+        if options['end_date']:
+            end_date = datetime.strptime(options['end_date'], '%Y-%m-%d').date()
+        else:
+            end_date = timezone.now().date()
+        mood_rows, assessment_rows = dense_year(end_date, options['moods_per_day'], options['seed'])
+        self.stdout.write(f'Rows: {len(mood_rows)} moods, {len(assessment_rows)} assessments, ending {end_date}')
+
+        timings = {}
+        results = {}
+        for name, fn in (('legacy', legacy_bucket_trends), ('vectorized', bucket_trends)):
+            start = time.perf_counter()
+            for _ in range(options['repeat']):
+                results[name] = fn(mood_rows, assessment_rows, end_date)
+            timings[name] = (time.perf_counter() - start) / options['repeat'] * 1000
+            self.stdout.write(f'{name:>10}: {timings[name]:.2f} ms per build')
+
+        if results['legacy'] != results['vectorized']:
+            raise CommandError('Output mismatch between legacy and vectorized engines.')
+        self.stdout.write(self.style.SUCCESS(
+            f'Outputs identical. Speed-up: {timings["legacy"] / timings["vectorized"]:.1f}x'
+        ))
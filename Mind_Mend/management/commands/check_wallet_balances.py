@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Mind_Mend.wallet import check_balances, repair_bonus_balances
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare every stored wallet and bonus balance with its ledger: cash against the cash wallet '
+        'transactions, bonus against the remaining bonus credits. Fails if any balance disagrees.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append',
+                            help='User id to check; repeat for several. Defaults to every user.')
+        parser.add_argument('--fix-bonus', action='store_true',
+                            help='Reset mismatched bonus balances to the remaining bonus credits.')
+
+    def handle(self, *args, **options):
+        mismatches = check_balances(options['user'])
+        for row in mismatches:
+            self.stdout.write(
+                f"user {row['user_id']}: cash ₹{row['wallet_balance']} (ledger ₹{row['ledger_cash']}), "
+                f"bonus ₹{row['bonus_balance']} (ledger ₹{row['ledger_bonus']})"
+            )
+        bonus_users = [row['user_id'] for row in mismatches if row['bonus_balance'] != row['ledger_bonus']]
+        if options['fix_bonus'] and bonus_users:
+            repaired = repair_bonus_balances(bonus_users)
+            self.stdout.write(self.style.SUCCESS(f'Bonus balances reset from credits: {repaired}'))
+            mismatches = check_balances([row['user_id'] for row in mismatches])
+        if mismatches:
+            raise CommandError(f'{len(mismatches)} balance(s) disagree with the ledger.')
+        self.stdout.write(self.style.SUCCESS('All wallet and bonus balances match the ledger.'))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from Mind_Mend.dispatch import dispatch
+
+
+class Command(BaseCommand):
+    help = (
+        'Match waiting instant-queue patients with available counsellors and expire requests that waited too long. '
+        'Run with --watch alongside the web server so patients are matched when a counsellor frees up.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true', help='Keep dispatching instead of exiting after one pass.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between passes with --watch.')
+
+    def handle(self, *args, **options):
+        while True:
+            assigned = dispatch()
+            if assigned or not options['watch']:
+                self.stdout.write(self.style.SUCCESS(f'Assigned {len(assigned)} waiting patient(s).'))
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from Mind_Mend.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, EXPORT_TABLES, default_format, export_table, pq
+
+
+class Command(BaseCommand):
+    help = 'Export mood, assessment and chat-sentiment rows to columnar files with pseudonymised user ids.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tables', nargs='+', choices=sorted(EXPORT_TABLES), default=sorted(EXPORT_TABLES))
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default=None,
+                            help='Defaults to parquet when pyarrow is installed, otherwise npz.')
+        parser.add_argument('--output-dir', default=str(settings.BASE_DIR / 'exports'))
+        parser.add_argument('--full', action='store_true', help='Export every row instead of only rows added since the last run.')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+        parser.add_argument('--database', default='default', help='Database alias to read from (e.g. a read replica).')
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or default_format()
+        if file_format == 'parquet' and pq is None:
+            raise CommandError('pyarrow is not installed; use --format npz')
+
+        for table in options['tables']:
+            run = export_table(
+                table, options['output_dir'], file_format=file_format, full=options['full'],
+                chunk_size=options['chunk_size'], using=options['database'],
+            )
+            if run is None:
+                self.stdout.write(f'{table}: no new rows')
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f'{table}: {run.rows} rows (ids {run.since_id + 1}-{run.last_id}) in {len(run.files)} file(s)'
+                ))
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Mind_Mend.fake_razorpay import FakeRazorpay
+
+
+class Command(BaseCommand):
+    help = (
+        'Serve a fake, in-memory Razorpay refunds API for local runs of the outbox worker. '
+        'Set RAZORPAY_API_BASE_URL to the printed URL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--fail-first', type=int, default=0, help='Answer the first N refund requests with a server error.')
+        parser.add_argument('--drop-first', type=int, default=0,
+                            help='Then record the next N refunds but drop the connection without answering.')
+        parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait before answering any request.')
+
+    def handle(self, *args, **options):
+        fake = FakeRazorpay(
+            settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET, port=options['port'],
+            fail_first=options['fail_first'], drop_first=options['drop_first'], latency=options['latency'], verbose=True,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Fake Razorpay listening on {fake.url} (Ctrl+C to stop)'))
+        try:
+            fake.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stdout.write(f'{len(fake.refunds)} refund(s) recorded from {fake.refund_requests} request(s).')
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from Mind_Mend.survey import ingest_survey, survey_csv_url
+
+
+class Command(BaseCommand):
+    help = 'Poll the survey responses CSV and fold new rows into the survey dashboard counters.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='', help='CSV URL or local file path (defaults to MINDMEND_GOOGLE_FORM_RESPONSES_CSV_URL).')
+        parser.add_argument('--force', action='store_true', help='Ignore the stored ETag/Last-Modified and refetch.')
+        parser.add_argument('--watch', action='store_true', help='Keep polling instead of exiting after one poll.')
+        parser.add_argument('--interval', type=float, default=60.0, help='Seconds between polls with --watch.')
+
+    def handle(self, *args, **options):
+        url = options['url'] or survey_csv_url()
+        if not url:
+            self.stdout.write(self.style.WARNING('No survey CSV configured.'))
+            return
+        force = options['force']
+        while True:
+            new_rows = ingest_survey(url, force=force)
+            self.stdout.write(self.style.SUCCESS(f'Survey poll complete. New rows: {new_rows}'))
+            if not options['watch']:
+                break
+            force = False
+            time.sleep(options['interval'])
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Mind_Mend.counsellor_stats import REBUILD_BATCH_SIZE, rebuild_stats
+from Mind_Mend.models import Counsellor
+
+
+class Command(BaseCommand):
+    help = 'Recompute CounsellorStats rows from bookings and reviews (run once after migrating, safe to re-run).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--counsellor', type=int, action='append',
+                            help='Counsellor id to rebuild; repeat for several. Defaults to every counsellor.')
+        parser.add_argument('--batch-size', type=int, default=REBUILD_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        ids = Counsellor.objects.order_by('id').values_list('id', flat=True)
+        if options['counsellor']:
+            ids = ids.filter(pk__in=options['counsellor'])
+            missing = set(options['counsellor']) - set(ids)
+            if missing:
+                raise CommandError(f'No counsellor with id {", ".join(map(str, sorted(missing)))}.')
+        ids = list(ids)
+
+        written = 0
+        for start in range(0, len(ids), options['batch_size']):
+            written += rebuild_stats(ids[start:start + options['batch_size']])
+        self.stdout.write(self.style.SUCCESS(f'Rebuild complete. Stats rows written: {written}'))
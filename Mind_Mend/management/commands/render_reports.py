@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from Mind_Mend.reports import process_pending_reports
+
+
+class Command(BaseCommand):
+    help = 'Render queued progress report PDFs. Run from cron, or with --watch as a long-lived worker.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Stop after rendering this many reports.')
+        parser.add_argument('--watch', action='store_true', help='Keep polling the queue instead of exiting when it is empty.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --watch.')
+
+    def handle(self, *args, **options):
+        while True:
+            handled = process_pending_reports(limit=options['limit'])
+            if handled:
+                ready = sum(1 for r in handled if r.status == 'ready')
+                self.stdout.write(self.style.SUCCESS(
+                    f'Rendered {ready} report(s); {len(handled) - ready} failed or queued for retry.'
+                ))
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from Mind_Mend.assessment_data import INSTRUMENTS, score_many
+from Mind_Mend.models import AssessmentResult, LatestAssessment, WellnessVersion
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored assessment totals and levels from saved answers (run after scoring rules change).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=sorted(INSTRUMENTS), action='append', dest='types',
+                            help='Only rescore this assessment type (repeatable; default: all).')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        for key in options['types'] or sorted(INSTRUMENTS):
+            checked = changed = invalid = 0
+            last_id = 0
+            while True:
+                rows = list(
+                    AssessmentResult.objects.filter(assessment_type=key, id__gt=last_id).order_by('id')
+                    .values_list('id', 'user_id', 'answers', 'total_score', 'result_level')[:batch_size]
+                )
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                totals, levels = score_many(key, [answers for _, _, answers, _, _ in rows])
+
+                updates, users = [], set()
+                for (pk, user_id, _, old_total, old_level), total, level in zip(rows, totals.tolist(), levels):
+                    if level is None:
+                        invalid += 1
+                    elif (total, level) != (old_total, old_level):
+                        updates.append(AssessmentResult(id=pk, total_score=total, result_level=level))
+                        users.add(user_id)
+                checked += len(rows)
+                changed += len(updates)
+
+                if updates and not dry_run:
+                    with transaction.atomic():
+                        AssessmentResult.objects.bulk_update(updates, ['total_score', 'result_level'])
+                        for user_id in users:
+                            LatestAssessment.rebuild(user_id)
+                            WellnessVersion.bump(user_id)
+
+            verb = 'would update' if dry_run else 'updated'
+            self.stdout.write(self.style.SUCCESS(
+                f'{INSTRUMENTS[key].name}: checked {checked}, {verb} {changed}, skipped {invalid} with incomplete answers.'
+            ))
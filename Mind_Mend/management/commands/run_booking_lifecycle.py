@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from Mind_Mend.booking_lifecycle import LIFECYCLE_BATCH_SIZE, next_transition_due, process_due_transitions
+from Mind_Mend.slot_holds import purge_past_holds
+from Mind_Mend.wallet import expire_bonus_credits
+
+
+class Command(BaseCommand):
+    help = ('Expire unpaid booking holds, auto-complete past sessions that are due, drop slot holds for past days '
+            'and expire lapsed bonus credits.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=LIFECYCLE_BATCH_SIZE)
+        parser.add_argument('--watch', action='store_true', help='Keep running, waking when the next transition is due.')
+        parser.add_argument('--interval', type=float, default=60.0,
+                            help='Longest sleep between passes with --watch, in seconds.')
+
+    def handle(self, *args, **options):
+        while True:
+            expired, completed = process_due_transitions(batch_size=options['batch_size'])
+            purged = purge_past_holds()
+            credits = expire_bonus_credits(batch_size=options['batch_size'])
+            if expired or completed or purged or credits or not options['watch']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Booking lifecycle pass complete. Expired holds: {expired}, completed sessions: {completed}, '
+                    f'past slot holds dropped: {purged}, bonus credits expired: {credits}'
+                ))
+            if not options['watch']:
+                break
+            due = next_transition_due()
+            wait = options['interval']
+            if due is not None:
+                wait = min(wait, max(1.0, (due - timezone.now()).total_seconds()))
+            time.sleep(wait)
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from Mind_Mend.outbox import process_outbox, purge_sent
+
+
+class Command(BaseCommand):
+    help = (
+        'Deliver queued Razorpay refunds, emails and live notifications from the outbox, retrying '
+        'failures with backoff. Run from cron, or with --watch as a long-lived worker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Stop after handling this many messages.')
+        parser.add_argument('--watch', action='store_true', help='Keep polling the outbox instead of exiting when it is empty.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --watch.')
+
+    def handle(self, *args, **options):
+        while True:
+            handled = process_outbox(limit=options['limit'])
+            if handled:
+                sent = sum(1 for m in handled if m.status == 'sent')
+                failed = sum(1 for m in handled if m.status == 'failed')
+                self.stdout.write(self.style.SUCCESS(
+                    f'Sent {sent} message(s); {len(handled) - sent - failed} queued for retry, {failed} failed for good.'
+                ))
+            purged = purge_sent()
+            if purged:
+                self.stdout.write(f'Purged {purged} old sent message(s).')
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
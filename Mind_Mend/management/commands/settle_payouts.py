@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from Mind_Mend.models import SettlementRun
+from Mind_Mend.settlements import bank_batch_rows, run_settlement
+
+
+class Command(BaseCommand):
+    help = (
+        'Settle cleared counsellor earnings and unpaid penalties in one bulk run and optionally write the '
+        'NEFT/UPI bank batch CSV. Re-running with the same --key returns the original run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--key', help='Idempotency key; defaults to one run per day and counsellor selection '
+                                 '(payouts-YYYY-MM-DD, or payouts-YYYY-MM-DD-c<id>-... with --counsellor).')
+        parser.add_argument('--counsellor', type=int, action='append',
+                            help='Counsellor id to settle; repeat for several. Defaults to every counsellor.')
+        parser.add_argument('--csv', help='Write the bank batch file for the run to this path.')
+
+    def handle(self, *args, **options):
+        key = options['key'] or '-'.join([
+            f'payouts-{timezone.localdate().isoformat()}',
+            *(f'c{cid}' for cid in sorted(set(options['counsellor'] or ()))),
+        ])
+        if len(key) > SettlementRun._meta.get_field('key').max_length:
+            raise CommandError('Too many --counsellor ids for the default key; pass --key.')
+        run, created = run_settlement(key, counsellor_ids=options['counsellor'])
+        if not created:
+            self.stdout.write(self.style.WARNING(f'Run #{run.id} ({key}) was already processed; nothing settled again.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Run #{run.id}: settled {run.bookings_settled} sessions for {run.counsellors_settled} counsellors, '
+                f'net ₹{run.net_amount_paid} after ₹{run.total_deductions} deductions, '
+                f'in {run.duration_ms} ms ({run.bookings_per_second:.0f} sessions/s).'
+            ))
+        if options['csv']:
+            with open(options['csv'], 'w', newline='') as f:
+                for line in bank_batch_rows(run):
+                    f.write(line)
+            self.stdout.write(f'Bank batch written to {options["csv"]}')
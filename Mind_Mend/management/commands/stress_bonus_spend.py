@@ -0,0 +1,82 @@
+import time as clock
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from Mind_Mend.models import BonusCredit, UserProfile
+from Mind_Mend.stress import race, unsupported_database
+from Mind_Mend.wallet import check_balances, grant_bonus, lock_balances, spend
+
+
+def checkout_race(user, buyers, price):
+    """`buyers` checkouts pay `price` from the same bonus balance at once; returns (paid, errors)."""
+    def checkout(_):
+        with transaction.atomic():
+            profile = lock_balances(user.id)
+            if profile.bonus_balance >= price:
+                spend(user.id, bonus=price)
+                return price
+        return None
+
+    return race(checkout, range(buyers))
+
+
+class Command(BaseCommand):
+    help = (
+        'Race many simultaneous checkouts paying from one bonus balance and check no credit is spent twice '
+        'or lost. Run against the production database engine (PostgreSQL/MySQL); skipped on SQLite, which serialises writers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buyers', type=int, default=50)
+        parser.add_argument('--rounds', type=int, default=10)
+        parser.add_argument('--credits', type=int, default=12, help='Bonus credits granted per round.')
+        parser.add_argument('--price', type=Decimal, default=Decimal('35.00'))
+
+    def handle(self, *args, **options):
+        reason = unsupported_database()
+        if reason:
+            self.stdout.write(self.style.WARNING(f'Skipped: {reason}'))
+            return
+        price = options['price']
+        user = User.objects.create_user(f'bonus-stress-{int(clock.time())}', is_active=False)
+        failures = 0
+        try:
+            started = clock.perf_counter()
+            for n in range(options['rounds']):
+                # Credits of uneven sizes and expiries so most checkouts straddle several of them.
+                now = timezone.now()
+                for i in range(options['credits']):
+                    grant_bonus(user.id, Decimal(10 + 7 * i % 40), now=now - timedelta(days=i))
+                before = UserProfile.objects.get(user=user).bonus_balance
+                paid, errors = checkout_race(user, options['buyers'], price)
+                after = UserProfile.objects.get(user=user).bonus_balance
+                ledger = BonusCredit.objects.filter(user=user).aggregate(total=Sum('remaining_amount'))['total']
+                overdrawn = BonusCredit.objects.filter(user=user, remaining_amount__lt=0).count()
+                expected = min(options['buyers'], int(before // price))
+                ok = (
+                    not errors and len(paid) == expected and after == before - sum(paid, Decimal('0.00'))
+                    and ledger == after and not overdrawn and not check_balances([user.id])
+                )
+                failures += not ok
+                self.stdout.write(
+                    f'Round {n + 1}: ₹{before} → ₹{after} over {len(paid)} checkout(s) (expected {expected}), '
+                    f'credits hold ₹{ledger}, {overdrawn} overdrawn, {len(errors)} error(s)'
+                    + ('' if ok else f' — {errors[:1]}')
+                )
+            elapsed = clock.perf_counter() - started
+        finally:
+            user.delete()
+
+        attempts = options['rounds'] * options['buyers']
+        if failures:
+            raise CommandError(f'{failures} of {options["rounds"]} rounds failed a checkout or lost or double-spent bonus credit.')
+        self.stdout.write(self.style.SUCCESS(
+            f'{attempts} checkouts over {options["rounds"]} rounds in {elapsed:.2f}s; '
+            f'every rupee of bonus was spent exactly once.'
+        ))
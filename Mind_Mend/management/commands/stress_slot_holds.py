@@ -0,0 +1,80 @@
+import time as clock
+from datetime import time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from Mind_Mend.models import Counsellor, CounsellorBooking, SlotHold
+from Mind_Mend.slot_holds import reserve_slot
+from Mind_Mend.stress import race, unsupported_database
+
+
+def race_for_slot(users, counsellor, day, slot):
+    """Every user tries to reserve the same slot at once; returns (winners, errors)."""
+    def book(user):
+        draft = CounsellorBooking(counsellor=counsellor, date=day, time_slot=slot, total_fee=1)
+        return user.id if reserve_slot(user, draft) is not None else None
+
+    return race(book, users)
+
+
+class Command(BaseCommand):
+    help = (
+        'Race many simultaneous bookers for the same slots and check each slot is held by exactly one. '
+        'Run against the production database engine (PostgreSQL/MySQL); skipped on SQLite, which serialises writers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookers', type=int, default=50)
+        parser.add_argument('--rounds', type=int, default=10)
+        parser.add_argument('--counsellor', type=int, help='Counsellor id; defaults to the first active counsellor.')
+
+    def handle(self, *args, **options):
+        reason = unsupported_database()
+        if reason:
+            self.stdout.write(self.style.WARNING(f'Skipped: {reason}'))
+            return
+        counsellor = Counsellor.objects.filter(is_active=True, **(
+            {'pk': options['counsellor']} if options['counsellor'] else {}
+        )).first()
+        if counsellor is None:
+            raise CommandError('No active counsellor to book against.')
+
+        stamp = int(clock.time())
+        users = [
+            User.objects.create_user(f'slothold-stress-{stamp}-{i}', is_active=False)
+            for i in range(options['bookers'])
+        ]
+        # A day far enough ahead that no real patient is booking it.
+        day = timezone.localdate() + timedelta(days=400)
+        failures = 0
+        try:
+            started = clock.perf_counter()
+            for n in range(options['rounds']):
+                slot = time(n // 2, 30 * (n % 2))
+                winners, errors = race_for_slot(users, counsellor, day, slot)
+                # Let the winner's hold lapse, then race again for the take-over path.
+                SlotHold.objects.filter(counsellor=counsellor, date=day, time_slot=slot).update(
+                    expires_at=timezone.now() - timedelta(seconds=1)
+                )
+                takeover, takeover_errors = race_for_slot(users, counsellor, day, slot)
+                ok = len(winners) == 1 and len(takeover) == 1 and not errors and not takeover_errors
+                failures += not ok
+                self.stdout.write(
+                    f'Slot {slot:%H:%M}: {len(winners)} winner(s), {len(takeover)} after expiry, '
+                    f'{len(errors) + len(takeover_errors)} error(s)'
+                    + ('' if ok else f' — {(errors + takeover_errors)[:1]}')
+                )
+            elapsed = clock.perf_counter() - started
+        finally:
+            SlotHold.objects.filter(counsellor=counsellor, date=day).delete()
+            User.objects.filter(pk__in=[u.pk for u in users]).delete()
+
+        attempts = options['rounds'] * 2 * options['bookers']
+        if failures:
+            raise CommandError(f'{failures} of {options["rounds"]} slots did not end with exactly one holder.')
+        self.stdout.write(self.style.SUCCESS(
+            f'{attempts} reservation attempts over {options["rounds"]} slots in {elapsed:.2f}s; '
+            f'every slot had exactly one holder.'
+        ))
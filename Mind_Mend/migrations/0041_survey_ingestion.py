@@ -0,0 +1,42 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mind_Mend', '0040_progressreport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveySource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.CharField(max_length=500, unique=True)),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('last_modified', models.CharField(blank=True, max_length=100)),
+                ('headers', models.JSONField(blank=True, default=list)),
+                ('header_fingerprint', models.CharField(blank=True, max_length=64)),
+                ('rows_ingested', models.PositiveIntegerField(default=0)),
+                ('last_polled_at', models.DateTimeField(blank=True, null=True)),
+                ('last_changed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.CharField(blank=True, max_length=500)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SurveyAnswerCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('column', models.PositiveSmallIntegerField()),
+                ('answer', models.CharField(max_length=255)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answer_counts', to='Mind_Mend.surveysource')),
+            ],
+            options={
+                'unique_together': {('source', 'column', 'answer')},
+            },
+        ),
+    ]
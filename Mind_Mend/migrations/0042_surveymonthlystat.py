@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mind_Mend', '0041_survey_ingestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyMonthlyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('stress_total', models.FloatField(default=0)),
+                ('stress_responses', models.PositiveIntegerField(default=0)),
+                ('causes', models.JSONField(blank=True, default=dict)),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_stats', to='Mind_Mend.surveysource')),
+            ],
+            options={
+                'ordering': ['month'],
+                'unique_together': {('source', 'month')},
+            },
+        ),
+    ]
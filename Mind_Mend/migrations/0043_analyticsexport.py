@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mind_Mend', '0042_surveymonthlystat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsExport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(db_index=True, max_length=30)),
+                ('file_format', models.CharField(max_length=10)),
+                ('since_id', models.PositiveBigIntegerField(default=0)),
+                ('last_id', models.PositiveBigIntegerField(default=0)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('files', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:05
+
+from datetime import datetime, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def schedule_open_bookings(apps, schema_editor):
+    CounsellorBooking = apps.get_model('Mind_Mend', 'CounsellorBooking')
+    bookings = []
+    for booking in CounsellorBooking.objects.filter(status__in=['pending', 'confirmed']).iterator():
+        if booking.status == 'pending':
+            booking.next_transition_at = booking.created_at + timedelta(minutes=15)
+        else:
+            start = datetime.combine(booking.date, booking.time_slot)
+            if timezone.is_naive(start):
+                start = timezone.make_aware(start)
+            booking.next_transition_at = start + timedelta(hours=24)
+        bookings.append(booking)
+    CounsellorBooking.objects.bulk_update(bookings, ['next_transition_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mind_Mend', '0044_latestassessment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='counsellorbooking',
+            name='next_transition_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(schedule_open_bookings, migrations.RunPython.noop),
+    ]
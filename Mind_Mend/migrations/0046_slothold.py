@@ -0,0 +1,42 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:30
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mind_Mend', '0045_counsellorbooking_next_transition_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, unique=True)),
+                ('date', models.DateField()),
+                ('time_slot', models.TimeField()),
+                ('reserved_at', models.DateTimeField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('is_instant', models.BooleanField(default=False)),
+                ('is_anonymous', models.BooleanField(default=False)),
+                ('notes', models.TextField(blank=True)),
+                ('include_chat', models.BooleanField(default=True)),
+                ('include_video', models.BooleanField(default=False)),
+                ('chat_fee', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('video_fee', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('platform_fee', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('total_fee', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('counsellor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='Mind_Mend.counsellor')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_holds', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('counsellor', 'date', 'time_slot')},
+            },
+        ),
+    ]
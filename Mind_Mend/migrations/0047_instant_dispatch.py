@@ -0,0 +1,47 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mind_Mend', '0046_slothold'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='counsellornotification',
+            name='event_type',
+            field=models.CharField(choices=[('booking_created', 'New booking'), ('chat_started', 'Chat started'), ('message_received', 'New message'), ('booking_status', 'Booking status changed'), ('instant_assigned', 'Instant patient assigned')], max_length=30),
+        ),
+        migrations.CreateModel(
+            name='CounsellorPresence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('connections', models.PositiveIntegerField(default=0)),
+                ('last_seen_at', models.DateTimeField(blank=True, null=True)),
+                ('counsellor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='presence', to='Mind_Mend.counsellor')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='InstantRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('include_chat', models.BooleanField(default=True)),
+                ('include_video', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('waiting', 'Waiting'), ('assigned', 'Assigned'), ('expired', 'Expired'), ('cancelled', 'Cancelled')], db_index=True, default='waiting', max_length=20)),
+                ('hold_token', models.UUIDField(blank=True, help_text='SlotHold reserved for the patient on assignment', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('assigned_at', models.DateTimeField(blank=True, null=True)),
+                ('counsellor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='Mind_Mend.counsellor')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='instant_requests', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mind_Mend', '0047_instant_dispatch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CounsellorStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_bookings', models.PositiveIntegerField(default=0)),
+                ('pending_bookings', models.PositiveIntegerField(default=0)),
+                ('completed_sessions', models.PositiveIntegerField(default=0)),
+                ('normal_chat_count', models.PositiveIntegerField(default=0)),
+                ('normal_video_count', models.PositiveIntegerField(default=0)),
+                ('instant_chat_count', models.PositiveIntegerField(default=0)),
+                ('instant_video_count', models.PositiveIntegerField(default=0)),
+                ('earnings', models.DecimalField(decimal_places=2, default=0, help_text='Earnings from completed sessions', max_digits=12)),
+                ('normal_chat_earnings', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('normal_video_earnings', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('instant_chat_earnings', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('instant_video_earnings', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('unsettled_earnings', models.DecimalField(decimal_places=2, default=0, help_text='Completed, not yet settled', max_digits=12)),
+                ('pending_payout', models.DecimalField(decimal_places=2, default=0, help_text='Unsettled and not disputed', max_digits=12)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('avg_rating', models.FloatField(blank=True, null=True)),
+                ('normal_rating', models.FloatField(blank=True, null=True)),
+                ('instant_rating', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('counsellor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='Mind_Mend.counsellor')),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mind_Mend', '0048_counsellor_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyFinancials',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('bookings_created', models.PositiveIntegerField(default=0)),
+                ('sessions_completed', models.PositiveIntegerField(default=0)),
+                ('gross_revenue', models.DecimalField(decimal_places=2, default=0, help_text='Fees of sessions completed that day', max_digits=12)),
+                ('counsellor_earnings', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('platform_revenue', models.DecimalField(decimal_places=2, default=0, help_text='Fees net of counsellor earnings', max_digits=12)),
+                ('refunds', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('compensation', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('cancellations', models.PositiveIntegerField(default=0)),
+                ('penalties', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('settlements', models.PositiveIntegerField(default=0)),
+                ('payouts_gross', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('payouts_net', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['day'],
+            },
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:35
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+
+def backfill_earnings(apps, schema_editor):
+    """Store earnings on completed sessions that never had them, as the earnings dashboard
+    used to on every page view: 90% of the fee, falling back to the counsellor's rate."""
+    CounsellorBooking = apps.get_model('Mind_Mend', 'CounsellorBooking')
+    bookings = []
+    missing = CounsellorBooking.objects.filter(
+        Q(counsellor_earnings__isnull=True) | Q(counsellor_earnings=0), status='completed',
+    ).select_related('counsellor')
+    for booking in missing.iterator(chunk_size=500):
+        fee = booking.total_fee or (
+            booking.counsellor.instant_session_fee if booking.is_instant else booking.counsellor.session_fee
+        )
+        earned = round((fee or 0) * Decimal('0.90'), 2)
+        if earned > 0:
+            booking.counsellor_earnings = earned
+            bookings.append(booking)
+    CounsellorBooking.objects.bulk_update(bookings, ['counsellor_earnings'], batch_size=500)
+
+
+def fill_balances(apps, schema_editor):
+    CounsellorBooking = apps.get_model('Mind_Mend', 'CounsellorBooking')
+    BookingCancellation = apps.get_model('Mind_Mend', 'BookingCancellation')
+    CounsellorStats = apps.get_model('Mind_Mend', 'CounsellorStats')
+    settled = dict(
+        CounsellorBooking.objects.filter(status='completed', is_settled=True)
+        .values('counsellor_id').annotate(total=Sum('counsellor_earnings')).values_list('counsellor_id', 'total')
+    )
+    penalties = dict(
+        BookingCancellation.objects.exclude(refund_status='Settled')
+        .values('counsellor_id').annotate(total=Sum('counsellor_penalty')).values_list('counsellor_id', 'total')
+    )
+    rows = list(CounsellorStats.objects.filter(counsellor_id__in=set(settled) | set(penalties)))
+    for stats in rows:
+        stats.settled_earnings = settled.get(stats.counsellor_id) or 0
+        stats.unsettled_penalties = penalties.get(stats.counsellor_id) or 0
+    CounsellorStats.objects.bulk_update(rows, ['settled_earnings', 'unsettled_penalties'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mind_Mend', '0050_settlement_runs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='counsellorstats',
+            name='settled_earnings',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Completed and paid out', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='counsellorstats',
+            name='unsettled_penalties',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Cancellation penalties not yet deducted', max_digits=12),
+        ),
+        migrations.RunPython(backfill_earnings, migrations.RunPython.noop),
+        migrations.RunPython(fill_balances, migrations.RunPython.noop),
+    ]
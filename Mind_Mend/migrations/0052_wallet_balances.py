@@ -0,0 +1,49 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:00
+
+from django.db import migrations, models
+from django.db.models import DecimalField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def mark_bonus_transactions(apps, schema_editor):
+    """Tag existing bonus movements, which were only told apart from cash by type or description."""
+    WalletTransaction = apps.get_model('Mind_Mend', 'WalletTransaction')
+    WalletTransaction.objects.filter(
+        Q(transaction_type__in=('compensation', 'expired'))
+        | Q(description__startswith='Bonus used')
+        | Q(description__contains='(Bonus)')
+    ).update(bucket='bonus')
+
+
+def fill_bonus_balances(apps, schema_editor):
+    """Bonus balances now include credits past expiry until the sweep expires them, matching the ledger."""
+    BonusCredit = apps.get_model('Mind_Mend', 'BonusCredit')
+    UserProfile = apps.get_model('Mind_Mend', 'UserProfile')
+    money = DecimalField(max_digits=10, decimal_places=2)
+    remaining = (
+        BonusCredit.objects.filter(user=OuterRef('user'), remaining_amount__gt=0)
+        .values('user').annotate(total=Sum('remaining_amount')).values('total')
+    )
+    UserProfile.objects.update(bonus_balance=Coalesce(Subquery(remaining, output_field=money), Value(0), output_field=money))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mind_Mend', '0051_earnings_balances'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wallettransaction',
+            name='bucket',
+            field=models.CharField(choices=[('cash', 'Cash'), ('bonus', 'Bonus Credits')], default='cash', help_text='Which balance the amount moved', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='bonuscredit',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.RunPython(mark_bonus_transactions, migrations.RunPython.noop),
+        migrations.RunPython(fill_bonus_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mind_Mend', '0053_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='progressreport',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='A failed render is not retried before this'),
+        ),
+    ]
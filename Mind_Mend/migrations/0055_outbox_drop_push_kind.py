@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:55
+
+from django.db import migrations, models
+
+
+def drop_push_messages(apps, schema_editor):
+    # Live pushes are now sent best-effort on commit rather than through the outbox.
+    apps.get_model('Mind_Mend', 'OutboxMessage').objects.filter(kind='counsellor_push').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mind_Mend', '0054_progressreport_next_attempt_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_push_messages, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='outboxmessage',
+            name='kind',
+            field=models.CharField(choices=[('razorpay_refund', 'Razorpay Refund'), ('email', 'Email')], max_length=20),
+        ),
+    ]
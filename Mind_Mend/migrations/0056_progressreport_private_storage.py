@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-19 18:10
+
+import Mind_Mend.models
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+def drop_public_reports(apps, schema_editor):
+    # Rendered PDFs used to live under the public MEDIA_ROOT; delete them and let the jobs
+    # re-render into private storage on the next download.
+    ProgressReport = apps.get_model('Mind_Mend', 'ProgressReport')
+    for name in ProgressReport.objects.exclude(file='').values_list('file', flat=True):
+        default_storage.delete(name)
+    ProgressReport.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mind_Mend', '0055_outbox_drop_push_kind'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_public_reports, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='progressreport',
+            name='file',
+            field=models.FileField(blank=True, storage=Mind_Mend.models.report_storage, upload_to=Mind_Mend.models.report_upload_path),
+        ),
+    ]
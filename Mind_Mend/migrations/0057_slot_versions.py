@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-19 18:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mind_Mend', '0056_progressreport_private_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('counsellor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_versions', to='Mind_Mend.counsellor')),
+            ],
+            options={
+                'unique_together': {('counsellor', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-19 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mind_Mend', '0057_slot_versions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bookingcancellation',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='counsellorbooking',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='When the session was marked as completed', null=True),
+        ),
+        migrations.AlterField(
+            model_name='counsellorbooking',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='payoutsettlement',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='wallettransaction',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
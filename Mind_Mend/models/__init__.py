@@ -1,8 +1,12 @@
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
 from decimal import Decimal
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth.models import User
 from django.utils import timezone
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from ..encryption import EncryptedTextField
 
@@ -45,9 +49,21 @@ class UserProfile(models.Model):
     )
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Balances only move through the F() updates in Mind_Mend.wallet; a plain save() of a
+    # profile loaded earlier must not write its stale copy back over them.
+    BALANCE_FIELDS = ('wallet_balance', 'bonus_balance')
+
     def __str__(self):
         return f"Profile({self.user.username})"
 
+    def save(self, *args, **kwargs):
+        if self.pk and not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.BALANCE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     def display_name(self):
         """Returns display identity: real name (if show_real_name), username (if show_username), else Anonymous."""
         if not self.show_username:
@@ -127,8 +143,21 @@ class Counsellor(models.Model):
         return self.name
 
 
+class CounsellorBookingQuerySet(models.QuerySet):
+    def holding_slot(self, now=None):
+        """Bookings that still block their time slot; unpaid holds past their deadline do not."""
+        return self.exclude(status='cancelled').exclude(
+            status='pending', next_transition_at__lte=now or timezone.now()
+        )
+
+
 class CounsellorBooking(models.Model):
     """Counsellor appointment bookings."""
+    # Unpaid 'pending' bookings release their slot after PENDING_HOLD; 'confirmed'
+    # bookings auto-complete AUTO_COMPLETE_AFTER their scheduled start.
+    PENDING_HOLD = timedelta(minutes=15)
+    AUTO_COMPLETE_AFTER = timedelta(hours=24)
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     counsellor = models.ForeignKey(Counsellor, on_delete=models.CASCADE)
     date = models.DateField()
@@ -177,7 +206,7 @@ class CounsellorBooking(models.Model):
     # Counsellor Payouts
     is_settled = models.BooleanField(default=False, help_text="Has MindMend paid the counsellor for this session?")
     counsellor_earnings = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, help_text="Total fee minus platform commission")
-    completed_at = models.DateTimeField(null=True, blank=True, help_text="When the session was marked as completed")
+    completed_at = models.DateTimeField(null=True, blank=True, db_index=True, help_text="When the session was marked as completed")
     completion_reminder_sent = models.BooleanField(default=False)
     payout_settlement = models.ForeignKey('PayoutSettlement', on_delete=models.SET_NULL, null=True, blank=True, related_name='settled_bookings')
     
@@ -200,8 +229,36 @@ class CounsellorBooking(models.Model):
         return timezone.now() <= self.completed_at + datetime.timedelta(hours=24)
     
     razorpay_payment_id = models.CharField(max_length=100, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Due-queue for the booking lifecycle scheduler (see Mind_Mend.booking_lifecycle).
+    next_transition_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    objects = CounsellorBookingQuerySet.as_manager()
+
+    def scheduled_start(self):
+        start = datetime.combine(
+            self._meta.get_field('date').to_python(self.date),
+            self._meta.get_field('time_slot').to_python(self.time_slot),
+        )
+        return timezone.make_aware(start) if timezone.is_naive(start) else start
+
+    def compute_next_transition(self):
+        if self.status == 'pending':
+            return (self.created_at or timezone.now()) + self.PENDING_HOLD
+        if self.status == 'confirmed':
+            return self.scheduled_start() + self.AUTO_COMPLETE_AFTER
+        return None
+
+    def is_hold_expired(self, now=None):
+        return self.status == 'pending' and self.compute_next_transition() <= (now or timezone.now())
+
+    def save(self, *args, **kwargs):
+        self.next_transition_at = self.compute_next_transition()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'next_transition_at' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'next_transition_at']
+        super().save(*args, **kwargs)
 
     def patient_display_name(self):
         """Returns the patient's name shown to counsellors.
@@ -219,6 +276,107 @@ class CounsellorBooking(models.Model):
         unique_together = ['counsellor', 'date', 'time_slot']
         ordering = ['date', 'time_slot']
 
+
+class SlotHold(models.Model):
+    """Short-lived claim on a counsellor slot while the patient pays (see Mind_Mend.slot_holds).
+    One row per slot: an expired hold is taken over in place rather than deleted, and the
+    row is replaced by a CounsellorBooking once payment succeeds."""
+    TTL = CounsellorBooking.PENDING_HOLD
+    # Draft booking fields carried from the booking form to the booking created on payment.
+    BOOKING_FIELDS = (
+        'is_instant', 'is_anonymous', 'notes', 'include_chat', 'include_video',
+        'chat_fee', 'video_fee', 'platform_fee', 'total_fee',
+    )
+
+    token = models.UUIDField(default=uuid.uuid4, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='slot_holds')
+    counsellor = models.ForeignKey(Counsellor, on_delete=models.CASCADE)
+    date = models.DateField()
+    time_slot = models.TimeField()
+    reserved_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    is_instant = models.BooleanField(default=False)
+    is_anonymous = models.BooleanField(default=False)
+    notes = models.TextField(blank=True)
+    include_chat = models.BooleanField(default=True)
+    include_video = models.BooleanField(default=False)
+    chat_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    video_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    platform_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    total_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+
+    def is_expired(self, now=None):
+        return self.expires_at <= (now or timezone.now())
+
+    def __str__(self):
+        return f"Hold {self.counsellor_id} {self.date} {self.time_slot} by {self.user_id}"
+
+    class Meta:
+        unique_together = ['counsellor', 'date', 'time_slot']
+
+
+class SlotVersion(models.Model):
+    """Per counsellor-day counter bumped whenever a booking or slot hold on that day changes.
+
+    The cached booked-slot mask (see Mind_Mend.availability) embeds the version in its key,
+    so a bump invalidates it on every worker without deleting anything.
+    """
+    counsellor = models.ForeignKey(Counsellor, on_delete=models.CASCADE, related_name='slot_versions')
+    date = models.DateField()
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['counsellor', 'date']
+
+    def __str__(self):
+        return f"SlotVersion({self.counsellor_id} {self.date}: {self.version})"
+
+    @classmethod
+    def current(cls, counsellor_id, day):
+        # The row is created on first read, so any cached mask always has a row to bump.
+        return cls.objects.get_or_create(counsellor_id=counsellor_id, date=day)[0].version
+
+    @classmethod
+    def bump(cls, counsellor_id, day):
+        # Update-only, like WellnessVersion.bump: with no row yet nothing is cached.
+        cls.objects.filter(counsellor_id=counsellor_id, date=day).update(
+            version=F('version') + 1, updated_at=timezone.now(),
+        )
+
+
+class CounsellorPresence(models.Model):
+    """Open DoctorNotificationConsumer connections per counsellor; feeds the instant dispatcher."""
+    counsellor = models.OneToOneField(Counsellor, on_delete=models.CASCADE, related_name='presence')
+    connections = models.PositiveIntegerField(default=0)
+    last_seen_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.counsellor_id}: {self.connections} connection(s)"
+
+
+class InstantRequest(models.Model):
+    """A patient waiting for the next available counsellor (see Mind_Mend.dispatch)."""
+    STATUS_CHOICES = [
+        ('waiting', 'Waiting'),
+        ('assigned', 'Assigned'),
+        ('expired', 'Expired'),
+        ('cancelled', 'Cancelled'),
+    ]
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='instant_requests')
+    include_chat = models.BooleanField(default=True)
+    include_video = models.BooleanField(default=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='waiting', db_index=True)
+    counsellor = models.ForeignKey(Counsellor, on_delete=models.SET_NULL, null=True, blank=True)
+    hold_token = models.UUIDField(null=True, blank=True, help_text="SlotHold reserved for the patient on assignment")
+    created_at = models.DateTimeField(auto_now_add=True)
+    assigned_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+
 class SessionDispute(models.Model):
     """Tracks disputes raised by patients against completed sessions."""
     OUTCOME_CHOICES = [
@@ -245,12 +403,17 @@ class WalletTransaction(models.Model):
         ('refund', 'Refund Credit'),
         ('expired', 'Expired Bonus'),
     ]
+    BUCKETS = [
+        ('cash', 'Cash'),
+        ('bonus', 'Bonus Credits'),
+    ]
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='wallet_transactions')
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     transaction_type = models.CharField(max_length=50, choices=TRANSACTION_TYPES)
+    bucket = models.CharField(max_length=10, choices=BUCKETS, default='cash', help_text="Which balance the amount moved")
     description = models.CharField(max_length=255)
     reference_id = models.CharField(max_length=100, blank=True, help_text="e.g., Razorpay payment ID or booking ID")
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         ordering = ['-created_at']
@@ -259,12 +422,13 @@ class WalletTransaction(models.Model):
         return f"{self.user.username} - {self.transaction_type} - ₹{self.amount}"
 
 class BonusCredit(models.Model):
-    """Tracks individual bonus credit grants and their expiry dates."""
+    """Tracks individual bonus credit grants and their expiry dates. The remaining amounts are the
+    ledger behind UserProfile.bonus_balance (see Mind_Mend.wallet)."""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bonus_credits')
     initial_amount = models.DecimalField(max_digits=10, decimal_places=2)
     remaining_amount = models.DecimalField(max_digits=10, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
-    expires_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
     
     class Meta:
         ordering = ['expires_at']
@@ -272,6 +436,38 @@ class BonusCredit(models.Model):
     def __str__(self):
         return f"Bonus: ₹{self.remaining_amount} remaining (Expires: {self.expires_at})"
 
+class OutboxMessage(models.Model):
+    """An external call (Razorpay refund, email) recorded in the same transaction as the
+    change that needs it and delivered afterwards, with retries, by the outbox worker
+    (see Mind_Mend.outbox)."""
+    KIND_CHOICES = [
+        ('razorpay_refund', 'Razorpay Refund'),
+        ('email', 'Email'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    key = models.CharField(max_length=40, unique=True, help_text="Idempotency key; sent to Razorpay as the refund receipt")
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+    last_error = models.CharField(max_length=500, blank=True)
+    result = models.JSONField(default=dict, blank=True, help_text="e.g. the Razorpay refund id")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"{self.kind} {self.key} ({self.status})"
+
 class CounsellorBankDetails(models.Model):
     counsellor = models.OneToOneField(Counsellor, on_delete=models.CASCADE, related_name='bank_details')
     account_holder_name = models.CharField(max_length=100)
@@ -283,15 +479,40 @@ class CounsellorBankDetails(models.Model):
     def __str__(self):
         return f"Bank Details for {self.counsellor.name}"
 
+class SettlementRun(models.Model):
+    """One bulk payout run over one or many counsellors. The key makes a retried run return
+    the original instead of settling again (see Mind_Mend.settlements)."""
+    key = models.CharField(max_length=64, unique=True)
+    started_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='settlement_runs')
+    cutoff = models.DateTimeField(help_text="Sessions completed at or before this time were eligible")
+    counsellors_settled = models.PositiveIntegerField(default=0)
+    bookings_settled = models.PositiveIntegerField(default=0)
+    gross_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_deductions = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    net_amount_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    duration_ms = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    @property
+    def bookings_per_second(self):
+        return self.bookings_settled / (self.duration_ms / 1000) if self.duration_ms else 0
+
+    def __str__(self):
+        return f"Settlement run {self.id} - {self.counsellors_settled} counsellors - ₹{self.net_amount_paid}"
+
 class PayoutSettlement(models.Model):
     """Tracks historical payouts settled to counsellors."""
     counsellor = models.ForeignKey(Counsellor, on_delete=models.CASCADE, related_name='settlements')
     settled_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='processed_settlements')
+    run = models.ForeignKey(SettlementRun, on_delete=models.SET_NULL, null=True, blank=True, related_name='settlements')
     gross_amount = models.DecimalField(max_digits=10, decimal_places=2)
     total_deductions = models.DecimalField(max_digits=10, decimal_places=2)
     net_amount_paid = models.DecimalField(max_digits=10, decimal_places=2)
     bank_reference_id = models.CharField(max_length=100, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         ordering = ['-created_at']
@@ -309,7 +530,7 @@ class BookingCancellation(models.Model):
     counsellor_penalty = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, help_text="Fine deducted from counsellor's payout")
     refund_status = models.CharField(max_length=20, default='Pending')
     payout_settlement = models.ForeignKey(PayoutSettlement, on_delete=models.SET_NULL, null=True, blank=True, related_name='settled_cancellations')
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         ordering = ['-created_at']
@@ -360,6 +581,7 @@ class CounsellorNotification(models.Model):
         ('chat_started', 'Chat started'),
         ('message_received', 'New message'),
         ('booking_status', 'Booking status changed'),
+        ('instant_assigned', 'Instant patient assigned'),
     ]
     counsellor = models.ForeignKey(Counsellor, on_delete=models.CASCADE)
     booking = models.ForeignKey(CounsellorBooking, on_delete=models.CASCADE, null=True, blank=True)
@@ -389,6 +611,74 @@ class CounsellorReview(models.Model):
         ordering = ['-created_at']
 
 
+class CounsellorStats(models.Model):
+    """Denormalized per-counsellor totals and earnings balances, rebuilt in the same transaction
+    as any booking, review, cancellation or settlement change (see Mind_Mend.counsellor_stats)."""
+    counsellor = models.OneToOneField(Counsellor, on_delete=models.CASCADE, related_name='stats')
+    total_bookings = models.PositiveIntegerField(default=0)
+    pending_bookings = models.PositiveIntegerField(default=0)
+    completed_sessions = models.PositiveIntegerField(default=0)
+    normal_chat_count = models.PositiveIntegerField(default=0)
+    normal_video_count = models.PositiveIntegerField(default=0)
+    instant_chat_count = models.PositiveIntegerField(default=0)
+    instant_video_count = models.PositiveIntegerField(default=0)
+    earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Earnings from completed sessions")
+    normal_chat_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    normal_video_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    instant_chat_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    instant_video_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    unsettled_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Completed, not yet settled")
+    pending_payout = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Unsettled and not disputed")
+    settled_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Completed and paid out")
+    unsettled_penalties = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Cancellation penalties not yet deducted")
+    review_count = models.PositiveIntegerField(default=0)
+    avg_rating = models.FloatField(null=True, blank=True)
+    normal_rating = models.FloatField(null=True, blank=True)
+    instant_rating = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def normal_earnings(self):
+        return self.normal_chat_earnings + self.normal_video_earnings
+
+    @property
+    def instant_earnings(self):
+        return self.instant_chat_earnings + self.instant_video_earnings
+
+    @property
+    def completion_rate(self):
+        """Completed sessions as a percentage of all bookings."""
+        return self.completed_sessions / self.total_bookings * 100 if self.total_bookings else 0
+
+    def __str__(self):
+        return f"Stats for counsellor {self.counsellor_id}"
+
+
+class DailyFinancials(models.Model):
+    """Platform money movements rolled up per local day. Each booking, wallet, cancellation
+    or settlement event lands on the day it happened (see Mind_Mend.financials)."""
+    day = models.DateField(unique=True)
+    bookings_created = models.PositiveIntegerField(default=0)
+    sessions_completed = models.PositiveIntegerField(default=0)
+    gross_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Fees of sessions completed that day")
+    counsellor_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    platform_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Fees net of counsellor earnings")
+    refunds = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    compensation = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    cancellations = models.PositiveIntegerField(default=0)
+    penalties = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    settlements = models.PositiveIntegerField(default=0)
+    payouts_gross = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    payouts_net = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['day']
+
+    def __str__(self):
+        return f"Financials for {self.day}"
+
+
 class ContactMessage(models.Model):
     """Messages submitted from the Contact Us form."""
     name = models.CharField(max_length=100)
@@ -433,6 +723,123 @@ class MoodEntry(models.Model):
         ordering = ['-date', '-created_at']
 
 
+def _streak_runs(dates):
+    """Return (current_run, longest_run, last_date) for an ascending iterable of distinct dates."""
+    current = longest = 0
+    last = None
+    for d in dates:
+        current = current + 1 if last is not None and (d - last).days == 1 else 1
+        longest = max(longest, current)
+        last = d
+    return current, longest, last
+
+
+class MoodStreak(models.Model):
+    """Per-user mood logging streak, maintained incrementally from MoodEntry signals.
+
+    current_streak is the run of consecutive logged days ending on last_logged_date;
+    it only counts as "active" while last_logged_date is today.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='mood_streak')
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    last_logged_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Streak({self.user_id}: {self.current_streak}/{self.longest_streak})"
+
+    @classmethod
+    def current_for(cls, user, today=None):
+        """Active streak for the dashboard: one indexed row read, no per-day queries."""
+        today = today or timezone.now().date()
+        row = cls.objects.filter(user=user).values_list('current_streak', 'last_logged_date').first()
+        if not row or row[1] != today:
+            return 0
+        return row[0]
+
+    @classmethod
+    def _locked(cls, user_id):
+        cls.objects.get_or_create(user_id=user_id)
+        return cls.objects.select_for_update().get(user_id=user_id)
+
+    @classmethod
+    def register_log(cls, user_id, day):
+        """O(1) update when a mood entry is logged for `day`."""
+        with transaction.atomic():
+            streak = cls._locked(user_id)
+            last = streak.last_logged_date
+            if last is not None and day <= last:
+                if day == last or MoodEntry.objects.filter(user_id=user_id, date=day).count() > 1:
+                    return
+                # A newly logged past day can bridge older runs: recount from the ledger.
+                return streak.rebuild()
+            gap = (day - last).days if last else None
+            streak.current_streak = streak.current_streak + 1 if gap == 1 else 1
+            streak.longest_streak = max(streak.longest_streak, streak.current_streak)
+            streak.last_logged_date = day
+            streak.save(update_fields=['current_streak', 'longest_streak', 'last_logged_date', 'updated_at'])
+
+    @classmethod
+    def register_removal(cls, user_id, day):
+        """Update after a mood entry for `day` was deleted; O(1) unless the longest run may shrink."""
+        with transaction.atomic():
+            streak = cls.objects.select_for_update().filter(user_id=user_id).first()
+            if streak is None or MoodEntry.objects.filter(user_id=user_id, date=day).exists():
+                return
+            last = streak.last_logged_date
+            if last is None or day > last:
+                return
+            run_start = last - timedelta(days=streak.current_streak - 1)
+            shrinks_current_only = (
+                run_start <= day and streak.longest_streak > streak.current_streak
+                and (day < last or streak.current_streak > 1)
+            )
+            if shrinks_current_only:
+                if day == last:
+                    streak.current_streak -= 1
+                    streak.last_logged_date = day - timedelta(days=1)
+                else:
+                    streak.current_streak = (last - day).days
+                streak.save(update_fields=['current_streak', 'last_logged_date', 'updated_at'])
+                return
+            # Removing part of the longest run or of an older run changes values
+            # that cannot be derived from this row alone.
+            streak.rebuild()
+
+    def rebuild(self):
+        """Recount from the user's distinct mood dates (single query)."""
+        dates = (
+            MoodEntry.objects.filter(user_id=self.user_id)
+            .order_by('date').values_list('date', flat=True).distinct()
+        )
+        self.current_streak, self.longest_streak, self.last_logged_date = _streak_runs(dates)
+        self.save()
+        return self
+
+
+def _entry_date(instance):
+    # MoodEntry.date defaults to timezone.now, so unsaved values may still be datetimes.
+    return MoodEntry._meta.get_field('date').to_python(instance.date)
+
+
+@receiver(post_save, sender=MoodEntry)
+def update_mood_streak_on_save(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+    if created:
+        MoodStreak.register_log(instance.user_id, _entry_date(instance))
+    else:
+        # The entry may have moved to another date; the previous value is not tracked.
+        with transaction.atomic():
+            MoodStreak._locked(instance.user_id).rebuild()
+
+
+@receiver(post_delete, sender=MoodEntry)
+def update_mood_streak_on_delete(sender, instance, **kwargs):
+    MoodStreak.register_removal(instance.user_id, _entry_date(instance))
+
+
 class ForumPost(models.Model):
     """Anonymous community forum posts — support, discussion, recovery stories."""
     CATEGORY_CHOICES = [
@@ -482,6 +889,303 @@ class AssessmentResult(models.Model):
         ordering = ['-created_at']
 
 
+class LatestAssessment(models.Model):
+    """Per-user summary of the newest result of each assessment type.
+
+    `latest` maps assessment type -> {id, score, level, created_at, previous_id,
+    previous_score};
+    it is maintained from AssessmentResult signals so pages read one row instead of
+    one ordered query per type.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='latest_assessments')
+    latest = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"LatestAssessment({self.user_id}: {', '.join(sorted(self.latest))})"
+
+    @staticmethod
+    def _entry(result, previous):
+        return {
+            'id': result.id,
+            'score': result.total_score,
+            'level': result.result_level,
+            'created_at': result.created_at.isoformat(),
+            'previous_id': previous['id'] if previous else None,
+            'previous_score': previous['score'] if previous else None,
+        }
+
+    @staticmethod
+    def _summary(user_id):
+        """Build `latest` from the ledger: the two newest results per type."""
+        latest = {}
+        for atype, _ in AssessmentResult.ASSESSMENT_TYPES:
+            rows = list(
+                AssessmentResult.objects.filter(user_id=user_id, assessment_type=atype)
+                .order_by('-created_at', '-id')[:2]
+            )
+            if rows:
+                previous = {'id': rows[1].id, 'score': rows[1].total_score} if len(rows) > 1 else None
+                latest[atype] = LatestAssessment._entry(rows[0], previous)
+        return latest
+
+    @classmethod
+    def rebuild(cls, user_id, create=True):
+        latest = cls._summary(user_id)
+        if create:
+            return cls.objects.update_or_create(user_id=user_id, defaults={'latest': latest})[0]
+        # Update-only for deletes, which may be part of a cascading user delete.
+        cls.objects.filter(user_id=user_id).update(latest=latest, updated_at=timezone.now())
+
+    @classmethod
+    def for_user(cls, user_id):
+        """{assessment type: LatestResult} for one user; builds the row on first read."""
+        row = cls.objects.filter(user_id=user_id).values_list('latest', flat=True).first()
+        if row is None:
+            row = cls.rebuild(user_id).latest
+        return _latest_results(row)
+
+    @classmethod
+    def for_users(cls, user_ids):
+        """{user id: {assessment type: LatestResult}} with one query for existing rows."""
+        user_ids = set(user_ids)
+        summaries = dict(cls.objects.filter(user_id__in=user_ids).values_list('user_id', 'latest'))
+        for user_id in user_ids - summaries.keys():
+            summaries[user_id] = cls.rebuild(user_id).latest
+        return {user_id: _latest_results(latest) for user_id, latest in summaries.items()}
+
+    @classmethod
+    def register(cls, result):
+        """O(1) update when a new AssessmentResult is created."""
+        with transaction.atomic():
+            row = cls.objects.select_for_update().filter(user_id=result.user_id).first()
+            if row is None:
+                return cls.rebuild(result.user_id)
+            current = row.latest.get(result.assessment_type)
+            if current and (datetime.fromisoformat(current['created_at']), current['id']) > (result.created_at, result.id):
+                return cls.rebuild(result.user_id)
+            row.latest[result.assessment_type] = cls._entry(result, current)
+            row.save(update_fields=['latest', 'updated_at'])
+            return row
+
+
+LatestResult = namedtuple('LatestResult', ['id', 'assessment_type', 'total_score', 'result_level', 'created_at', 'previous_score'])
+
+
+def _latest_results(latest):
+    return {
+        atype: LatestResult(
+            entry['id'], atype, entry['score'], entry['level'],
+            datetime.fromisoformat(entry['created_at']), entry['previous_score'],
+        )
+        for atype, entry in latest.items()
+    }
+
+
+@receiver(post_save, sender=AssessmentResult)
+def update_latest_assessment_on_save(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+    if created:
+        LatestAssessment.register(instance)
+    else:
+        LatestAssessment.rebuild(instance.user_id)
+
+
+@receiver(post_delete, sender=AssessmentResult)
+def update_latest_assessment_on_delete(sender, instance, **kwargs):
+    latest = LatestAssessment.objects.filter(user_id=instance.user_id).values_list('latest', flat=True).first()
+    entry = (latest or {}).get(instance.assessment_type)
+    if entry and instance.id in (entry['id'], entry['previous_id']):
+        LatestAssessment.rebuild(instance.user_id, create=False)
+
+
+class WellnessVersion(models.Model):
+    """Per-user counter bumped whenever data behind the wellness dashboard changes.
+
+    Cached dashboard data embeds the version in its key, so a bump invalidates
+    it on every worker without deleting anything.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='wellness_version')
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"WellnessVersion({self.user_id}: {self.version})"
+
+    @classmethod
+    def current(cls, user_id):
+        # The row is created on first read, so any cached entry always has a row to bump.
+        return cls.objects.get_or_create(user_id=user_id)[0].version
+
+    @classmethod
+    def bump(cls, user_id):
+        # Update-only: with no row yet nothing can be cached, and creating one here
+        # would race a cascading user delete.
+        if user_id:
+            cls.objects.filter(user_id=user_id).update(version=F('version') + 1, updated_at=timezone.now())
+
+    @classmethod
+    def bump_many(cls, user_ids):
+        """bump() for several users in one UPDATE, for writes that bypass model signals."""
+        cls.objects.filter(user_id__in=set(user_ids)).update(version=F('version') + 1, updated_at=timezone.now())
+
+
+def report_storage():
+    # Private: outside MEDIA_ROOT and never served by URL; only the auth-checked download views read it.
+    from django.core.files.storage import storages
+    return storages['reports']
+
+
+def report_upload_path(instance, filename):
+    # Unguessable name; the download name shown to the user comes from download_name().
+    return timezone.now().strftime(f'reports/%Y/%m/{uuid.uuid4().hex}.pdf')
+
+
+class ProgressReport(models.Model):
+    """A rendered (or queued) PDF progress report for one user, period and data version."""
+    PERIOD_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('rendering', 'Rendering'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='progress_reports')
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES, default='monthly')
+    report_date = models.DateField()
+    data_version = models.PositiveIntegerField()
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default='pending', db_index=True)
+    file = models.FileField(upload_to=report_upload_path, storage=report_storage, blank=True)
+    requested_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='requested_progress_reports'
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, help_text="A failed render is not retried before this")
+    error = models.CharField(max_length=500, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    rendered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        unique_together = ['user', 'period', 'report_date', 'data_version']
+
+    def __str__(self):
+        return f"Report {self.user_id} {self.period} {self.report_date} v{self.data_version} ({self.status})"
+
+    def download_name(self):
+        return f'mindmend-report-{self.period}-{self.report_date.strftime("%Y%m%d")}.pdf'
+
+
+@receiver(post_save, sender=MoodEntry)
+@receiver(post_delete, sender=MoodEntry)
+@receiver(post_save, sender=AssessmentResult)
+@receiver(post_delete, sender=AssessmentResult)
+@receiver(post_save, sender=CounsellorBooking)
+@receiver(post_delete, sender=CounsellorBooking)
+@receiver(post_save, sender=Counsellor)
+@receiver(post_delete, sender=Counsellor)
+def bump_wellness_version(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    WellnessVersion.bump(instance.user_id)
+
+
+# Booking fields that feed CounsellorStats; saves touching none of them skip the rebuild.
+_STATS_FIELDS = {
+    'counsellor', 'status', 'is_instant', 'include_video', 'total_fee',
+    'counsellor_earnings', 'is_settled', 'is_disputed',
+}
+
+
+@receiver(post_save, sender=CounsellorBooking)
+@receiver(post_delete, sender=CounsellorBooking)
+def refresh_counsellor_stats(sender, instance, **kwargs):
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and not _STATS_FIELDS.intersection(update_fields):
+        return
+    from ..counsellor_stats import rebuild_stats
+    rebuild_stats([instance.counsellor_id])
+
+
+@receiver(post_save, sender=CounsellorReview)
+@receiver(post_delete, sender=CounsellorReview)
+def refresh_counsellor_rating(sender, instance, **kwargs):
+    from ..counsellor_stats import rebuild_stats
+    counsellor_id = CounsellorBooking.objects.filter(pk=instance.booking_id).values_list('counsellor_id', flat=True).first()
+    if counsellor_id is not None:
+        rebuild_stats([counsellor_id])
+
+
+@receiver(post_save, sender=BookingCancellation)
+@receiver(post_delete, sender=BookingCancellation)
+def refresh_counsellor_penalties(sender, instance, **kwargs):
+    from ..counsellor_stats import rebuild_stats
+    rebuild_stats([instance.counsellor_id])
+
+
+@receiver(post_save, sender=Counsellor)
+def create_counsellor_stats(sender, instance, created, **kwargs):
+    # Fee changes also move the fallback earnings of bookings saved without them.
+    if created or kwargs.get('update_fields') is None or {'session_fee', 'instant_session_fee'} & set(kwargs['update_fields']):
+        from ..counsellor_stats import rebuild_stats
+        rebuild_stats([instance.id])
+
+
+# Fields of each model that feed DailyFinancials; saves touching none of them skip the rollup.
+_ROLLUP_FIELDS = {
+    CounsellorBooking: {'status', 'total_fee', 'counsellor_earnings', 'completed_at', 'created_at'},
+    WalletTransaction: {'transaction_type', 'amount', 'created_at'},
+    BookingCancellation: {'counsellor_penalty', 'created_at'},
+    PayoutSettlement: {'gross_amount', 'net_amount_paid', 'created_at'},
+}
+
+
+def _touches_rollup(sender, update_fields):
+    return update_fields is None or bool(_ROLLUP_FIELDS[sender].intersection(update_fields))
+
+
+@receiver(pre_save, sender=CounsellorBooking)
+@receiver(pre_save, sender=WalletTransaction)
+@receiver(pre_save, sender=BookingCancellation)
+@receiver(pre_save, sender=PayoutSettlement)
+def remember_rolled_up(sender, instance, **kwargs):
+    # An update moves the rollups by the difference between the stored row and the saved one.
+    if instance.pk is not None and _touches_rollup(sender, kwargs.get('update_fields')):
+        from ..financials import contributions
+        instance._rolled_up = contributions(sender.objects.filter(pk=instance.pk).first())
+
+
+@receiver(post_save, sender=CounsellorBooking)
+@receiver(post_delete, sender=CounsellorBooking)
+@receiver(post_save, sender=SlotHold)
+@receiver(post_delete, sender=SlotHold)
+def bump_slot_version(sender, instance, **kwargs):
+    SlotVersion.bump(instance.counsellor_id, instance.date)
+
+
+@receiver(post_save, sender=CounsellorBooking)
+@receiver(post_delete, sender=CounsellorBooking)
+@receiver(post_save, sender=WalletTransaction)
+@receiver(post_delete, sender=WalletTransaction)
+@receiver(post_save, sender=BookingCancellation)
+@receiver(post_delete, sender=BookingCancellation)
+@receiver(post_save, sender=PayoutSettlement)
+@receiver(post_delete, sender=PayoutSettlement)
+def roll_up_money_event(sender, instance, signal, **kwargs):
+    from ..financials import contributions, record
+    before = instance.__dict__.pop('_rolled_up', [])
+    if signal is post_delete:
+        record(removed=contributions(instance))
+    elif _touches_rollup(sender, kwargs.get('update_fields')):
+        record(added=contributions(instance), removed=before)
+
+
 class ChatMessage(models.Model):
     """Store chat history for the AI chatbot."""
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
@@ -544,3 +1248,65 @@ class EmailVerificationOTP(models.Model):
 
     def __str__(self):
         return f"OTP({self.user.username})"
+
+
+class SurveySource(models.Model):
+    """A polled survey responses CSV (Google Form export URL or local file) and its ingestion state."""
+    url = models.CharField(max_length=500, unique=True)
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=100, blank=True)
+    headers = models.JSONField(default=list, blank=True)
+    header_fingerprint = models.CharField(max_length=64, blank=True)
+    rows_ingested = models.PositiveIntegerField(default=0)
+    last_polled_at = models.DateTimeField(null=True, blank=True)
+    last_changed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.CharField(max_length=500, blank=True)
+
+    def __str__(self):
+        return f"SurveySource({self.url}: {self.rows_ingested} rows)"
+
+
+class SurveyAnswerCount(models.Model):
+    """How many responses gave `answer` for the question in column `column` of a survey source."""
+    source = models.ForeignKey(SurveySource, on_delete=models.CASCADE, related_name='answer_counts')
+    column = models.PositiveSmallIntegerField()
+    answer = models.CharField(max_length=255)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['source', 'column', 'answer']
+
+
+class SurveyMonthlyStat(models.Model):
+    """Per-month response, stress and cause totals for a survey source (feeds the sentiment dashboard)."""
+    source = models.ForeignKey(SurveySource, on_delete=models.CASCADE, related_name='monthly_stats')
+    month = models.DateField()
+    responses = models.PositiveIntegerField(default=0)
+    stress_total = models.FloatField(default=0)
+    stress_responses = models.PositiveIntegerField(default=0)
+    causes = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ['month']
+        unique_together = ['source', 'month']
+
+    @property
+    def avg_stress(self):
+        return self.stress_total / self.stress_responses if self.stress_responses else None
+
+
+class AnalyticsExport(models.Model):
+    """One run of the columnar analytics export for a table; the next run starts after last_id."""
+    table = models.CharField(max_length=30, db_index=True)
+    file_format = models.CharField(max_length=10)
+    since_id = models.PositiveBigIntegerField(default=0)
+    last_id = models.PositiveBigIntegerField(default=0)
+    rows = models.PositiveIntegerField(default=0)
+    files = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Export {self.table} ({self.since_id}, {self.last_id}] {self.rows} rows"
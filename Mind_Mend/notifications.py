@@ -0,0 +1,54 @@
+"""
+MindMend counsellor notifications.
+Every notification is stored as a CounsellorNotification and, when Channels is
+available, pushed live to the counsellor's DoctorNotificationConsumer group once it
+commits. The push is best-effort: a missed one shows up when the dashboard reloads.
+"""
+from asgiref.sync import async_to_sync
+from django.db import transaction
+
+try:
+    from channels.layers import get_channel_layer
+except ModuleNotFoundError:
+    def get_channel_layer(): return None
+
+from .models import CounsellorNotification
+
+
+def _push(channel_layer, group, event):
+    try:
+        async_to_sync(channel_layer.group_send)(group, event)
+    except Exception as e:
+        print(f"Live notification push to {group} failed: {e}")
+
+
+def notify_counsellor(counsellor, event_type, title, body='', booking=None, actor=None):
+    """Create persistent notification and push it via websocket when available."""
+    notif = CounsellorNotification.objects.create(
+        counsellor=counsellor,
+        booking=booking,
+        actor=actor,
+        event_type=event_type,
+        title=title,
+        body=body,
+    )
+    if not counsellor.user_id:
+        return notif
+    channel_layer = get_channel_layer()
+    if not channel_layer:
+        return notif
+    group = f'doctor_{counsellor.user_id}'
+    event = {
+        'type': 'doctor.notification',
+        'notification': {
+            'id': notif.id,
+            'event_type': notif.event_type,
+            'title': notif.title,
+            'body': notif.body,
+            'booking_id': notif.booking_id,
+            'created_at': notif.created_at.isoformat(),
+            'is_read': notif.is_read,
+        }
+    }
+    transaction.on_commit(lambda: _push(channel_layer, group, event))
+    return notif
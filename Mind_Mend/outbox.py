@@ -0,0 +1,171 @@
+"""
+MindMend transactional outbox.
+Views never call Razorpay or the mail server while they hold database locks. They record
+an OutboxMessage in the same transaction as the change that needs it, so the call happens
+if and only if the change commits. The run_outbox worker delivers due messages with
+exponential backoff; emails are also tried once right after commit so they are not delayed
+by the worker's poll, and are given up on once they are too old to be useful (EXPIRES_AFTER).
+Each message has an idempotency key: a refund retried after an ambiguous failure first
+looks for a refund with that key as its receipt instead of refunding twice.
+"""
+import random
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_CAP = timedelta(hours=2)
+STALE_SENDING_AFTER = timedelta(minutes=5)
+SENT_RETENTION = timedelta(days=14)
+OUTBOX_BATCH_SIZE = 50
+GATEWAY_TIMEOUT = 15  # seconds per Razorpay request
+
+# Kinds delivered in-process as soon as the transaction commits, as well as by the worker.
+DELIVER_ON_COMMIT = ('email',)
+# Kinds that are useless after a while (a verification code lasts 15 minutes): once this old
+# they are marked failed instead of sent.
+EXPIRES_AFTER = {'email': timedelta(minutes=15)}
+
+
+class PermanentFailure(Exception):
+    """Delivery can never succeed (e.g. Razorpay rejected the request); do not retry."""
+
+
+def enqueue(kind, key, payload):
+    """Record a message to deliver once the current transaction commits; a repeated key is a no-op."""
+    message, created = OutboxMessage.objects.get_or_create(key=key, defaults={'kind': kind, 'payload': payload})
+    if created and (kind in DELIVER_ON_COMMIT or getattr(settings, 'MINDMEND_OUTBOX_INLINE', False)):
+        transaction.on_commit(lambda: deliver_now(message.pk))
+    return message
+
+
+def enqueue_refund(booking, amount, reason):
+    """Refund `amount` rupees of the booking's Razorpay payment, at most once per booking and reason."""
+    if amount <= 0 or not booking.razorpay_payment_id:
+        return None
+    return enqueue('razorpay_refund', f'refund:{booking.id}:{reason}', {
+        'payment_id': booking.razorpay_payment_id,
+        'amount': int(amount * 100),  # paise
+        'notes': {'booking_id': str(booking.id), 'reason': reason},
+    })
+
+
+def enqueue_email(subject, message, recipient_list, from_email=None):
+    return enqueue('email', f'email:{uuid.uuid4().hex}', {
+        'subject': subject,
+        'message': message,
+        'from_email': from_email or settings.EMAIL_HOST_USER,
+        'recipient_list': list(recipient_list),
+    })
+
+
+def razorpay_client():
+    import razorpay
+    options = {'base_url': settings.RAZORPAY_API_BASE_URL} if getattr(settings, 'RAZORPAY_API_BASE_URL', '') else {}
+    return razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET), **options)
+
+
+def _find_refund(client, payment_id, receipt):
+    refunds = client.payment.fetch_multiple_refund(payment_id, {'count': 100}, timeout=GATEWAY_TIMEOUT)
+    return next((r for r in refunds.get('items', []) if r.get('receipt') == receipt), None)
+
+
+def _send_refund(message):
+    import razorpay
+    payload = message.payload
+    client = razorpay_client()
+    try:
+        # An earlier attempt may have reached Razorpay before failing; never refund twice.
+        refund = _find_refund(client, payload['payment_id'], message.key) if message.attempts > 1 else None
+        if refund is None:
+            refund = client.payment.refund(payload['payment_id'], {
+                'amount': payload['amount'], 'receipt': message.key, 'notes': payload.get('notes', {}),
+            }, timeout=GATEWAY_TIMEOUT)
+    except razorpay.errors.BadRequestError as e:
+        raise PermanentFailure(str(e)) from e
+    return {'refund_id': refund.get('id'), 'status': refund.get('status')}
+
+
+def _send_email(message):
+    sent = send_mail(fail_silently=False, **message.payload)
+    return {'sent': sent}
+
+
+HANDLERS = {
+    'razorpay_refund': _send_refund,
+    'email': _send_email,
+}
+
+
+def backoff(attempts):
+    """Delay before retry number `attempts`: doubling from BACKOFF_BASE, capped, with 25% jitter."""
+    delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** max(0, attempts - 1))
+    return delay * (1 + random.uniform(0, 0.25))
+
+
+def deliver(message):
+    """Make the external call for a claimed message and record the outcome."""
+    now = timezone.now()
+    ttl = EXPIRES_AFTER.get(message.kind)
+    try:
+        if ttl and now - message.created_at > ttl:
+            raise PermanentFailure(f'expired after {ttl}; not sent')
+        message.result = HANDLERS[message.kind](message)
+    except Exception as e:
+        permanent = isinstance(e, PermanentFailure) or message.attempts >= MAX_ATTEMPTS
+        print(f"Outbox {message.kind} {message.key} attempt {message.attempts} failed: {e}")
+        message.status = 'failed' if permanent else 'pending'
+        message.next_attempt_at = now + backoff(message.attempts)
+        message.last_error = f'{type(e).__name__}: {e}'[:500]
+    else:
+        message.status = 'sent'
+        message.sent_at = now
+        message.last_error = ''
+    message.save(update_fields=['status', 'result', 'next_attempt_at', 'last_error', 'sent_at', 'updated_at'])
+    return message
+
+
+def deliver_now(message_id):
+    """Claim and deliver one pending message in the current process, unless a worker has it."""
+    claimed = OutboxMessage.objects.filter(pk=message_id, status='pending').update(
+        status='sending', attempts=F('attempts') + 1, updated_at=timezone.now(),
+    )
+    return deliver(OutboxMessage.objects.get(pk=message_id)) if claimed else None
+
+
+def claim_due(limit=OUTBOX_BATCH_SIZE, now=None):
+    """Mark up to `limit` due messages (and ones abandoned mid-send) as sending and return them."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='pending', next_attempt_at__lte=now) | Q(status='sending', updated_at__lt=now - STALE_SENDING_AFTER))
+            .order_by('next_attempt_at').values_list('id', flat=True)[:limit]
+        )
+        OutboxMessage.objects.filter(pk__in=ids).update(status='sending', attempts=F('attempts') + 1, updated_at=now)
+    return list(OutboxMessage.objects.filter(pk__in=ids).order_by('next_attempt_at'))
+
+
+def process_outbox(limit=None, batch_size=OUTBOX_BATCH_SIZE):
+    """Deliver due messages until none are left (or `limit` were handled); returns the messages handled."""
+    handled = []
+    while limit is None or len(handled) < limit:
+        batch = claim_due(batch_size if limit is None else min(batch_size, limit - len(handled)))
+        if not batch:
+            break
+        handled.extend(deliver(message) for message in batch)
+    return handled
+
+
+def purge_sent(now=None):
+    """Drop delivered messages older than SENT_RETENTION; returns how many were deleted."""
+    cutoff = (now or timezone.now()) - SENT_RETENTION
+    return OutboxMessage.objects.filter(status='sent', sent_at__lt=cutoff).delete()[0]
@@ -0,0 +1,105 @@
+"""
+MindMend revenue engine.
+Per-counsellor payout figures and platform revenue for the admin revenue dashboard,
+computed by the database with grouped and conditional aggregates; platform totals come
+from the daily financial rollups. The page costs the same handful of queries however many
+counsellors and bookings there are.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import BookingCancellation, Counsellor, DailyFinancials
+
+PAYOUT_HOLD = timedelta(hours=24)  # completed sessions stay open to disputes this long
+
+_MONEY = DecimalField(max_digits=12, decimal_places=2)
+_ZERO = Value(Decimal('0.00'))
+_B = 'counsellorbooking__'
+
+
+def _sum(expression, condition=None):
+    return Coalesce(Sum(expression, filter=condition), _ZERO, output_field=_MONEY)
+
+
+def cleared_q(now, prefix=''):
+    """Unsettled completed bookings past the dispute window and not disputed."""
+    cutoff = now - PAYOUT_HOLD
+    completed_before = (
+        Q(**{prefix + 'completed_at__lte': cutoff})
+        | Q(**{prefix + 'completed_at__isnull': True, prefix + 'created_at__lte': cutoff})
+    )
+    return Q(**{prefix + 'status': 'completed', prefix + 'is_settled': False, prefix + 'is_disputed': False}) & completed_before
+
+
+def on_hold_q(now):
+    """Unsettled completed bookings still inside the dispute window."""
+    cutoff = now - PAYOUT_HOLD
+    return Q(status='completed', is_settled=False) & (
+        Q(completed_at__gt=cutoff) | Q(completed_at__isnull=True, created_at__gt=cutoff)
+    )
+
+
+def unsettled_penalties():
+    """Correlated subquery: a counsellor's cancellation penalties not yet deducted from a payout."""
+    penalties = (
+        BookingCancellation.objects.filter(counsellor=OuterRef('pk')).exclude(refund_status='Settled')
+        .values('counsellor').annotate(total=Sum('counsellor_penalty')).values('total')
+    )
+    return Coalesce(Subquery(penalties, output_field=_MONEY), _ZERO, output_field=_MONEY)
+
+
+def payout_rows(now):
+    """One dict per active counsellor with cleared, locked and net payout, highest net first."""
+    earnings = F(_B + 'counsellor_earnings')
+    completed = Q(**{_B + 'status': 'completed'})
+    cleared = cleared_q(now, _B)
+    locked = completed & Q(**{_B + 'is_settled': False}) & ~cleared
+    counsellors = (
+        Counsellor.objects.filter(is_active=True).select_related('user', 'bank_details')
+        .annotate(
+            cleared_payout=_sum(earnings, cleared),
+            cleared_count=Count('counsellorbooking', filter=cleared),
+            pending_verification_amount=_sum(earnings, locked),
+            pending_count=Count('counsellorbooking', filter=locked),
+            total_earnings=_sum(earnings, completed),
+            penalties=unsettled_penalties(),
+        )
+    )
+    rows = []
+    for c in counsellors:
+        deductions = c.penalties + c.outstanding_debt
+        rows.append({
+            'counsellor': c,
+            'cleared_payout': c.cleared_payout,
+            'penalties': c.penalties,
+            'outstanding_debt': c.outstanding_debt,
+            'net_payout': max(Decimal('0.00'), c.cleared_payout - deductions),
+            'pending_verification_amount': c.pending_verification_amount,
+            'total_earnings': c.total_earnings,
+            'cleared_count': c.cleared_count,
+            'pending_count': c.pending_count,
+            'bank_details': getattr(c, 'bank_details', None),
+        })
+    rows.sort(key=lambda row: row['net_payout'], reverse=True)
+    return rows
+
+
+def platform_summary(now):
+    """Platform revenue (fees net of counsellor earnings) today, this month and all time, plus totals,
+    read from the daily financial rollups."""
+    today = timezone.localdate(now)
+    rollup = DailyFinancials.objects.aggregate(
+        today_revenue=_sum('platform_revenue', Q(day=today)),
+        month_revenue=_sum('platform_revenue', Q(day__gte=today.replace(day=1), day__lte=today)),
+        total_platform_revenue=_sum('platform_revenue'),
+        wallet_credits_issued=_sum(F('refunds') + F('compensation')),
+        total_sessions=Coalesce(Sum('bookings_created'), 0),
+        total_cancellations=Coalesce(Sum('cancellations'), 0),
+    )
+    total_sessions = rollup['total_sessions']
+    rollup['cancellation_rate'] = (rollup.pop('total_cancellations') / total_sessions * 100) if total_sessions > 0 else 0
+    return rollup
@@ -148,6 +148,16 @@ class AssessmentResultSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at']
 
 
+class LatestAssessmentSerializer(serializers.Serializer):
+    """Read-only view of one entry from the per-user LatestAssessment summary."""
+    id = serializers.IntegerField()
+    assessment_type = serializers.CharField()
+    total_score = serializers.IntegerField()
+    result_level = serializers.CharField()
+    previous_score = serializers.IntegerField(allow_null=True)
+    created_at = serializers.DateTimeField()
+
+
 class AssessmentSubmitSerializer(serializers.Serializer):
     assessment_type = serializers.ChoiceField(choices=['phq9', 'gad7', 'pss'])
     answers = serializers.DictField(child=serializers.IntegerField())
@@ -0,0 +1,170 @@
+"""
+MindMend payout settlement engine.
+A run settles any number of counsellors at once in a fixed number of statements: lock the
+counsellors with something to settle, open one PayoutSettlement each, link every eligible
+booking (completed over 24 hours ago, not disputed, not settled) and unsettled
+cancellation penalty with a single bulk UPDATE apiece, then total each settlement from
+exactly the rows it claimed. Runs carry an idempotency key, so a retried request or
+command returns the original run instead of paying twice. The bank batch for a run is
+streamed as NEFT/UPI CSV rows.
+"""
+import csv
+import time
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, Exists, OuterRef, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import BookingCancellation, Counsellor, CounsellorBooking, PayoutSettlement, SettlementRun
+from .revenue import PAYOUT_HOLD, cleared_q
+
+BANK_BATCH_HEADER = (
+    'settlement_id', 'transaction_type', 'beneficiary_name', 'account_number', 'ifsc_code',
+    'upi_id', 'amount', 'value_date', 'narration',
+)
+
+_ZERO = Decimal('0.00')
+_PAISA = Decimal('0.01')
+
+
+def _unsettled_penalties():
+    return BookingCancellation.objects.exclude(refund_status='Settled')
+
+
+def _link_to_settlements(queryset, settlement_by_counsellor, **fields):
+    """One UPDATE pointing each row at its counsellor's settlement."""
+    return queryset.filter(counsellor_id__in=settlement_by_counsellor).update(
+        payout_settlement_id=Case(
+            *[When(counsellor_id=cid, then=Value(sid)) for cid, sid in settlement_by_counsellor.items()],
+        ),
+        **fields,
+    )
+
+
+def _totals_by_settlement(queryset, amount_field):
+    rows = queryset.values('payout_settlement_id').annotate(
+        total=Coalesce(Sum(amount_field), Value(_ZERO), output_field=DecimalField(max_digits=12, decimal_places=2)),
+        count=Count('id'),
+    )
+    return {row['payout_settlement_id']: (row['total'], row['count']) for row in rows}
+
+
+def run_settlement(key, settled_by=None, counsellor_ids=None, now=None):
+    """Settle every counsellor (or just counsellor_ids) with cleared earnings or unpaid penalties.
+
+    Returns (run, created); created is False when a run with this key already exists.
+    """
+    now = now or timezone.now()
+    started = time.perf_counter()
+    with transaction.atomic():
+        run, created = SettlementRun.objects.get_or_create(
+            key=key, defaults={'started_by': settled_by, 'cutoff': now - PAYOUT_HOLD},
+        )
+        if not created:
+            return run, False
+
+        eligible = CounsellorBooking.objects.filter(cleared_q(now))
+        penalties = _unsettled_penalties()
+        counsellors = Counsellor.objects.filter(
+            Exists(eligible.filter(counsellor=OuterRef('pk'))) | Exists(penalties.filter(counsellor=OuterRef('pk')))
+        )
+        if counsellor_ids is not None:
+            counsellors = counsellors.filter(pk__in=counsellor_ids)
+        # Row locks serialise concurrent runs over the same counsellors.
+        counsellors = {c.id: c for c in counsellors.select_for_update().order_by('id')}
+        if counsellors:
+            _settle(run, counsellors, eligible, penalties, settled_by, now)
+        run.duration_ms = round((time.perf_counter() - started) * 1000)
+        run.save()
+    return run, True
+
+
+def _settle(run, counsellors, eligible, penalties, settled_by, now):
+    from .counsellor_stats import rebuild_stats
+    from .financials import contributions, event_day, record
+
+    settlements = PayoutSettlement.objects.bulk_create([
+        PayoutSettlement(counsellor_id=cid, settled_by=settled_by, run=run,
+                         gross_amount=_ZERO, total_deductions=_ZERO, net_amount_paid=_ZERO)
+        for cid in counsellors
+    ])
+    # bulk_create skips post_save, while deleting the empty settlements below does send post_delete.
+    record(added=[change for settlement in settlements for change in contributions(settlement)])
+    settlement_by_counsellor = {s.counsellor_id: s.id for s in settlements}
+    _link_to_settlements(eligible, settlement_by_counsellor, is_settled=True)
+    _link_to_settlements(penalties, settlement_by_counsellor, refund_status='Settled')
+
+    # Total each settlement from the rows its UPDATE actually claimed.
+    earned = _totals_by_settlement(
+        CounsellorBooking.objects.filter(payout_settlement__run=run), 'counsellor_earnings')
+    fined = _totals_by_settlement(
+        BookingCancellation.objects.filter(payout_settlement__run=run), 'counsellor_penalty')
+    empty = []
+    for settlement in settlements:
+        counsellor = counsellors[settlement.counsellor_id]
+        gross, booking_count = earned.get(settlement.id, (_ZERO, 0))
+        penalty, penalty_count = fined.get(settlement.id, (_ZERO, 0))
+        if not booking_count and not penalty_count:
+            empty.append(settlement.id)
+            continue
+        # Database sums can carry extra digits (SQLite sums in floating point); pay whole paise.
+        gross = Decimal(gross).quantize(_PAISA)
+        deductions = (Decimal(penalty) + Decimal(counsellor.outstanding_debt)).quantize(_PAISA)
+        settlement.gross_amount = gross
+        settlement.total_deductions = deductions
+        settlement.net_amount_paid = max(_ZERO, gross - deductions)
+        counsellor.outstanding_debt = max(_ZERO, deductions - gross)
+        run.counsellors_settled += 1
+        run.bookings_settled += booking_count
+        run.gross_amount += gross
+        run.total_deductions += deductions
+        run.net_amount_paid += settlement.net_amount_paid
+    PayoutSettlement.objects.filter(pk__in=empty).delete()
+    settled = [s for s in settlements if s.id not in empty]
+    PayoutSettlement.objects.bulk_update(settled, ['gross_amount', 'total_deductions', 'net_amount_paid'])
+    Counsellor.objects.bulk_update(
+        [counsellors[s.counsellor_id] for s in settled], ['outstanding_debt'])
+
+    # The bulk statements skip post_save, so refresh the derived tables directly.
+    rebuild_stats(s.counsellor_id for s in settled)
+    record(added=[
+        (event_day(s.created_at), {'payouts_gross': s.gross_amount, 'payouts_net': s.net_amount_paid}) for s in settled
+    ])
+
+
+class _Echo:
+    """File-like object whose write() hands the CSV line straight back."""
+    def write(self, value):
+        return value
+
+
+def bank_batch_rows(run):
+    """CSV lines (header first) for every settlement in the run with money to pay out."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(BANK_BATCH_HEADER)
+    settlements = (
+        run.settlements.filter(net_amount_paid__gt=0)
+        .select_related('counsellor', 'counsellor__bank_details').order_by('id')
+    )
+    value_date = timezone.localdate(run.created_at).isoformat()
+    for settlement in settlements.iterator(chunk_size=500):
+        bank = getattr(settlement.counsellor, 'bank_details', None)
+        if bank and bank.account_number and bank.ifsc_code:
+            transaction_type = 'NEFT'
+        elif bank and bank.upi_id:
+            transaction_type = 'UPI'
+        else:
+            transaction_type = 'MISSING_BANK_DETAILS'
+        yield writer.writerow([
+            settlement.id,
+            transaction_type,
+            bank.account_holder_name if bank else settlement.counsellor.name,
+            bank.account_number if bank else '',
+            bank.ifsc_code if bank else '',
+            bank.upi_id if bank else '',
+            f'{settlement.net_amount_paid:.2f}',
+            value_date,
+            f'MindMend payout S{settlement.id} R{run.id}',
+        ])
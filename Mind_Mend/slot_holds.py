@@ -0,0 +1,134 @@
+"""
+MindMend slot holds.
+A patient who starts checkout claims the slot with a SlotHold instead of an unpaid
+CounsellorBooking. Reserving is one conditional UPDATE (take over an expired hold, or
+refresh our own) falling back to one INSERT guarded by the slot's unique key, so
+concurrent bookers are decided by the database in O(1) and losers simply get None.
+Holds lapse on their own after SlotHold.TTL; payment converts the hold into a confirmed
+booking, and free bookings convert straight away.
+"""
+import uuid
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .availability import SLOT_MINUTES
+from .booking_lifecycle import release_expired_hold
+from .models import CounsellorBooking, SlotHold, SlotVersion, UserProfile, WalletTransaction
+from .wallet import credit_cash
+
+
+def _minute(value):
+    return value.hour * 60 + value.minute
+
+
+def _has_conflict(hold, now):
+    """True when another live hold or a booking overlaps the held 30-minute window, or when any
+    booking row the hold could not replace (even a cancelled one) sits on the slot's unique key."""
+    minute = _minute(hold.time_slot)
+    overlaps = lambda t: abs(_minute(t) - minute) < SLOT_MINUTES  # noqa: E731
+    same_day = dict(counsellor_id=hold.counsellor_id, date=hold.date)
+    held = SlotHold.objects.filter(expires_at__gt=now, **same_day).exclude(pk=hold.pk)
+    booked = CounsellorBooking.objects.filter(**same_day).holding_slot(now)
+    # Only a lapsed unpaid booking is cleared on conversion; anything else would make the
+    # paid booking's INSERT fail.
+    same_key = CounsellorBooking.objects.filter(**same_day, time_slot=hold.time_slot).exclude(
+        status='pending', next_transition_at__lte=now,
+    )
+    return (
+        any(overlaps(t) for t in held.values_list('time_slot', flat=True))
+        or any(overlaps(t) for t in booked.values_list('time_slot', flat=True))
+        or same_key.exists()
+    )
+
+
+def reserve_slot(user, draft, now=None):
+    """Claim draft's slot (an unsaved CounsellorBooking) for user; None if someone else holds it."""
+    now = now or timezone.now()
+    key = dict(counsellor_id=draft.counsellor_id, date=draft.date, time_slot=draft.time_slot)
+    values = {field: getattr(draft, field) for field in SlotHold.BOOKING_FIELDS}
+    values.update(user=user, reserved_at=now, expires_at=now + SlotHold.TTL)
+
+    # The same checkout submitted again (double-click, second tab) refreshes our live hold
+    # and keeps its token, so a Razorpay order already placed for it (receipt hold_<token>)
+    # still converts. A changed price needs a new order, so it gets a new token below.
+    mine = SlotHold.objects.filter(user=user, expires_at__gt=now, total_fee=draft.total_fee, **key)
+    claimed = mine.update(**values)
+    if not claimed:
+        # Take over a lapsed hold (or re-price our own) in place; otherwise insert a fresh row.
+        values['token'] = uuid.uuid4()
+        claimed = SlotHold.objects.filter(Q(expires_at__lte=now) | Q(user=user), **key).update(**values)
+    if claimed:
+        SlotVersion.bump(draft.counsellor_id, draft.date)  # the UPDATE skips post_save
+    else:
+        try:
+            with transaction.atomic():
+                SlotHold.objects.create(**key, **values)
+        except IntegrityError:
+            return None
+    hold = SlotHold.objects.get(**key)
+    if _has_conflict(hold, now):
+        release_hold(hold)
+        return None
+    return hold
+
+
+def release_hold(hold):
+    """Give the slot back before the hold lapses."""
+    SlotHold.objects.filter(token=hold.token).delete()
+
+
+def convert_hold(token, **fields):
+    """
+    Turn the hold into a confirmed booking; returns (booking, created).
+    A payment already converted (matched on razorpay_payment_id) returns that booking.
+    Returns (None, False) when the hold lapsed and another patient has since taken the slot;
+    a hold that cannot be converted is released.
+    """
+    payment_id = fields.get('razorpay_payment_id')
+    with transaction.atomic():
+        if payment_id:
+            existing = CounsellorBooking.objects.filter(razorpay_payment_id=payment_id).first()
+            if existing is not None:
+                return existing, False
+        hold = SlotHold.objects.select_for_update().filter(token=token).first()
+        if hold is None:
+            return None, False
+        # A lapsed hold still converts if nobody has taken it over: the patient paid for this slot.
+        release_expired_hold(hold.counsellor_id, hold.date, hold.time_slot)
+        booking = CounsellorBooking(
+            user_id=hold.user_id, counsellor_id=hold.counsellor_id, date=hold.date, time_slot=hold.time_slot,
+            status='confirmed', is_paid=True,
+            **{field: getattr(hold, field) for field in SlotHold.BOOKING_FIELDS}, **fields,
+        )
+        try:
+            with transaction.atomic():
+                booking.save()
+        except IntegrityError:
+            hold.delete()
+            return None, False
+        hold.delete()
+    return booking, True
+
+
+def credit_orphaned_payment(user_id, payment_id, amount, description):
+    """Credit a captured payment whose slot was lost to the patient's wallet, once per payment."""
+    with transaction.atomic():
+        # Razorpay redelivers webhooks: the profile lock serialises concurrent deliveries
+        # so only the first sees no refund row.
+        list(UserProfile.objects.select_for_update().filter(user_id=user_id).values_list('id'))
+        if WalletTransaction.objects.filter(reference_id=payment_id, transaction_type='refund').exists():
+            return False
+        credit_cash(user_id, amount)
+        WalletTransaction.objects.create(
+            user_id=user_id, amount=amount, transaction_type='refund',
+            description=description, reference_id=payment_id,
+        )
+    return True
+
+
+def purge_past_holds(now=None):
+    """Drop hold rows for days already over; live and lapsed holds for future slots are reused in place."""
+    today = timezone.localdate(now or timezone.now())
+    return SlotHold.objects.filter(date__lt=today).delete()[1].get(SlotHold._meta.label, 0)
@@ -0,0 +1,45 @@
+"""
+MindMend concurrency stress harness.
+The stress_* maintenance commands release many threads at once, each on its own database
+connection, into the same critical section, then check what the database ended up with.
+SQLite serialises writers, so the races only prove anything on PostgreSQL or MySQL.
+"""
+import threading
+
+from django.db import connection, connections
+
+
+def unsupported_database():
+    """Why the default database cannot run a meaningful race, or None when it can."""
+    if connection.vendor == 'sqlite':
+        return 'SQLite serialises writers, so nothing would race. Run this against PostgreSQL or MySQL.'
+    return None
+
+
+def race(attempt, contenders):
+    """Call attempt(contender) for every contender in its own thread, all released together.
+
+    Returns (results, errors): the values attempts returned other than None, and the exceptions
+    they raised. Exceptions are collected rather than lost with their thread; callers count
+    any of them as a failed round.
+    """
+    barrier = threading.Barrier(len(contenders))
+    results, errors = [], []
+
+    def run(contender):
+        try:
+            barrier.wait()
+            result = attempt(contender)
+            if result is not None:
+                results.append(result)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=run, args=(contender,)) for contender in contenders]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
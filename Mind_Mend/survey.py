@@ -0,0 +1,339 @@
+"""
+MindMend survey ingestion.
+Polls the survey responses CSV with conditional requests, folds only newly appended rows
+into per-question answer counters, and serves the survey dashboards from those counters.
+MINDMEND_GOOGLE_FORM_RESPONSES_CSV_URL may also be a local file path (or file:// URL),
+which stands in for the Google export during development and tests.
+"""
+import csv
+import hashlib
+import io
+import os
+import re
+from collections import Counter, defaultdict
+from datetime import date
+from itertools import groupby, islice
+from operator import itemgetter
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import SurveySource, SurveyAnswerCount, SurveyMonthlyStat
+
+FETCH_TIMEOUT = 8
+MAX_ANSWER_LENGTH = 255
+# Distinct answers tracked per question; the rest (free-text replies) are pooled so memory stays flat.
+MAX_LABELS_PER_QUESTION = 200
+OTHER_LABEL = 'Other'
+EMPTY_SUMMARY = {'total_responses': 0, 'questions': []}
+
+STRESS_KEYWORDS = ('stress',)
+CAUSE_KEYWORDS = ('cause', 'reason', 'source', 'trigger')
+STRESS_SCALE = 5
+_DATE_RE = re.compile(r'^\s*(\d{1,4})[/.-](\d{1,2})[/.-](\d{1,4})')
+_NUMBER_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)')
+
+
+def survey_csv_url():
+    return getattr(settings, 'MINDMEND_GOOGLE_FORM_RESPONSES_CSV_URL', '')
+
+
+def _local_path(url):
+    if url.startswith('file://'):
+        return url[len('file://'):]
+    if url.startswith(('http://', 'https://')):
+        return None
+    return url
+
+
+def _open_if_changed(source):
+    """Return (binary stream, etag, last_modified), or None if the CSV is unchanged since the last poll."""
+    path = _local_path(source.url)
+    if path is not None:
+        stat = os.stat(path)
+        etag = f'{stat.st_mtime_ns}-{stat.st_size}'
+        if etag == source.etag:
+            return None
+        return open(path, 'rb'), etag, ''
+
+    headers = {'User-Agent': 'Mozilla/5.0'}
+    if source.etag:
+        headers['If-None-Match'] = source.etag
+    if source.last_modified:
+        headers['If-Modified-Since'] = source.last_modified
+    try:
+        response = urlopen(Request(source.url, headers=headers), timeout=FETCH_TIMEOUT)
+    except HTTPError as e:
+        if e.code == 304:
+            return None
+        raise
+    return response, response.headers.get('ETag', ''), response.headers.get('Last-Modified', '')
+
+
+def _find_column(header, keywords, exclude=()):
+    for i, title in enumerate(header[1:], start=1):
+        title = title.lower()
+        if any(k in title for k in keywords) and not any(k in title for k in exclude):
+            return i
+    return None
+
+
+def _month_of(value, date_order):
+    """First day of the month of a form timestamp such as '10/19/2026 14:03:22' or '2026-10-19 14:03'."""
+    m = _DATE_RE.match(value)
+    if not m:
+        return None
+    a, b, c = m.groups()
+    if len(a) == 4:
+        year, month = int(a), int(b)
+    elif date_order == 'DMY':
+        year, month = int(c), int(b)
+    else:
+        year, month = int(c), int(a)
+    if not 1 <= month <= 12 or year < 1000:
+        return None
+    return date(year, month, 1)
+
+
+class SurveyAggregator:
+    """Single-pass, column-wise aggregation of survey CSV rows in bounded memory.
+
+    Every row updates all per-question counters plus the monthly response, stress and
+    cause totals. Each question keeps at most `max_labels` distinct answers; later new
+    answers are pooled under OTHER_LABEL.
+    """
+
+    def __init__(self, header, known_labels=None, max_labels=MAX_LABELS_PER_QUESTION, date_order=None):
+        self.header = header
+        self.width = len(header)
+        self.max_labels = max_labels
+        self.date_order = (date_order or getattr(settings, 'MINDMEND_SURVEY_DATE_ORDER', 'MDY')).upper()
+        self.known = defaultdict(set)
+        for column, labels in (known_labels or {}).items():
+            self.known[column].update(labels)
+        self.counts = defaultdict(Counter)
+        self.months = defaultdict(lambda: {'responses': 0, 'stress_total': 0.0, 'stress_responses': 0, 'causes': Counter()})
+        self.rows = 0
+        self.stress_column = _find_column(header, STRESS_KEYWORDS, exclude=CAUSE_KEYWORDS)
+        self.cause_column = _find_column(header, CAUSE_KEYWORDS)
+
+    def _label(self, column, answer):
+        answer = answer[:MAX_ANSWER_LENGTH]
+        known = self.known[column]
+        if answer in known:
+            return answer
+        if len(known) >= self.max_labels:
+            return OTHER_LABEL
+        known.add(answer)
+        return answer
+
+    def add(self, row):
+        self.rows += 1
+        for column in range(1, min(len(row), self.width)):
+            answer = row[column]
+            if answer.strip():
+                self.counts[column][self._label(column, answer)] += 1
+
+        month = _month_of(row[0], self.date_order) if row else None
+        if month is None:
+            return
+        bucket = self.months[month]
+        bucket['responses'] += 1
+        if self.stress_column is not None and self.stress_column < len(row):
+            m = _NUMBER_RE.match(row[self.stress_column])
+            if m:
+                bucket['stress_total'] += float(m.group(1))
+                bucket['stress_responses'] += 1
+        if self.cause_column is not None and self.cause_column < len(row):
+            # Checkbox questions export several choices joined by ', '.
+            for cause in row[self.cause_column].split(', '):
+                if cause.strip():
+                    bucket['causes'][self._label('causes', cause.strip())] += 1
+
+    def consume(self, rows):
+        for row in rows:
+            self.add(row)
+        return self
+
+
+def _apply_aggregate(source, agg):
+    existing = {(c.column, c.answer): c for c in source.answer_counts.all()}
+    to_create, to_update = [], []
+    for column, counter in agg.counts.items():
+        for answer, n in counter.items():
+            row = existing.get((column, answer))
+            if row is None:
+                to_create.append(SurveyAnswerCount(source=source, column=column, answer=answer, count=n))
+            else:
+                row.count += n
+                to_update.append(row)
+    SurveyAnswerCount.objects.bulk_create(to_create, batch_size=500)
+    SurveyAnswerCount.objects.bulk_update(to_update, ['count'], batch_size=500)
+
+    stats = {s.month: s for s in source.monthly_stats.filter(month__in=list(agg.months))}
+    for month, bucket in agg.months.items():
+        stat = stats.get(month) or SurveyMonthlyStat(source=source, month=month)
+        stat.responses += bucket['responses']
+        stat.stress_total += bucket['stress_total']
+        stat.stress_responses += bucket['stress_responses']
+        causes = Counter(stat.causes)
+        causes.update(bucket['causes'])
+        stat.causes = dict(causes)
+        stat.save()
+
+
+def _known_labels(source):
+    known = defaultdict(set)
+    for column, answer in source.answer_counts.values_list('column', 'answer'):
+        known[column].add(answer)
+    return known
+
+
+def _ingest_stream(source_id, text, etag, last_modified):
+    """Aggregate rows past the ingested prefix. Returns the new row count, or None if the sheet shrank."""
+    reader = csv.reader(text)
+    header = next(reader, [])
+    fingerprint = hashlib.sha256('\x1f'.join(header).encode('utf-8')).hexdigest()
+
+    with transaction.atomic():
+        source = SurveySource.objects.select_for_update().get(pk=source_id)
+        if fingerprint != source.header_fingerprint:
+            # Questions were added, removed or reworded: recount everything.
+            source.answer_counts.all().delete()
+            source.monthly_stats.all().delete()
+            source.rows_ingested = 0
+        skipped = sum(1 for _ in islice(reader, source.rows_ingested))
+        if skipped < source.rows_ingested:
+            return None
+
+        agg = SurveyAggregator(header, known_labels=_known_labels(source)).consume(reader)
+        _apply_aggregate(source, agg)
+
+        now = timezone.now()
+        if agg.rows or fingerprint != source.header_fingerprint:
+            source.last_changed_at = now
+        source.headers = header
+        source.header_fingerprint = fingerprint
+        source.rows_ingested += agg.rows
+        source.etag = etag
+        source.last_modified = last_modified
+        source.last_polled_at = now
+        source.last_error = ''
+        source.save()
+    return agg.rows
+
+
+def ingest_survey(url=None, force=False):
+    """Poll the survey CSV and fold newly appended rows into the counters; returns the new row count."""
+    url = url or survey_csv_url()
+    if not url:
+        return 0
+    source, _ = SurveySource.objects.get_or_create(url=url)
+    if force:
+        source.etag = source.last_modified = ''
+    try:
+        opened = _open_if_changed(source)
+        if opened is None:
+            SurveySource.objects.filter(pk=source.pk).update(last_polled_at=timezone.now(), last_error='')
+            return 0
+        stream, etag, last_modified = opened
+        with stream:
+            new_rows = _ingest_stream(source.pk, io.TextIOWrapper(stream, encoding='utf-8', newline=''), etag, last_modified)
+    except Exception as e:
+        print(f"Error ingesting survey CSV: {e}")
+        SurveySource.objects.filter(pk=source.pk).update(last_polled_at=timezone.now(), last_error=str(e)[:500])
+        return 0
+
+    if new_rows is None:
+        # Rows were deleted from the sheet, so the ingested prefix is no longer valid.
+        with transaction.atomic():
+            SurveyAnswerCount.objects.filter(source_id=source.pk).delete()
+            SurveyMonthlyStat.objects.filter(source_id=source.pk).delete()
+            SurveySource.objects.filter(pk=source.pk).update(rows_ingested=0, header_fingerprint='')
+        return ingest_survey(url, force=True)
+    return new_rows
+
+
+def survey_summary(url=None):
+    """Per-question answer counts in the shape the survey dashboards render."""
+    source = SurveySource.objects.filter(url=url or survey_csv_url()).first()
+    if source is None or not source.rows_ingested:
+        return dict(EMPTY_SUMMARY)
+
+    questions = []
+    rows = source.answer_counts.order_by('column', '-count', 'id').values_list('column', 'answer', 'count')
+    for column, group in groupby(rows, key=itemgetter(0)):
+        ordered = [(answer, n) for _, answer, n in group]
+        labels = [answer for answer, _ in ordered]
+        data = [n for _, n in ordered]
+        questions.append({
+            'question': source.headers[column] if column < len(source.headers) else '',
+            'responses': sum(data),
+            'type': 'pie' if len(labels) <= 5 else 'bar',
+            'labels': labels,
+            'data': data,
+        })
+    return {'total_responses': source.rows_ingested, 'questions': questions}
+
+
+def _shift_month(month, delta):
+    index = month.year * 12 + month.month - 1 + delta
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _top_cause(causes):
+    return Counter(causes).most_common(1)[0][0] if causes else '—'
+
+
+def _stress_label(total, responses):
+    return f'{total / responses:.1f}/{STRESS_SCALE}' if responses else '—'
+
+
+def survey_sentiment_summary(url=None, months=6, series=3):
+    """Monthly cards, top causes and per-month cause series for the sentiment dashboard."""
+    source = SurveySource.objects.filter(url=url or survey_csv_url()).first()
+    this_month = timezone.now().date().replace(day=1)
+    window = [_shift_month(this_month, -i) for i in range(months - 1, -1, -1)]
+    summary = {
+        'total_responses': source.rows_ingested if source else 0,
+        'monthly_cards': [], 'top_causes': [], 'cause_series': [],
+        'month_labels': [m.strftime('%b') for m in window],
+    }
+    if source is None or not source.rows_ingested:
+        return summary
+
+    stats = {s.month: s for s in source.monthly_stats.all()}
+    overall = Counter()
+    stress_total = stress_responses = 0
+    for stat in stats.values():
+        overall.update(stat.causes)
+        stress_total += stat.stress_total
+        stress_responses += stat.stress_responses
+
+    cards = []
+    for label, month in (('This Month', this_month), ('Last Month', _shift_month(this_month, -1))):
+        stat = stats.get(month)
+        cards.append({
+            'label': label, 'month': month.strftime('%b'),
+            'responses': stat.responses if stat else 0,
+            'avg_stress': _stress_label(stat.stress_total, stat.stress_responses) if stat else '—',
+            'top_cause': _top_cause(stat.causes) if stat else '—',
+        })
+    cards.append({
+        'label': 'Overall Avg', 'month': 'All Time', 'responses': source.rows_ingested,
+        'avg_stress': _stress_label(stress_total, stress_responses), 'top_cause': _top_cause(overall),
+    })
+
+    top = [cause for cause, _ in overall.most_common(4)]
+    summary.update({
+        'monthly_cards': cards,
+        'top_causes': top,
+        'cause_series': [
+            {'name': cause, 'data': [stats[m].causes.get(cause, 0) if m in stats else 0 for m in window]}
+            for cause in top[:series]
+        ],
+    })
+    return summary
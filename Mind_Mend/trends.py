@@ -0,0 +1,144 @@
+"""
+MindMend wellness trend charts.
+Buckets a user's mood entries and assessment scores into daily, weekly and monthly
+series with NumPy grouped reductions, and caches the result per user version.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import MoodEntry, AssessmentResult, WellnessVersion
+
+ASSESSMENT_METRICS = ('phq9', 'gad7', 'pss')
+METRICS = ASSESSMENT_METRICS + ('mood',)
+TREND_WINDOW_DAYS = 365
+TREND_CACHE_TIMEOUT = 60 * 60 * 24
+
+_EPOCH_WEEKDAY_OFFSET = 3  # 1970-01-01 was a Thursday; shifts day numbers so Monday == 0
+_EPOCH_ORDINAL = 719163  # date(1970, 1, 1).toordinal()
+_METRIC_CODES = {metric: code for code, metric in enumerate(ASSESSMENT_METRICS)}
+
+
+def empty_charts():
+    return {period: {'labels': [], **{m: [] for m in METRICS}} for period in ('daily', 'weekly', 'monthly')}
+
+
+def _day_array(dates):
+    # Converting date objects through ordinals is far cheaper than np.array(dates, 'datetime64[D]').
+    return (np.fromiter((d.toordinal() for d in dates), dtype=np.int64) - _EPOCH_ORDINAL).astype('datetime64[D]')
+
+
+def _to_list(values, counts):
+    return [v if c else None for v, c in zip(values.tolist(), counts.tolist())]
+
+
+def _group_means(daily, present, inverse, n_groups):
+    """Mean of the present daily values in each group; None for groups with no data."""
+    counts = np.bincount(inverse[present], minlength=n_groups)
+    sums = np.bincount(inverse[present], weights=daily[present], minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return _to_list(sums / counts, counts)
+
+
+def bucket_trends(mood_rows, assessment_rows, end_date):
+    """Build the dashboard trend series from raw rows.
+
+    mood_rows are (date, mood) pairs; assessment_rows are (date, type, score) triples in
+    chronological order, so the last score of a day wins. Daily labels run from the
+    first data day to end_date; weeks are labelled 'Week %V, %Y' and months '%b %Y'.
+    """
+    charts = empty_charts()
+    mood_dates = _day_array(d for d, _ in mood_rows)
+    mood_values = np.fromiter((v for _, v in mood_rows), dtype=np.float64, count=len(mood_rows))
+    a_dates = _day_array(d for d, _, _ in assessment_rows)
+    a_types = np.fromiter((_METRIC_CODES.get(t, -1) for _, t, _ in assessment_rows), dtype=np.int64,
+                          count=len(assessment_rows))
+    a_scores = np.fromiter((s for _, _, s in assessment_rows), dtype=np.int64, count=len(assessment_rows))
+
+    if not len(mood_dates) and not len(a_dates):
+        return charts
+    first = min(x.min() for x in (mood_dates, a_dates) if len(x))
+    end = np.datetime64(end_date, 'D')
+    if first > end:
+        return charts
+
+    days = np.arange(first, end + 1)
+    n_days = len(days)
+    charts['daily']['labels'] = np.datetime_as_string(days).tolist()
+
+    daily, present = {}, {}
+    idx = (mood_dates - first).astype(np.int64)
+    keep = idx < n_days
+    counts = np.bincount(idx[keep], minlength=n_days)
+    sums = np.bincount(idx[keep], weights=mood_values[keep], minlength=n_days)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        daily['mood'] = sums / counts
+    present['mood'] = counts > 0
+    charts['daily']['mood'] = _to_list(daily['mood'], counts)
+
+    a_idx = (a_dates - first).astype(np.int64)
+    for metric in ASSESSMENT_METRICS:
+        mask = (a_types == _METRIC_CODES[metric]) & (a_idx < n_days)
+        m_idx, m_scores = a_idx[mask][::-1], a_scores[mask][::-1]
+        # On the reversed rows, the first occurrence of each day is its latest score.
+        uniq, pos = np.unique(m_idx, return_index=True)
+        values = np.zeros(n_days, dtype=np.int64)
+        values[uniq] = m_scores[pos]
+        has = np.zeros(n_days, dtype=bool)
+        has[uniq] = True
+        daily[metric], present[metric] = values.astype(np.float64), has
+        charts['daily'][metric] = _to_list(values, has)
+
+    day_numbers = days.astype(np.int64)
+    weekday = (day_numbers + _EPOCH_WEEKDAY_OFFSET) % 7
+    thursday = days - weekday + 3
+    iso_year_start = thursday.astype('datetime64[Y]').astype('datetime64[D]')
+    iso_week = (thursday - iso_year_start).astype(np.int64) // 7 + 1
+    year = days.astype('datetime64[Y]').astype(np.int64) + 1970
+    month = days.astype('datetime64[M]')
+
+    # '%V' is the ISO week but '%Y' the calendar year, so the same label can recur
+    # (e.g. late December and early January); group by label, in first-seen order.
+    periods = {
+        'weekly': (year * 100 + iso_week, lambda code: f'Week {code % 100:02d}, {code // 100}'),
+        'monthly': (month.astype(np.int64), lambda code: np.datetime64(int(code), 'M').item().strftime('%b %Y')),
+    }
+    for period, (codes, label) in periods.items():
+        uniq, first_seen, inverse = np.unique(codes, return_index=True, return_inverse=True)
+        order = np.argsort(first_seen)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        inverse = rank[inverse.reshape(-1)]
+        charts[period]['labels'] = [label(int(code)) for code in uniq[order]]
+        for metric in METRICS:
+            charts[period][metric] = _group_means(daily[metric], present[metric], inverse, len(uniq))
+
+    return charts
+
+
+def build_trend_charts(user, end_date=None):
+    end_date = end_date or timezone.now().date()
+    start_date = end_date - timedelta(days=TREND_WINDOW_DAYS)
+    mood_rows = list(
+        MoodEntry.objects.filter(user=user, date__gte=start_date)
+        .order_by('date', 'created_at').values_list('date', 'mood')
+    )
+    assessment_rows = [
+        (created_at.date(), a_type, score)
+        for created_at, a_type, score in AssessmentResult.objects.filter(user=user, created_at__date__gte=start_date)
+        .order_by('created_at').values_list('created_at', 'assessment_type', 'total_score')
+    ]
+    return bucket_trends(mood_rows, assessment_rows, end_date)
+
+
+def cached_trend_charts(user):
+    """Trend charts for the dashboard, recomputed only after the user's wellness data changes."""
+    today = timezone.now().date()
+    key = f'trend_charts:{user.pk}:{WellnessVersion.current(user.pk)}:{today.isoformat()}'
+    charts = cache.get(key)
+    if charts is None:
+        charts = build_trend_charts(user, today)
+        cache.set(key, charts, TREND_CACHE_TIMEOUT)
+    return charts
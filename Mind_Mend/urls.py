@@ -51,6 +51,10 @@ urlpatterns = [
     path('book/', counsellor.counsellor_booking, name='counsellor_booking'),
     path('book/instant/', counsellor.instant_booking, name='instant_booking'),
     path('book/instant-connect/<int:booking_id>/', counsellor.instant_connect, name='instant_connect'),
+    path('book/instant/queue/', counsellor.instant_queue_join, name='instant_queue_join'),
+    path('book/instant/queue/<int:request_id>/', counsellor.instant_queue, name='instant_queue'),
+    path('book/instant/queue/<int:request_id>/status/', counsellor.instant_queue_status, name='instant_queue_status'),
+    path('book/instant/queue/<int:request_id>/cancel/', counsellor.instant_queue_cancel, name='instant_queue_cancel'),
     path('book/counsellor/<int:counsellor_id>/details/', counsellor.counsellor_detail, name='counsellor_detail'),
     
     path('wallet/', counsellor.wallet_dashboard, name='wallet_dashboard'),
@@ -63,12 +67,17 @@ urlpatterns = [
     path('earnings/', counsellor.counsellor_earnings_dashboard, name='counsellor_earnings_dashboard'),
     path('penalties/', counsellor.counsellor_penalties, name='counsellor_penalties'),
     path('payout-history/', counsellor.counsellor_payout_history, name='counsellor_payout_history'),
+    path('doctor/reports/', counsellor.counsellor_patient_reports, name='counsellor_patient_reports'),
+    path('doctor/reports/<int:report_id>/download/', counsellor.counsellor_download_patient_report, name='counsellor_download_patient_report'),
     path('admin/revenue/', counsellor.admin_revenue_dashboard, name='admin_revenue_dashboard'),
+    path('admin/revenue/timeseries/', counsellor.admin_revenue_timeseries, name='admin_revenue_timeseries'),
     path('admin/revenue/history/', counsellor.admin_payout_history, name='admin_payout_history'),
     path('admin/revenue/history/<int:settlement_id>/reference/', counsellor.admin_update_settlement_reference, name='admin_update_settlement_reference'),
     path('admin/disputes/', counsellor.admin_disputes, name='admin_disputes'),
     path('admin/dispute/<int:dispute_id>/resolve/', counsellor.admin_resolve_dispute, name='admin_resolve_dispute'),
     path('admin/revenue/settle/<int:counsellor_id>/', counsellor.admin_mark_settled, name='admin_mark_settled'),
+    path('admin/revenue/settle/all/', counsellor.admin_settle_all, name='admin_settle_all'),
+    path('admin/revenue/runs/<int:run_id>/batch.csv', counsellor.admin_settlement_batch, name='admin_settlement_batch'),
     path('wallet/add/checkout/', counsellor.add_money_checkout, name='add_money_checkout'),
     path('wallet/add/verify/', counsellor.add_money_verify, name='add_money_verify'),
     path('book/how-to/', counsellor.how_to_book, name='how_to_book'),
@@ -90,11 +99,15 @@ urlpatterns = [
     path('api/booking/<int:booking_id>/messages/', counsellor.booking_messages_api, name='booking_messages_api'),
     path('api/doctor/notifications/', counsellor.doctor_notifications_api, name='doctor_notifications_api'),
     path('api/doctor/notifications/mark-read/', counsellor.doctor_notifications_mark_read_api, name='doctor_notifications_mark_read_api'),
+    path('api/doctor/bookings/history/', counsellor.doctor_booking_history_api, name='doctor_booking_history_api'),
+    path('api/doctor/bookings/upcoming/', counsellor.doctor_upcoming_bookings_api, name='doctor_upcoming_bookings_api'),
     path('booking/<int:booking_id>/review/', counsellor.submit_review, name='submit_review'),
-    path('payment/<int:booking_id>/', counsellor.checkout_payment, name='checkout_payment'),
-    path('payment/<int:booking_id>/verify/', counsellor.razorpay_payment_verify, name='razorpay_payment_verify'),
+    path('payment/<uuid:token>/', counsellor.checkout_payment, name='checkout_payment'),
+    path('payment/<uuid:token>/release/', counsellor.release_slot_hold, name='release_slot_hold'),
+    path('payment/<uuid:token>/verify/', counsellor.razorpay_payment_verify, name='razorpay_payment_verify'),
     path('payment/webhook/', counsellor.razorpay_webhook, name='razorpay_webhook'),
     path('api/counsellor/<int:counsellor_id>/booked-slots/', counsellor.get_booked_slots, name='get_booked_slots'),
+    path('api/counsellors/availability/', counsellor.get_availability, name='get_availability'),
     # Mood
     path('mood/', analytics.mood_tracker, name='mood_tracker'),
     path('mood/entries/', analytics.mood_entries_all, name='mood_entries_all'),
@@ -110,6 +123,8 @@ urlpatterns = [
 
     path('survey-analytics/', analytics.survey_analytics, name='survey_analytics'),
     path('survey-sentiment/', analytics.survey_sentiment_dashboard, name='survey_sentiment_dashboard'),
+    path('admin/analytics/export/<str:table>/', analytics.admin_analytics_export, name='admin_analytics_export'),
+    path('admin/analytics/outcomes/', analytics.admin_cohort_outcomes, name='admin_cohort_outcomes'),
     path('my-progress/report.pdf', analytics.download_progress_report_pdf, name='download_progress_report_pdf'),
 
     # Location Map (staff only)
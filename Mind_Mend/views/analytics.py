@@ -1,23 +1,26 @@
 import json
-import csv
 import io
 import re
 from datetime import timedelta, datetime
 from collections import Counter, defaultdict
-from urllib.error import URLError, HTTPError
-from urllib.request import Request, urlopen
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, HttpResponse, Http404
 from django.db.models import Avg
 from django.utils import timezone
 from django.core.cache import cache
 from django.conf import settings
 
-from ..models import UserAccessLocation, MoodEntry, AssessmentResult, Counsellor
+from ..models import UserAccessLocation, MoodEntry, MoodStreak, AssessmentResult, LatestAssessment, Counsellor, WellnessVersion
 from ..forms import MoodEntryForm
+from ..trends import cached_trend_charts
+from ..reports import normalize_period, render_report_now, request_report
+from ..survey import survey_sentiment_summary, survey_summary
+from ..cohorts import GROUPINGS, RETENTION_WEEKS, cached_cohort_outcomes
+from ..exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, EXPORT_TABLES, default_format, iter_export_chunks, pq, write_chunk
 
 try:
     from reportlab.lib.pagesizes import A4
@@ -236,13 +239,15 @@ def mental_health_heatmap(request):
         user_to_region[loc.user_id] = {'country': loc.country or 'Unknown', 'state': loc.state or '', 'lat': float(loc.latitude), 'lon': float(loc.longitude)}
 
     region_data = defaultdict(lambda: {'phq9': [], 'pss': [], 'mood': [], 'lat': [], 'lon': []})
+    latest_by_user = LatestAssessment.for_users(user_to_region)
     for uid, r in user_to_region.items():
         key = (r['country'], r['state'])
         if r['lat'] and r['lon']: region_data[key]['lat'].append(r['lat']); region_data[key]['lon'].append(r['lon'])
-        phq9 = AssessmentResult.objects.filter(user_id=uid, assessment_type='phq9', created_at__gte=cutoff).order_by('-created_at').first()
-        if phq9: region_data[key]['phq9'].append(phq9.total_score)
-        pss = AssessmentResult.objects.filter(user_id=uid, assessment_type='pss', created_at__gte=cutoff).order_by('-created_at').first()
-        if pss: region_data[key]['pss'].append(pss.total_score)
+        latest = latest_by_user[uid]
+        phq9 = latest.get('phq9')
+        if phq9 and phq9.created_at >= cutoff: region_data[key]['phq9'].append(phq9.total_score)
+        pss = latest.get('pss')
+        if pss and pss.created_at >= cutoff: region_data[key]['pss'].append(pss.total_score)
         avg_mood = MoodEntry.objects.filter(user_id=uid, created_at__gte=cutoff).aggregate(Avg('mood'))['mood__avg']
         if avg_mood: region_data[key]['mood'].append(float(avg_mood))
 
@@ -274,8 +279,8 @@ def _mental_health_score(user):
     if not _has_mental_data(user): return 0
     avg_mood = MoodEntry.objects.filter(user=user).order_by('-date')[:14].aggregate(Avg('mood'))['mood__avg']
     mood_comp = (float(avg_mood) / 5.0 * 60) if avg_mood else 50
-    phq9 = AssessmentResult.objects.filter(user=user, assessment_type='phq9').order_by('-created_at').first()
-    pss = AssessmentResult.objects.filter(user=user, assessment_type='pss').order_by('-created_at').first()
+    latest = LatestAssessment.for_user(user.id)
+    phq9, pss = latest.get('phq9'), latest.get('pss')
     pen = 0
     if phq9 and phq9.total_score >= 10: pen += min(20, (phq9.total_score - 9) * 2)
     if pss and pss.total_score >= 11: pen += min(20, (pss.total_score - 10) * 2)
@@ -314,99 +319,10 @@ def _emotional_patterns(user):
     return patterns or ["Your mood is stable."]
 
 def _streak_days(user):
-    streak, check = 0, timezone.now().date()
-    for _ in range(60):
-        if MoodEntry.objects.filter(user=user, date=check).exists(): streak += 1; check -= timedelta(days=1)
-        else: break
-    return streak
+    return MoodStreak.current_for(user)
 
 def _generate_trend_charts(user):
-    from collections import defaultdict
-    end_date = timezone.now().date()
-    start_date = end_date - timedelta(days=365)
-
-    moods = MoodEntry.objects.filter(user=user, date__gte=start_date).order_by('date', 'created_at')
-    assessments = AssessmentResult.objects.filter(user=user, created_at__date__gte=start_date).order_by('created_at')
-
-    daily_data = defaultdict(lambda: {'phq9': None, 'gad7': None, 'pss': None, 'mood': []})
-    for m in moods:
-        daily_data[m.date]['mood'].append(m.mood)
-
-    for a in assessments:
-        d = a.created_at.date()
-        # Keep the latest score of the day for the given assessment type
-        daily_data[d][a.assessment_type] = a.total_score
-
-    charts = {
-        'daily': {'labels': [], 'phq9': [], 'gad7': [], 'pss': [], 'mood': []},
-        'weekly': {'labels': [], 'phq9': [], 'gad7': [], 'pss': [], 'mood': []},
-        'monthly': {'labels': [], 'phq9': [], 'gad7': [], 'pss': [], 'mood': []}
-    }
-
-    if not daily_data:
-        return charts
-
-    first_date = min(daily_data.keys())
-    current = first_date
-
-    weekly_acc = defaultdict(lambda: {'phq9': [], 'gad7': [], 'pss': [], 'mood': []})
-    monthly_acc = defaultdict(lambda: {'phq9': [], 'gad7': [], 'pss': [], 'mood': []})
-
-    while current <= end_date:
-        d_str = current.strftime('%Y-%m-%d')
-        # Use strftime format suitable for weeks and months
-        w_str = current.strftime('Week %V, %Y')
-        m_str = current.strftime('%b %Y')
-
-        charts['daily']['labels'].append(d_str)
-
-        raw = daily_data.get(current, {'phq9': None, 'gad7': None, 'pss': None, 'mood': []})
-        
-        phq9 = raw['phq9']
-        gad7 = raw['gad7']
-        pss = raw['pss']
-        mood = sum(raw['mood']) / len(raw['mood']) if raw['mood'] else None
-
-        charts['daily']['phq9'].append(phq9)
-        charts['daily']['gad7'].append(gad7)
-        charts['daily']['pss'].append(pss)
-        charts['daily']['mood'].append(mood)
-
-        if phq9 is not None:
-            weekly_acc[w_str]['phq9'].append(phq9)
-            monthly_acc[m_str]['phq9'].append(phq9)
-        if gad7 is not None:
-            weekly_acc[w_str]['gad7'].append(gad7)
-            monthly_acc[m_str]['gad7'].append(gad7)
-        if pss is not None:
-            weekly_acc[w_str]['pss'].append(pss)
-            monthly_acc[m_str]['pss'].append(pss)
-        if mood is not None:
-            weekly_acc[w_str]['mood'].append(mood)
-            monthly_acc[m_str]['mood'].append(mood)
-
-        if w_str not in charts['weekly']['labels']:
-            charts['weekly']['labels'].append(w_str)
-        if m_str not in charts['monthly']['labels']:
-            charts['monthly']['labels'].append(m_str)
-
-        current += timedelta(days=1)
-
-    for w_str in charts['weekly']['labels']:
-        w_data = weekly_acc[w_str]
-        charts['weekly']['phq9'].append(sum(w_data['phq9']) / len(w_data['phq9']) if w_data['phq9'] else None)
-        charts['weekly']['gad7'].append(sum(w_data['gad7']) / len(w_data['gad7']) if w_data['gad7'] else None)
-        charts['weekly']['pss'].append(sum(w_data['pss']) / len(w_data['pss']) if w_data['pss'] else None)
-        charts['weekly']['mood'].append(sum(w_data['mood']) / len(w_data['mood']) if w_data['mood'] else None)
-
-    for m_str in charts['monthly']['labels']:
-        m_data = monthly_acc[m_str]
-        charts['monthly']['phq9'].append(sum(m_data['phq9']) / len(m_data['phq9']) if m_data['phq9'] else None)
-        charts['monthly']['gad7'].append(sum(m_data['gad7']) / len(m_data['gad7']) if m_data['gad7'] else None)
-        charts['monthly']['pss'].append(sum(m_data['pss']) / len(m_data['pss']) if m_data['pss'] else None)
-        charts['monthly']['mood'].append(sum(m_data['mood']) / len(m_data['mood']) if m_data['mood'] else None)
-
-    return charts
+    return cached_trend_charts(user)
 
 def _generate_badges(daily_charts):
     badges = {}
@@ -428,26 +344,41 @@ def _generate_badges(daily_charts):
     return badges
 
 
-@login_required
-def dashboard(request):
+DASHBOARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _dashboard_context(user):
     seven_days_ago = timezone.now().date() - timedelta(days=7)
-    mood_entries = MoodEntry.objects.filter(user=request.user, date__gte=seven_days_ago).order_by('-date', '-created_at')
-    avg_mood = mood_entries.aggregate(Avg('mood'))['mood__avg']
-    mood_data = [{'date': f"{e.date.strftime('%b %d')} {e.created_at.strftime('%H:%M')}", 'mood': e.mood} for e in list(mood_entries)[::-1]]
-    score = _mental_health_score(request.user)
-    charts = _generate_trend_charts(request.user)
+    mood_entries = list(MoodEntry.objects.filter(user=user, date__gte=seven_days_ago).order_by('-date', '-created_at'))
+    avg_mood = (sum(e.mood for e in mood_entries) / len(mood_entries)) if mood_entries else None
+    mood_data = [{'date': f"{e.date.strftime('%b %d')} {e.created_at.strftime('%H:%M')}", 'mood': e.mood} for e in mood_entries[::-1]]
+    score = _mental_health_score(user)
+    charts = _generate_trend_charts(user)
     badges = _generate_badges(charts['daily'])
 
-    return render(request, 'Mind_Mend/dashboard/dashboard.html', {
+    return {
         'mood_entries': mood_entries, 'avg_mood': round(avg_mood, 1) if avg_mood else None,
-        'assessments': AssessmentResult.objects.filter(user=request.user).order_by('-created_at')[:5],
-        'mood_data': mood_data, 'emotional_patterns': _emotional_patterns(request.user),
-        'mental_health_score': score, 'wellness_suggestions': _wellness_suggestions(request.user, score),
-        'is_counsellor': Counsellor.objects.filter(user=request.user).exists(),
-        'streak': _streak_days(request.user),
+        'assessments': list(AssessmentResult.objects.filter(user=user).order_by('-created_at')[:5]),
+        'mood_data': mood_data, 'emotional_patterns': _emotional_patterns(user),
+        'mental_health_score': score, 'wellness_suggestions': _wellness_suggestions(user, score),
+        'is_counsellor': Counsellor.objects.filter(user=user).exists(),
+        'streak': _streak_days(user),
         'trend_charts': charts,
         'badges': badges
-    })
+    }
+
+
+@login_required
+def dashboard(request):
+    # Everything on the dashboard derives from mood, assessment and booking rows, whose
+    # writes bump the user's WellnessVersion; repeat views cost a version lookup and one cache read.
+    today = timezone.now().date()
+    key = f'dashboard:{request.user.pk}:{today.isoformat()}:{WellnessVersion.current(request.user.pk)}'
+    context = cache.get(key)
+    if context is None:
+        context = _dashboard_context(request.user)
+        cache.set(key, context, DASHBOARD_CACHE_TIMEOUT)
+    return render(request, 'Mind_Mend/dashboard/dashboard.html', context)
 
 
 @login_required
@@ -456,310 +387,24 @@ def download_progress_report_pdf(request):
         messages.error(request, 'PDF dependency (reportlab) is missing. Please contact support.')
         return redirect('dashboard')
 
-    from reportlab.lib import colors
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.units import mm
-    from reportlab.pdfgen import canvas as pdf_canvas
-
-    # ── Determine report period ──────────────────────────────────────────────
-    period = request.GET.get('period', 'monthly').strip().lower()
-    if period not in ('daily', 'weekly', 'monthly'):
-        period = 'monthly'
-    period_days = {'daily': 1, 'weekly': 7, 'monthly': 30}[period]
-    period_label = period.capitalize()
-
-    cutoff = timezone.now().date() - timedelta(days=period_days)
+    period = normalize_period(request.GET.get('period'))
+    report = request_report(request.user, period)
+    if report.status == 'pending' and getattr(settings, 'MINDMEND_RENDER_REPORTS_INLINE', False):
+        report = render_report_now(report)
 
-    # ── User & Profile info ──────────────────────────────────────────────────
-    user = request.user
-    try:
-        profile = user.profile
-    except Exception:
-        profile = None
-
-    full_name = user.get_full_name().strip() or user.username
-    dob        = getattr(profile, 'dob', None)
-    gender     = getattr(profile, 'get_gender_display', lambda: '')() if profile else ''
-    occupation = getattr(profile, 'occupation', '') or ''
-
-    age = ''
-    if dob:
-        today = timezone.now().date()
-        age   = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-
-    # ── Mental health score ──────────────────────────────────────────────────
-    mh_score = _mental_health_score(user)
-
-    # ── Assessments ─────────────────────────────────────────────────────────
-    def last5(atype):
-        return list(
-            AssessmentResult.objects.filter(user=user, assessment_type=atype)
-            .order_by('-created_at')[:5]
-        )
-
-    phq9_list = last5('phq9')
-    gad7_list = last5('gad7')
-    pss_list  = last5('pss')
-
-    def trend_label(scores):
-        """Return 'Improving', 'Worsening', or 'Stable' for a list of scores (newest first)."""
-        vals = [s.total_score for s in scores]
-        if len(vals) < 2:
-            return 'Insufficient data'
-        if vals[0] < vals[-1]:
-            return 'Improving ↑'
-        if vals[0] > vals[-1]:
-            return 'Worsening ↓'
-        return 'Stable →'
-
-    # ── Mood trend ───────────────────────────────────────────────────────────
-    mood_entries = list(
-        MoodEntry.objects.filter(user=user, date__gte=cutoff)
-        .order_by('date')[:30]
-    )
-    avg_mood = (
-        sum(e.mood for e in mood_entries) / len(mood_entries)
-        if mood_entries else None
-    )
-
-    # ── Build PDF ────────────────────────────────────────────────────────────
-    buf = io.BytesIO()
-    W, H = A4
-    p = pdf_canvas.Canvas(buf, pagesize=A4)
-
-    TEAL    = colors.HexColor('#00d1b2')
-    DARK    = colors.HexColor('#050b1a')
-    GRAY    = colors.HexColor('#555555')
-    LGRAY   = colors.HexColor('#cccccc')
-    WHITE   = colors.white
-    BLACK   = colors.black
-    RED     = colors.HexColor('#e74c3c')
-    ORANGE  = colors.HexColor('#e67e22')
-    GREEN   = colors.HexColor('#27ae60')
-
-    MARGIN  = 20 * mm
-    y       = H - 20 * mm   # current drawing y-position
-
-    def rule(col=TEAL, lw=0.5):
-        nonlocal y
-        p.setStrokeColor(col)
-        p.setLineWidth(lw)
-        p.line(MARGIN, y, W - MARGIN, y)
-        y -= 6
-
-    def section_title(text):
-        nonlocal y
-        maybe_new_page(18)
-        y -= 4
-        p.setFont('Helvetica-Bold', 12)
-        p.setFillColor(TEAL)
-        p.drawString(MARGIN, y, text)
-        y -= 4
-        rule(TEAL, 0.8)
-
-    def body(text, indent=0, bold=False, color=None):
-        nonlocal y
-        maybe_new_page(10)
-        p.setFont('Helvetica-Bold' if bold else 'Helvetica', 10)
-        p.setFillColor(color or BLACK)
-        p.drawString(MARGIN + indent, y, text)
-        y -= 14
-
-    def maybe_new_page(need=30):
-        nonlocal y
-        if y < MARGIN + need:
-            p.showPage()
-            y = H - MARGIN
-            draw_header()
-
-    def draw_header():
-        nonlocal y
-        p.setFillColor(DARK)
-        p.rect(0, H - 30 * mm, W, 30 * mm, fill=1, stroke=0)
-        p.setFont('Helvetica-Bold', 20)
-        p.setFillColor(WHITE)
-        p.drawString(MARGIN, H - 16 * mm, 'MindMend')
-        p.setFont('Helvetica', 10)
-        p.setFillColor(TEAL)
-        p.drawString(MARGIN + 80, H - 15.5 * mm, 'Mental Health Progress Report')
-        p.setFont('Helvetica', 8)
-        p.setFillColor(LGRAY)
-        p.drawRightString(W - MARGIN, H - 16 * mm,
-                          f'Generated: {timezone.now().strftime("%d %b %Y %H:%M")}')
-        y = H - 34 * mm
-
-    # --- PAGE 1 ---
-    draw_header()
-
-    # Report period banner
-    p.setFillColor(colors.HexColor('#0b162d'))
-    p.roundRect(MARGIN, y - 18, W - 2 * MARGIN, 22, 6, fill=1, stroke=0)
-    p.setFont('Helvetica-Bold', 10)
-    p.setFillColor(TEAL)
-    p.drawString(MARGIN + 8, y - 10, f'Report Period:  {period_label}  '
-                 f'({cutoff.strftime("%d %b %Y")} – {timezone.now().strftime("%d %b %Y")})')
-    y -= 26
-
-    # ── User Info ────────────────────────────────────────────────────────────
-    section_title('👤  Patient Information')
-    body(f'Name         :  {full_name}')
-    if age:
-        body(f'Age          :  {age} years')
-    if dob:
-        body(f'Date of Birth:  {dob.strftime("%d %B %Y")}')
-    if gender:
-        body(f'Gender       :  {gender}')
-    if occupation:
-        body(f'Occupation   :  {occupation}')
-    body(f'Username     :  @{user.username}')
-    body(f'Email        :  {user.email}')
-
-    # ── Mental Health Score ──────────────────────────────────────────────────
-    section_title('🧠  Overall Mental Health Score')
-    score_color = GREEN if mh_score >= 70 else ORANGE if mh_score >= 45 else RED
-    body(f'Score  :  {mh_score} / 100', bold=True, color=score_color)
-    if mh_score >= 70:
-        body('Status :  Good — Keep maintaining your healthy habits!', color=GREEN)
-    elif mh_score >= 45:
-        body('Status :  Fair — Consider small daily wellness steps.', color=ORANGE)
+    if report.status == 'ready':
+        return FileResponse(report.file.open('rb'), as_attachment=True,
+                            filename=report.download_name(), content_type='application/pdf')
+    if report.status == 'failed':
+        messages.error(request, 'We could not generate your report. Please try again later.')
     else:
-        body('Status :  Needs Attention — Please consider speaking to a counsellor.', color=RED)
-
-    # ── Assessment Results ────────────────────────────────────────────────────
-    label_map = {
-        'phq9': ('PHQ-9 (Depression)', phq9_list),
-        'gad7': ('GAD-7 (Anxiety)',    gad7_list),
-        'pss':  ('PSS-10 (Stress)',    pss_list),
-    }
-    MOOD_LABELS = {1: 'Very Low', 2: 'Low', 3: 'Neutral', 4: 'Good', 5: 'Very Good'}
-
-    section_title('📋  Assessment Scores (Last 5 Each)')
-
-    for atype, (title, alist) in label_map.items():
-        maybe_new_page(60)
-        p.setFont('Helvetica-Bold', 10)
-        p.setFillColor(DARK)
-        p.drawString(MARGIN, y, f'  {title}')
-        y -= 14
-
-        if not alist:
-            body('  No assessments recorded yet.', indent=8, color=GRAY)
-        else:
-            for i, a in enumerate(alist, 1):
-                date_str = a.created_at.strftime('%d %b %Y')
-                body(f'  {i}.  Score: {a.total_score:>3}   Level: {a.result_level:<20}  Date: {date_str}',
-                     indent=8)
-            trend = trend_label(alist)
-            t_color = GREEN if 'Improv' in trend else RED if 'Wors' in trend else GRAY
-            body(f'  Trend: {trend}', indent=8, bold=True, color=t_color)
-        y -= 4
-
-    # ── Mood Trend ────────────────────────────────────────────────────────────
-    section_title(f'😊  Mood Trend ({period_label})')
-
-    if not mood_entries:
-        body('No mood entries in this period.', color=GRAY)
-    else:
-        body(f'Total entries logged : {len(mood_entries)}')
-        body(f'Average mood         : {avg_mood:.1f} / 5  ({MOOD_LABELS.get(round(avg_mood), "")})')
-        # Trend direction from mood
-        first_mood = mood_entries[0].mood
-        last_mood  = mood_entries[-1].mood
-        if last_mood > first_mood:
-            mood_trend_txt, mt_color = 'Improving ↑  (your mood is getting better)', GREEN
-        elif last_mood < first_mood:
-            mood_trend_txt, mt_color = 'Worsening ↓  (your mood has declined recently)', RED
-        else:
-            mood_trend_txt, mt_color = 'Stable →  (your mood is consistent)', GRAY
-        body(f'Trend direction      : {mood_trend_txt}', bold=True, color=mt_color)
-
-        y -= 4
-        p.setFont('Helvetica-Bold', 9)
-        p.setFillColor(TEAL)
-        p.drawString(MARGIN, y, '  Recent entries:')
-        y -= 14
-
-        for e in mood_entries[-10:][::-1]:   # up to 10 most recent
-            maybe_new_page(12)
-            bar = '█' * e.mood + '░' * (5 - e.mood)
-            body(f'  {e.date.strftime("%d %b")}  {bar}  {MOOD_LABELS.get(e.mood, e.mood)}',
-                 indent=8, color=GRAY)
-
-    # ── Wellness Suggestions ──────────────────────────────────────────────────
-    section_title('💡  Wellness Suggestions')
-    suggestions = _wellness_suggestions(user, mh_score)
-    for s in suggestions:
-        body(f'  • {s}', indent=4, color=DARK)
-
-    # ── Footer ───────────────────────────────────────────────────────────────
-    maybe_new_page(25)
-    y -= 10
-    rule(LGRAY, 0.3)
-    p.setFont('Helvetica', 8)
-    p.setFillColor(GRAY)
-    p.drawCentredString(W / 2, y,
-        'This report is generated by MindMend and is for personal wellness tracking only.')
-    y -= 12
-    p.drawCentredString(W / 2, y,
-        'It does not constitute medical advice. Please consult a licensed professional for clinical support.')
-
-    p.showPage()
-    p.save()
-
-    buf.seek(0)
-    fname = f'mindmend-report-{period}-{timezone.now().strftime("%Y%m%d")}.pdf'
-    response = HttpResponse(buf, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{fname}"'
-    return response
-
+        messages.info(request, 'Your progress report is being prepared. Please download it again in a minute.')
+    return redirect('dashboard')
 
 
 def _fetch_survey_data():
-    csv_url = getattr(settings, 'MINDMEND_GOOGLE_FORM_RESPONSES_CSV_URL', '')
-    if not csv_url:
-        return {'total_responses': 0, 'questions': []}
-    
-    try:
-        req = Request(csv_url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urlopen(req, timeout=8) as response:
-            content = response.read().decode('utf-8')
-        
-        reader = csv.reader(io.StringIO(content))
-        rows = list(reader)
-        if not rows or len(rows) < 2:
-            return {'total_responses': 0, 'questions': []}
-        
-        headers = rows[0]
-        data_rows = rows[1:]
-        total_responses = len(data_rows)
-        
-        questions = []
-        for col_idx in range(1, len(headers)):
-            question_text = headers[col_idx]
-            answers = [row[col_idx] for row in data_rows if len(row) > col_idx and row[col_idx].strip()]
-            if not answers:
-                continue
-                
-            counts = Counter(answers)
-            # Sort pie/bar values cleanly
-            ordered = counts.most_common()
-            labels = [str(k) for k, v in ordered]
-            data = [v for k, v in ordered]
-            
-            q_type = 'pie' if len(labels) <= 5 else 'bar'
-            
-            questions.append({
-                'question': question_text,
-                'responses': len(answers),
-                'type': q_type,
-                'labels': labels,
-                'data': data
-            })
-            
-        return {'total_responses': total_responses, 'questions': questions}
-    except Exception as e:
-        print(f"Error fetching CSV: {e}")
-        return {'total_responses': 0, 'questions': []}
+    # Served from counters maintained by `manage.py poll_survey`; views never download the sheet.
+    return survey_summary()
 
 @login_required
 def survey_analytics(request):
@@ -771,29 +416,60 @@ def survey_analytics(request):
 
 @login_required
 def survey_sentiment_dashboard(request):
-    survey_data = _fetch_survey_data()
-    total = survey_data.get('total_responses', 0)
-    
-    current_month = timezone.now().strftime('%b')
-    last_month = (timezone.now() - timedelta(days=30)).strftime('%b')
-    
+    summary = survey_sentiment_summary()
     return render(request, 'Mind_Mend/dashboard/survey_sentiment_dashboard.html', {
-        'total_responses': total,
+        **summary,
         'filters': {
             'age': ['18-24', '25-34', '35-44', '45+'],
             'gender': ['Male', 'Female', 'Non-binary', 'Prefer not to say'],
             'occupation': ['Student', 'Professional', 'Unemployed', 'Other']
         },
-        'monthly_cards': [
-            {'label': 'This Month', 'month': current_month, 'responses': total, 'avg_stress': '3.9/5', 'top_cause': 'Work/Academic'},
-            {'label': 'Last Month', 'month': last_month, 'responses': max(0, total-2), 'avg_stress': '3.6/5', 'top_cause': 'Financial'},
-            {'label': 'Overall Avg', 'month': 'All Time', 'responses': total, 'avg_stress': '3.8/5', 'top_cause': 'Work/Academic'}
-        ] if total > 0 else [],
-        'top_causes': ['Work/Academic', 'Financial', 'Health', 'Social'],
-        'month_labels': ['Jan', 'Feb', 'Mar', 'Apr', 'May', current_month],
-        'cause_series': [
-            {'name': 'Work/Academic', 'data': [12, 19, 15, 22, 20, total]},
-            {'name': 'Financial', 'data': [8, 12, 10, 15, 12, max(0, total-4)]},
-            {'name': 'Health', 'data': [5, 8, 6, 9, 7, max(0, total-7)]}
-        ]
+    })
+
+
+@staff_member_required
+def admin_analytics_export(request, table):
+    """One chunk of a pseudonymised columnar export; follow X-Export-Next-Since to page through."""
+    if table not in EXPORT_TABLES:
+        raise Http404('Unknown export table')
+    file_format = request.GET.get('format') or default_format()
+    if file_format not in EXPORT_FORMATS or (file_format == 'parquet' and pq is None):
+        return HttpResponse('Unsupported export format.', status=400, content_type='text/plain')
+    try:
+        since_id = max(0, int(request.GET.get('since', 0)))
+    except ValueError:
+        since_id = 0
+
+    chunk = next(iter_export_chunks(table, since_id, EXPORT_CHUNK_SIZE), None)
+    if chunk is None:
+        response = HttpResponse(status=204)
+        response['X-Export-Next-Since'] = str(since_id)
+        return response
+
+    buf = io.BytesIO()
+    write_chunk(chunk, file_format, buf)
+    response = HttpResponse(buf.getvalue(), content_type='application/octet-stream')
+    next_since = int(chunk['id'][-1])
+    response['Content-Disposition'] = f'attachment; filename="mindmend-{table}-{since_id + 1}-{next_since}.{file_format}"'
+    response['X-Export-Rows'] = str(len(chunk['id']))
+    response['X-Export-Next-Since'] = str(next_since)
+    return response
+
+
+@staff_member_required
+def admin_cohort_outcomes(request):
+    """Score changes around counselling sessions and patient retention, recomputed once a day."""
+    report = cached_cohort_outcomes()
+    group_by = request.GET.get('by', 'counsellor')
+    if group_by not in GROUPINGS:
+        group_by = 'counsellor'
+    return render(request, 'Mind_Mend/admin/cohort_outcomes.html', {
+        'report': report,
+        'generated_at': datetime.fromisoformat(report['generated_at']),
+        'overall': report['overall'],
+        'rows': report['groups'][group_by],
+        'group_by': group_by,
+        'group_label': GROUPINGS[group_by],
+        'groupings': GROUPINGS.items(),
+        'retention_weeks': RETENTION_WEEKS,
     })
@@ -3,11 +3,10 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from ..models import AssessmentResult
+from ..models import AssessmentResult, LatestAssessment
 from ..forms import make_assessment_form
 from ..assessment_data import (
-    PHQ9_QUESTIONS, GAD7_QUESTIONS, PSS_QUESTIONS,
-    get_phq9_result, get_gad7_result, get_pss_result, PSS_REVERSE_ITEMS
+    PHQ9_QUESTIONS, GAD7_QUESTIONS, PSS_QUESTIONS, INSTRUMENTS, score
 )
 
 ASSESSMENT_SCALE_LABELS = ['Not at all', 'Several days', 'More than half', 'Nearly every day']
@@ -30,7 +29,6 @@ def build_assessment_context(form, title, heading, intro, questions, scale_max=3
 
 
 def build_combined_result(last_results):
-    max_scores = {'phq9': 27, 'gad7': 21, 'pss': 30}
     attempted_results = {name: res for name, res in last_results.items() if res is not None}
     if not attempted_results:
         return None
@@ -41,7 +39,7 @@ def build_combined_result(last_results):
         if name not in attempted_results:
             continue
         result = attempted_results[name]
-        max_score = max_scores[name]
+        max_score = INSTRUMENTS[name].max_score
         percent = (result.total_score / max_score) * 100 if max_score else 0
         items.append({
             'name': label,
@@ -122,11 +120,8 @@ def assessments_home(request):
         'pss': None,
     }
     if request.user.is_authenticated:
-        last_results = {
-            'phq9': AssessmentResult.objects.filter(user=request.user, assessment_type='phq9').order_by('-created_at').first(),
-            'gad7': AssessmentResult.objects.filter(user=request.user, assessment_type='gad7').order_by('-created_at').first(),
-            'pss': AssessmentResult.objects.filter(user=request.user, assessment_type='pss').order_by('-created_at').first(),
-        }
+        latest = LatestAssessment.for_user(request.user.id)
+        last_results = {atype: latest.get(atype) for atype in last_results}
     combined_result = build_combined_result(last_results)
     return render(request, 'Mind_Mend/assessments/assessments.html', {
         'last_results': last_results,
@@ -137,9 +132,7 @@ def assessments_home(request):
 def _process_phq9(request, form_class):
     form = form_class(request.POST)
     if form.is_valid():
-        scores = [form.cleaned_data[f'q{i}'] for i in range(len(PHQ9_QUESTIONS))]
-        total = sum(scores)
-        level = get_phq9_result(total)
+        total, level, _ = score('phq9', form.cleaned_data)
         result = AssessmentResult.objects.create(
             user=request.user,
             assessment_type='phq9',
@@ -178,9 +171,7 @@ def assessment_phq9(request):
 def _process_gad7(request, form_class):
     form = form_class(request.POST)
     if form.is_valid():
-        scores = [form.cleaned_data[f'q{i}'] for i in range(len(GAD7_QUESTIONS))]
-        total = sum(scores)
-        level = get_gad7_result(total)
+        total, level, _ = score('gad7', form.cleaned_data)
         result = AssessmentResult.objects.create(
             user=request.user,
             assessment_type='gad7',
@@ -219,9 +210,7 @@ def assessment_gad7(request):
 def _process_pss(request, form_class):
     form = form_class(request.POST)
     if form.is_valid():
-        raw_scores = [form.cleaned_data[f'q{i}'] for i in range(len(PSS_QUESTIONS))]
-        total = sum((3 - score) if (i + 1) in PSS_REVERSE_ITEMS else score for i, score in enumerate(raw_scores))
-        level = get_pss_result(raw_scores)
+        total, level, _ = score('pss', form.cleaned_data)
         result = AssessmentResult.objects.create(
             user=request.user,
             assessment_type='pss',
@@ -264,14 +253,13 @@ def assessment_pss(request):
 @login_required
 def assessment_result(request, result_id):
     result = get_object_or_404(AssessmentResult, id=result_id, user=request.user)
-    max_scores = {'phq9': 27, 'gad7': 21, 'pss': 30}
-    assessment_names = {'phq9': 'PHQ-9', 'gad7': 'GAD-7', 'pss': 'PSS-10'}
-    max_score = max_scores.get(result.assessment_type, 100)
+    instrument = INSTRUMENTS.get(result.assessment_type)
+    max_score = instrument.max_score if instrument else 100
     percent = (result.total_score / max_score) * 100 if max_score > 0 else 0
 
     return render(request, 'Mind_Mend/assessments/assessment_result.html', {
         'result': result,
-        'assessment_name': assessment_names.get(result.assessment_type, 'Assessment'),
+        'assessment_name': instrument.name if instrument else 'Assessment',
         'score': result.total_score,
         'result_level': result.result_level,
         'max_score': max_score,
@@ -10,7 +10,6 @@ from django.contrib.auth.models import User
 from django.contrib.sessions.models import Session
 from django.db.models import Q
 import random
-from django.core.mail import send_mail
 from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
@@ -29,21 +28,16 @@ from ..models import (
     EmailVerificationOTP,
 )
 from ..forms import SignUpForm
+from ..outbox import enqueue_email
 
 def send_verification_otp(email):
     otp_code = str(random.randint(100000, 999999))
     if settings.EMAIL_HOST_USER:
-        try:
-            send_mail(
-                subject='MindMend - Verify your Email',
-                message=f'Your verification code is: {otp_code}. It is valid for 15 minutes.',
-                from_email=settings.EMAIL_HOST_USER,
-                recipient_list=[email],
-                fail_silently=False,
-            )
-            print("OTP email sent successfully")
-        except Exception as e:
-            print("EMAIL ERROR:", str(e))
+        enqueue_email(
+            subject='MindMend - Verify your Email',
+            message=f'Your verification code is: {otp_code}. It is valid for 15 minutes.',
+            recipient_list=[email],
+        )
     else:
         print(f"DEV OTP FOR {email}: {otp_code}")
         
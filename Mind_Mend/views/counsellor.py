@@ -1,24 +1,38 @@
 import json
 import decimal
+import uuid
 from datetime import timedelta, datetime
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.core.paginator import Paginator
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, FileResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods, require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 from django.db import IntegrityError, transaction
-from asgiref.sync import async_to_sync
-
-try:
-    from channels.layers import get_channel_layer
-except ModuleNotFoundError:
-    def get_channel_layer(): return None
-
-from ..models import Counsellor, CounsellorBooking, CounsellorChatMessage, CounsellorReview, CounsellorNotification, UserProfile, BookingCancellation, WalletTransaction, CounsellorBankDetails, SessionDispute, PayoutSettlement
+from django.db.models import Count, Q, Sum
+from ..models import Counsellor, CounsellorBooking, CounsellorStats, SlotHold, InstantRequest, CounsellorChatMessage, CounsellorReview, CounsellorNotification, BookingCancellation, WalletTransaction, CounsellorBankDetails, SessionDispute, PayoutSettlement, SettlementRun, ProgressReport
 from ..models import get_display_name
+from ..notifications import notify_counsellor
+from ..outbox import enqueue_refund
 from ..forms import CounsellorBookingForm, CounsellorReviewForm
+from ..reports import normalize_period, request_report
+from ..counsellor_stats import DIRECTORY_PAGE_SIZE, directory_stats
+from ..revenue import PAYOUT_HOLD, on_hold_q, payout_rows, platform_summary
+from ..financials import parse_range, series
+from ..settlements import bank_batch_rows, run_settlement
+from ..availability import SLOT_MINUTES, day_availability, range_availability
+from ..dispatch import QUEUE_TIMEOUT, dispatch, queue_position
+from ..slot_holds import convert_hold, credit_orphaned_payment, release_hold, reserve_slot
+from ..wallet import InsufficientBonus, credit_cash, grant_bonus, lock_balances, spend
+
+EARNINGS_PAGE_SIZE = 25
+DOCTOR_HISTORY_PAGE_SIZE = 10
+DOCTOR_UPCOMING_PAGE_SIZE = 20
+OPEN_BOOKING_STATUSES = ('pending', 'confirmed')
+SLOT_TAKEN_MESSAGE = 'Another patient is booking this slot right now. Please pick a different time.'
 
 
 def _booking_patient_name(booking):
@@ -31,35 +45,6 @@ def _chat_sender_name(booking, sender):
     return get_display_name(sender)
 
 
-def _cleanup_expired_pending_bookings():
-    """Delete unpaid 'pending' bookings older than 15 minutes to free the slots."""
-    expiration_limit = timezone.now() - timedelta(minutes=15)
-    CounsellorBooking.objects.filter(status='pending', created_at__lt=expiration_limit).delete()
-
-
-def _autocomplete_past_bookings():
-    """Automatically mark 'confirmed' bookings as 'completed' 24 hours after their scheduled time."""
-    current_time = timezone.now()
-    # Find bookings that could be 24h old (date is yesterday or older)
-    # Using date__lte allows us to avoid checking future bookings unnecessarily.
-    candidate_bookings = CounsellorBooking.objects.filter(
-        status='confirmed',
-        date__lte=current_time.date()
-    )
-    for booking in candidate_bookings:
-        naive_dt = datetime.combine(booking.date, booking.time_slot)
-        if timezone.is_naive(naive_dt):
-            aware_dt = timezone.make_aware(naive_dt)
-        else:
-            aware_dt = naive_dt
-            
-        if current_time >= aware_dt + timedelta(hours=24):
-            booking.status = 'completed'
-            booking.completed_at = current_time
-            booking.counsellor_earnings = round((booking.total_fee - booking.platform_fee) * decimal.Decimal('0.90'), 2)
-            booking.save(update_fields=['status', 'counsellor_earnings', 'completed_at'])
-
-
 SESSION_DURATION_MINUTES = 30
 
 
@@ -86,66 +71,43 @@ def _is_session_active(booking):
     return 'active'
 
 
+def _attach_session_message_counts(bookings, counsellor):
+    """Set session_message_count on each booking: patient messages sent inside its session window.
 
-def sync_bonus_balance(user):
-    from django.db import transaction
-    from django.utils import timezone
-    from Mind_Mend.models import BonusCredit, WalletTransaction, UserProfile
-    
-    now = timezone.now()
-    
-    with transaction.atomic():
-        expired_credits = BonusCredit.objects.filter(user=user, remaining_amount__gt=0, expires_at__lte=now)
-        for credit in expired_credits:
-            expired_amt = credit.remaining_amount
-            credit.remaining_amount = 0
-            credit.save(update_fields=['remaining_amount'])
-            
-            WalletTransaction.objects.create(
-                user=user,
-                amount=expired_amt,
-                transaction_type='expired',
-                description='Bonus credits expired after 90 days'
-            )
-            
-        profile, _ = UserProfile.objects.get_or_create(user=user)
-        active_credits = BonusCredit.objects.filter(user=user, remaining_amount__gt=0, expires_at__gt=now)
-        total_bonus = sum(c.remaining_amount for c in active_credits)
-        profile.bonus_balance = total_bonus
-        profile.save(update_fields=['bonus_balance'])
+    Windows are built from each booking's date and slot, so one grouped query counts them all.
+    """
+    window_q = Q()
+    for b in bookings:
+        window_q |= Q(booking_id=b.id, created_at__range=_get_session_window(b))
+    counts = dict(
+        CounsellorChatMessage.objects.filter(booking_id__in=[b.id for b in bookings])
+        .exclude(sender_id=counsellor.user_id)
+        .values('booking_id')
+        .annotate(n=Count('id', filter=window_q))
+        .values_list('booking_id', 'n')
+    ) if bookings else {}
+    for b in bookings:
+        b.session_message_count = counts.get(b.id, 0)
 
-def deduct_bonus(user, amount_to_deduct):
-    from django.utils import timezone
-    from Mind_Mend.models import BonusCredit
-    if amount_to_deduct <= 0: return
-    now = timezone.now()
-    active_credits = BonusCredit.objects.filter(user=user, remaining_amount__gt=0, expires_at__gt=now).order_by('expires_at')
-    
-    remaining = amount_to_deduct
-    for credit in active_credits:
-        if remaining <= 0: break
-        if credit.remaining_amount <= remaining:
-            remaining -= credit.remaining_amount
-            credit.remaining_amount = 0
-            credit.save(update_fields=['remaining_amount'])
-        else:
-            credit.remaining_amount -= remaining
-            credit.save(update_fields=['remaining_amount'])
-            remaining = 0
 
-def add_bonus_credit(user, amount):
-    from django.utils import timezone
-    from datetime import timedelta
-    from Mind_Mend.models import BonusCredit
-    if amount <= 0: return
-    now = timezone.now()
-    BonusCredit.objects.create(
-        user=user,
-        initial_amount=amount,
-        remaining_amount=amount,
-        expires_at=now + timedelta(days=90)
+def _dashboard_bookings(counsellor):
+    return CounsellorBooking.objects.filter(counsellor=counsellor).select_related(
+        'user', 'user__profile', 'counsellorreview',
     )
 
+
+def _upcoming_bookings(bookings, today_date):
+    return bookings.filter(status__in=OPEN_BOOKING_STATUSES, date__gt=today_date).order_by('date', 'time_slot', 'id')
+
+
+def _booking_review(booking):
+    try:
+        return booking.counsellorreview
+    except CounsellorReview.DoesNotExist:
+        return None
+
+
+
 def get_counsellor_for_user(request):
     """Returns the counsellor for the logged-in user. If superuser, can mock as first counsellor or by ID."""
     from Mind_Mend.models import Counsellor
@@ -160,15 +122,10 @@ def get_counsellor_for_user(request):
 
 @login_required
 def counsellor_booking(request):
-    sync_bonus_balance(request.user)
-    _cleanup_expired_pending_bookings()
-
     import json as _json
-    from django.db.models import Avg
+    from django.db.models import F
     counsellors = list(
-        Counsellor.objects.filter(is_active=True).annotate(
-            avg_rating=Avg('counsellorbooking__counsellorreview__rating')
-        )
+        Counsellor.objects.filter(is_active=True).annotate(avg_rating=F('stats__avg_rating'))
     )
     if request.method == 'POST':
         form = CounsellorBookingForm(request.POST)
@@ -185,15 +142,16 @@ def counsellor_booking(request):
             booking.video_fee = video_fee
             booking.platform_fee = pfee
             booking.total_fee = chat_fee + video_fee + pfee
-            booking.save()
 
-            if booking.total_fee > 0:
-                return redirect('checkout_payment', booking_id=booking.id)
+            # Claim the slot; the booking itself is only created once it is paid for.
+            hold = reserve_slot(request.user, booking)
+            if hold is not None and booking.total_fee > 0:
+                return redirect('checkout_payment', token=hold.token)
+            booking = convert_hold(hold.token)[0] if hold is not None else None
+            if booking is None:
+                form.add_error(None, SLOT_TAKEN_MESSAGE)
             else:
-                booking.is_paid = True
-                booking.status = 'confirmed'
-                booking.save(update_fields=['is_paid', 'status'])
-                _notify_counsellor(
+                notify_counsellor(
                     booking.counsellor,
                     'booking_created',
                     'New appointment booked',
@@ -238,14 +196,10 @@ def counsellor_booking(request):
 
 @login_required
 def instant_booking(request):
-    _cleanup_expired_pending_bookings()
-
     import json as _json
-    from django.db.models import Avg
+    from django.db.models import F
     counsellors = list(
-        Counsellor.objects.filter(is_active=True, is_instant_enabled=True).annotate(
-            avg_rating=Avg('counsellorbooking__counsellorreview__rating')
-        )
+        Counsellor.objects.filter(is_active=True, is_instant_enabled=True).annotate(avg_rating=F('stats__avg_rating'))
     )
     if request.method == 'POST':
         post_data = request.POST.copy()
@@ -266,15 +220,15 @@ def instant_booking(request):
             booking.video_fee = video_fee
             booking.platform_fee = pfee
             booking.total_fee = chat_fee + video_fee + pfee
-            booking.save()
 
-            if booking.total_fee > 0:
-                return redirect('checkout_payment', booking_id=booking.id)
+            hold = reserve_slot(request.user, booking)
+            if hold is not None and booking.total_fee > 0:
+                return redirect('checkout_payment', token=hold.token)
+            booking = convert_hold(hold.token)[0] if hold is not None else None
+            if booking is None:
+                form.add_error(None, SLOT_TAKEN_MESSAGE)
             else:
-                booking.is_paid = True
-                booking.status = 'confirmed'
-                booking.save(update_fields=['is_paid', 'status'])
-                _notify_counsellor(
+                notify_counsellor(
                     booking.counsellor,
                     'booking_created',
                     'New instant appointment booked ⚡',
@@ -327,6 +281,67 @@ def instant_connect(request, booking_id):
     })
 
 
+@login_required
+@require_POST
+def instant_queue_join(request):
+    """Queue the patient for the next available instant counsellor."""
+    include_chat = 'include_chat' in request.POST
+    include_video = 'include_video' in request.POST
+    if not include_chat and not include_video:
+        messages.error(request, 'You must select at least one session format (Chat or Video calling).')
+        return redirect('instant_booking')
+    InstantRequest.objects.filter(user=request.user, status='waiting').update(status='cancelled')
+    instant_request = InstantRequest.objects.create(
+        user=request.user, include_chat=include_chat, include_video=include_video,
+    )
+    dispatch()
+    return redirect('instant_queue', request_id=instant_request.id)
+
+
+def _instant_queue_state(instant_request):
+    """Read-only: dispatch runs on join, when a counsellor comes online and from the dispatch worker."""
+    state = {'status': instant_request.status, 'position': None, 'checkout_url': None}
+    if instant_request.status == 'waiting':
+        if instant_request.created_at <= timezone.now() - QUEUE_TIMEOUT:
+            state['status'] = 'expired'  # the worker marks the row itself
+        else:
+            state['position'] = queue_position(instant_request)
+    elif instant_request.status == 'assigned':
+        if SlotHold.objects.filter(token=instant_request.hold_token, user=instant_request.user).exists():
+            state['checkout_url'] = reverse('checkout_payment', args=[instant_request.hold_token])
+        else:
+            state['status'] = 'expired'
+    return state
+
+
+@login_required
+def instant_queue(request, request_id):
+    instant_request = get_object_or_404(InstantRequest.objects.select_related('counsellor'), pk=request_id, user=request.user)
+    state = _instant_queue_state(instant_request)
+    if state['checkout_url']:
+        return redirect(state['checkout_url'])
+    return render(request, 'Mind_Mend/counsellor/instant_queue.html', {
+        'instant_request': instant_request,
+        'state': state,
+    })
+
+
+@login_required
+@require_http_methods(['GET'])
+def instant_queue_status(request, request_id):
+    """Polled by the queue page: {"status", "position", "checkout_url"}."""
+    instant_request = get_object_or_404(InstantRequest, pk=request_id, user=request.user)
+    return JsonResponse(_instant_queue_state(instant_request))
+
+
+@login_required
+@require_POST
+def instant_queue_cancel(request, request_id):
+    InstantRequest.objects.filter(pk=request_id, user=request.user, status='waiting').update(status='cancelled')
+    messages.info(request, 'You have left the instant queue.')
+    return redirect('instant_booking')
+
+
 def _user_can_access_booking(user, booking, require_dispute_for_admin=False):
     """True if user is the client or the counsellor for this booking."""
     if booking.user_id == user.id:
@@ -340,49 +355,15 @@ def _user_can_access_booking(user, booking, require_dispute_for_admin=False):
     return False
 
 
-def _notify_counsellor(counsellor, event_type, title, body='', booking=None, actor=None):
-    """Create persistent notification and push it via websocket when available."""
-    notif = CounsellorNotification.objects.create(
-        counsellor=counsellor,
-        booking=booking,
-        actor=actor,
-        event_type=event_type,
-        title=title,
-        body=body,
-    )
-    if not counsellor.user_id:
-        return notif
-    channel_layer = get_channel_layer()
-    if not channel_layer:
-        return notif
-    async_to_sync(channel_layer.group_send)(
-        f'doctor_{counsellor.user_id}',
-        {
-            'type': 'doctor.notification',
-            'notification': {
-                'id': notif.id,
-                'event_type': notif.event_type,
-                'title': notif.title,
-                'body': notif.body,
-                'booking_id': notif.booking_id,
-                'created_at': notif.created_at.isoformat(),
-                'is_read': notif.is_read,
-            }
-        }
-    )
-    return notif
-
-
 @login_required
 def my_bookings(request):
-    sync_bonus_balance(request.user)
-    _autocomplete_past_bookings()
     bookings = CounsellorBooking.objects.filter(user=request.user).select_related('counsellor').order_by('-date', '-time_slot')
     # Prefetch reviews for completed bookings (to show "Leave review" or existing review)
     bookings = list(bookings)
     for b in bookings:
         b.has_review = CounsellorReview.objects.filter(booking=b).exists()
-    return render(request, 'Mind_Mend/counsellor/my_bookings.html', {'bookings': bookings})
+    holds = SlotHold.objects.filter(user=request.user, expires_at__gt=timezone.now()).select_related('counsellor')
+    return render(request, 'Mind_Mend/counsellor/my_bookings.html', {'bookings': bookings, 'holds': holds})
 
 
 @login_required
@@ -397,6 +378,16 @@ def booking_action(request, booking_id):
     return redirect('my_bookings')
 
 
+@login_required
+@require_http_methods(['POST'])
+def release_slot_hold(request, token):
+    """Give up a slot the patient is holding for checkout."""
+    hold = get_object_or_404(SlotHold, token=token, user=request.user)
+    release_hold(hold)
+    messages.info(request, 'Slot released.')
+    return redirect('my_bookings')
+
+
 @login_required
 @require_http_methods(['POST'])
 def delete_booking(request, booking_id):
@@ -416,7 +407,6 @@ def counsellor_chat(request, booking_id):
     Chat is only enabled during the booked 30-minute time slot.
     All previous sessions between the same user+counsellor pair are shown as history.
     """
-    _autocomplete_past_bookings()
     booking = get_object_or_404(CounsellorBooking, pk=booking_id)
     if not _user_can_access_booking(request.user, booking, require_dispute_for_admin=True):
         messages.error(request, 'Privacy Lock: Admins can only view chat transcripts for disputed sessions.')
@@ -479,7 +469,7 @@ def counsellor_chat(request, booking_id):
 
             msg = CounsellorChatMessage.objects.create(booking=booking, sender=request.user, content=content)
             if request.user.id != booking.counsellor.user_id:
-                _notify_counsellor(
+                notify_counsellor(
                     booking.counsellor,
                     'chat_started' if is_first_message else 'message_received',
                     'Patient started chat' if is_first_message else 'New patient message',
@@ -540,7 +530,7 @@ def request_early_finish(request, booking_id):
         booking.patient_requested_finish = True
         booking.save(update_fields=['patient_requested_finish'])
         # Notify counsellor
-        _notify_counsellor(
+        notify_counsellor(
             booking.counsellor,
             'booking_status',
             'Patient wants to end the session early',
@@ -609,7 +599,7 @@ def finish_session(request, booking_id):
     else:
         _do_complete_session(booking)
         if request.user.id != booking.counsellor.user_id:
-            _notify_counsellor(
+            notify_counsellor(
                 booking.counsellor,
                 'booking_status',
                 'Session marked completed',
@@ -634,7 +624,6 @@ def counsellor_video_call(request, booking_id):
     """Virtual video call room with counsellor for a booking. User or counsellor can access.
     Video call is only enabled during the booked 30-minute time slot.
     """
-    _autocomplete_past_bookings()
     booking = get_object_or_404(CounsellorBooking, pk=booking_id)
     if not _user_can_access_booking(request.user, booking, require_dispute_for_admin=True):
         messages.error(request, 'Privacy Lock: Admins can only view video rooms for disputed sessions.')
@@ -643,8 +632,8 @@ def counsellor_video_call(request, booking_id):
         messages.error(request, 'This booking does not include a video calling session.')
         return redirect('my_bookings')
     if not booking.is_paid and booking.total_fee > 0:
-        messages.error(request, 'Please complete payment before joining the session.')
-        return redirect('checkout_payment', booking_id=booking.id)
+        messages.error(request, 'This booking was never paid for. Please book the session again.')
+        return redirect('my_bookings')
 
     session_state = _is_session_active(booking)
     session_start, session_end = _get_session_window(booking)
@@ -686,7 +675,6 @@ def counsellor_video_call(request, booking_id):
 @login_required
 def counsellor_sessions(request):
     """List of sessions (bookings) for the logged-in counsellor."""
-    _autocomplete_past_bookings()
     counsellor = Counsellor.objects.filter(user=request.user).first()
     if not counsellor:
         messages.info(request, 'You are not registered as a counsellor.')
@@ -707,68 +695,14 @@ def admin_counsellors_dashboard(request):
     """Admin directory of all counsellors with aggregated stats."""
     if not request.user.is_staff:
         return redirect('home')
-    
-    counsellors = Counsellor.objects.all().prefetch_related('counsellorbooking_set', 'counsellorbooking_set__counsellorreview')
-    counsellor_data = []
-    
-    for c in counsellors:
-        bookings = c.counsellorbooking_set.all()
-        completed = [b for b in bookings if b.status == 'completed']
-        total_sessions = len(completed)
-        total_bookings = len(bookings)
-        completion_rate = (total_sessions / total_bookings * 100) if total_bookings > 0 else 0
-        
-        # Segmented Sessions
-        normal_chat_count = sum(1 for b in completed if not b.is_instant and not b.include_video)
-        normal_video_count = sum(1 for b in completed if not b.is_instant and b.include_video)
-        instant_chat_count = sum(1 for b in completed if b.is_instant and not b.include_video)
-        instant_video_count = sum(1 for b in completed if b.is_instant and b.include_video)
-        
-        import decimal
-        def get_earnings(b):
-            if b.counsellor_earnings and b.counsellor_earnings > 0:
-                return b.counsellor_earnings
-            # Fallback for old mock bookings
-            fee = b.total_fee if getattr(b, 'total_fee', None) else (b.counsellor.instant_session_fee if b.is_instant else b.counsellor.session_fee)
-            return round((fee or 0) * decimal.Decimal('0.90'), 2)
-
-        # Earnings
-        earnings = sum(get_earnings(b) for b in completed)
-        normal_earnings = sum(get_earnings(b) for b in completed if not b.is_instant)
-        instant_earnings = sum(get_earnings(b) for b in completed if b.is_instant)
-        
-        pending_payout = sum(get_earnings(b) for b in completed if not b.is_settled and not getattr(b, 'is_disputed', False))
-        
-        # Ratings
-        reviews = [b.counsellorreview.rating for b in completed if hasattr(b, 'counsellorreview')]
-        rating = sum(reviews) / len(reviews) if reviews else 0
-        
-        normal_reviews = [b.counsellorreview.rating for b in completed if hasattr(b, 'counsellorreview') and not b.is_instant]
-        normal_rating = sum(normal_reviews) / len(normal_reviews) if normal_reviews else 0
-        
-        instant_reviews = [b.counsellorreview.rating for b in completed if hasattr(b, 'counsellorreview') and b.is_instant]
-        instant_rating = sum(instant_reviews) / len(instant_reviews) if instant_reviews else 0
-        
-        counsellor_data.append({
-            'obj': c,
-            'total_sessions': total_sessions,
-            'earnings': earnings,
-            'pending_payout': pending_payout,
-            'completion_rate': completion_rate,
-            'rating': rating,
-            'normal_chat_count': normal_chat_count,
-            'normal_video_count': normal_video_count,
-            'instant_chat_count': instant_chat_count,
-            'instant_video_count': instant_video_count,
-            'normal_earnings': normal_earnings,
-            'instant_earnings': instant_earnings,
-            'normal_rating': normal_rating,
-        'instant_rating': instant_rating,
-        })
-        
+
+    paginator = Paginator(Counsellor.objects.select_related('stats').order_by('id'), DIRECTORY_PAGE_SIZE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
     return render(request, 'Mind_Mend/admin/counsellors.html', {
-        'counsellors_data': counsellor_data,
-        'total_counsellors': len(counsellors)
+        'counsellors_data': directory_stats(page_obj.object_list),
+        'page_obj': page_obj,
+        'total_counsellors': paginator.count,
     })
 
 
@@ -778,43 +712,12 @@ def admin_counsellor_analytics(request, counsellor_id):
     if not request.user.is_staff:
         return redirect('home')
         
-    counsellor = get_object_or_404(Counsellor, id=counsellor_id)
-    bookings = counsellor.counsellorbooking_set.all()
-    completed = [b for b in bookings if b.status == 'completed']
-    total_sessions = len(completed)
-    total_bookings = len(bookings)
-    completion_rate = (total_sessions / total_bookings * 100) if total_bookings > 0 else 0
-    
-    # Segmented Sessions
-    normal_chat_count = sum(1 for b in completed if not b.is_instant and not b.include_video)
-    normal_video_count = sum(1 for b in completed if not b.is_instant and b.include_video)
-    instant_chat_count = sum(1 for b in completed if b.is_instant and not b.include_video)
-    instant_video_count = sum(1 for b in completed if b.is_instant and b.include_video)
-    
-    import decimal
-    def get_earnings(b):
-        if b.counsellor_earnings and b.counsellor_earnings > 0:
-            return b.counsellor_earnings
-        fee = getattr(b, 'total_fee', None) or (b.counsellor.instant_session_fee if b.is_instant else b.counsellor.session_fee)
-        return round((fee or 0) * decimal.Decimal('0.90'), 2)
-
-    # Earnings
-    total_earnings = sum(get_earnings(b) for b in completed)
-    normal_chat_earnings = sum(get_earnings(b) for b in completed if not b.is_instant and not b.include_video)
-    normal_video_earnings = sum(get_earnings(b) for b in completed if not b.is_instant and b.include_video)
-    instant_chat_earnings = sum(get_earnings(b) for b in completed if b.is_instant and not b.include_video)
-    instant_video_earnings = sum(get_earnings(b) for b in completed if b.is_instant and b.include_video)
-    
-    # Ratings
-    reviews = [b.counsellorreview.rating for b in completed if hasattr(b, 'counsellorreview')]
-    rating = sum(reviews) / len(reviews) if reviews else 0
-    
-    normal_reviews = [b.counsellorreview.rating for b in completed if hasattr(b, 'counsellorreview') and not b.is_instant]
-    normal_rating = sum(normal_reviews) / len(normal_reviews) if normal_reviews else 0
-    
-    instant_reviews = [b.counsellorreview.rating for b in completed if hasattr(b, 'counsellorreview') and b.is_instant]
-    instant_rating = sum(instant_reviews) / len(instant_reviews) if instant_reviews else 0
-    
+    counsellor = get_object_or_404(Counsellor.objects.select_related('stats'), id=counsellor_id)
+    stats = getattr(counsellor, 'stats', None) or CounsellorStats(counsellor=counsellor)
+    total_sessions = stats.completed_sessions
+    completion_rate = stats.completion_rate
+    rating = stats.avg_rating or 0
+
     # Quality Badge
     badge = None
     if total_sessions >= 5:
@@ -826,39 +729,51 @@ def admin_counsellor_analytics(request, counsellor_id):
     context = {
         'c': counsellor,
         'badge': badge,
-        'total_earnings': total_earnings,
+        'total_earnings': stats.earnings,
         'rating': rating,
-        'normal_chat_count': normal_chat_count,
-        'normal_video_count': normal_video_count,
-        'instant_chat_count': instant_chat_count,
-        'instant_video_count': instant_video_count,
-        'normal_chat_earnings': normal_chat_earnings,
-        'normal_video_earnings': normal_video_earnings,
-        'instant_chat_earnings': instant_chat_earnings,
-        'instant_video_earnings': instant_video_earnings,
-        'normal_rating': normal_rating,
-        'instant_rating': instant_rating,
+        'normal_chat_count': stats.normal_chat_count,
+        'normal_video_count': stats.normal_video_count,
+        'instant_chat_count': stats.instant_chat_count,
+        'instant_video_count': stats.instant_video_count,
+        'normal_chat_earnings': stats.normal_chat_earnings,
+        'normal_video_earnings': stats.normal_video_earnings,
+        'instant_chat_earnings': stats.instant_chat_earnings,
+        'instant_video_earnings': stats.instant_video_earnings,
+        'normal_rating': stats.normal_rating or 0,
+        'instant_rating': stats.instant_rating or 0,
     }
     return render(request, 'Mind_Mend/admin/admin_counsellor_analytics.html', context)
 
 
 @login_required
 def doctor_dashboard(request):
-    """Doctor-facing dashboard for appointments and notifications."""
-    _autocomplete_past_bookings()
+    """Doctor-facing dashboard for appointments and notifications.
+
+    Only bounded windows are loaded: today's bookings and open ones up to today, the first
+    page of upcoming ones and the most recent completed ones; later upcoming sessions and older
+    history are paged in through doctor_upcoming_bookings_api and doctor_booking_history_api.
+    """
     counsellor = get_counsellor_for_user(request)
     if not counsellor:
         messages.info(request, 'You are not registered as a counsellor.')
         return redirect('home')
         
     is_masquerading = request.user.is_superuser and counsellor.user != request.user
-    bookings = list(CounsellorBooking.objects.filter(counsellor=counsellor).select_related('user').order_by('date', 'time_slot'))
-    reviews_by_booking = {
-        r.booking_id: r
-        for r in CounsellorReview.objects.filter(booking__in=bookings)
-    }
-    for b in bookings:
-        b.review = reviews_by_booking.get(b.id)
+    today_date = timezone.localdate()
+    bookings = _dashboard_bookings(counsellor)
+    # Open bookings before today complete or lapse within a day, so this window stays small.
+    current_bookings = list(
+        bookings.filter(date__lte=today_date)
+        .filter(Q(status__in=OPEN_BOOKING_STATUSES) | Q(date=today_date, status='completed'))
+        .order_by('date', 'time_slot')
+    )
+    upcoming_bookings = list(_upcoming_bookings(bookings, today_date)[:DOCTOR_UPCOMING_PAGE_SIZE])
+    completed_bookings = list(
+        bookings.filter(status='completed').order_by('-date', '-time_slot', '-id')[:DOCTOR_HISTORY_PAGE_SIZE]
+    )
+    _attach_session_message_counts(current_bookings + upcoming_bookings + completed_bookings, counsellor)
+    for b in completed_bookings:
+        b.review = _booking_review(b)
         b.has_review = b.review is not None
 
     # Only show booking-level notifications (not chat message events) in the dashboard panel.
@@ -869,64 +784,103 @@ def doctor_dashboard(request):
     )
     unread_count = notifications_qs.filter(is_read=False).count()
 
-    # Compute unread message count per booking (messages from patient only, during the session window).
-    booking_ids = [b.id for b in bookings]
-    all_messages = CounsellorChatMessage.objects.filter(
-        booking_id__in=booking_ids
-    ).exclude(sender=counsellor.user).values('booking_id', 'created_at')
-
-    # Group message counts per booking, restricted to the session's 30-min window.
-    from collections import defaultdict
-    msg_counts = defaultdict(int)
-    booking_map = {b.id: b for b in bookings}
-    for msg in all_messages:
-        bk = booking_map.get(msg['booking_id'])
-        if bk is None:
-            continue
-        session_start, session_end = _get_session_window(bk)
-        msg_ts = msg['created_at']
-        # Make message timestamp offset-aware for comparison
-        if timezone.is_naive(msg_ts):
-            msg_ts = timezone.make_aware(msg_ts)
-        if session_start <= msg_ts <= session_end:
-            msg_counts[msg['booking_id']] += 1
-
-    for b in bookings:
-        b.session_message_count = msg_counts.get(b.id, 0)
-
-    today_date = timezone.localdate()
-    today_bookings = [b for b in bookings if b.date == today_date and b.status not in ('cancelled',)]
-    upcoming_bookings = [b for b in bookings if b.date > today_date and b.status not in ('completed', 'cancelled')]
-    today_bookings_count = len(today_bookings)
-    upcoming_bookings_count = len(upcoming_bookings)
-    pending_count = len([b for b in bookings if b.status == 'pending'])
-    completed_bookings = [b for b in bookings if b.status == 'completed']
-    total_completed_sessions = len(completed_bookings)
-    monthly_revenue = sum(
-        (b.counsellor.instant_session_fee if b.is_instant else b.counsellor.session_fee)
-        for b in completed_bookings
-        if b.is_paid and b.date.month == today_date.month and b.date.year == today_date.year
+    active_bookings = [b for b in current_bookings if b.status in OPEN_BOOKING_STATUSES] + upcoming_bookings
+    today_bookings = [b for b in current_bookings if b.date == today_date]
+
+    # Monthly revenue is billed at the counsellor's current fees, so count the paid sessions of each kind.
+    this_month = Q(status='completed', is_paid=True, date__year=today_date.year, date__month=today_date.month)
+    counts = CounsellorBooking.objects.filter(counsellor=counsellor).aggregate(
+        pending_count=Count('id', filter=Q(status='pending')),
+        upcoming_count=Count('id', filter=Q(status__in=OPEN_BOOKING_STATUSES, date__gt=today_date)),
+        total_completed_sessions=Count('id', filter=Q(status='completed')),
+        monthly_normal=Count('id', filter=this_month & Q(is_instant=False)),
+        monthly_instant=Count('id', filter=this_month & Q(is_instant=True)),
+    )
+    monthly_revenue = (
+        counts['monthly_normal'] * counsellor.session_fee
+        + counts['monthly_instant'] * counsellor.instant_session_fee
     )
 
     return render(request, 'Mind_Mend/counsellor/doctor_dashboard.html', {
         'counsellor': counsellor,
-        'pending_bookings': [b for b in bookings if b.status == 'pending'],
-        'bookings': bookings,
-        'completed_bookings': completed_bookings[::-1],
+        'pending_bookings': [b for b in active_bookings if b.status == 'pending'],
+        'active_bookings': active_bookings,
+        'completed_bookings': completed_bookings,
+        'has_more_history': counts['total_completed_sessions'] > len(completed_bookings),
         'today_bookings': today_bookings,
         'upcoming_bookings': upcoming_bookings,
+        'has_more_upcoming': counts['upcoming_count'] > len(upcoming_bookings),
         'notifications': notifications_qs[:20],
         'unread_count': unread_count,
-        'today_bookings_count': today_bookings_count,
-        'upcoming_bookings_count': upcoming_bookings_count,
-        'pending_count': pending_count,
-        'total_completed_sessions': total_completed_sessions,
+        'today_bookings_count': len(today_bookings),
+        'upcoming_bookings_count': counts['upcoming_count'],
+        'pending_count': counts['pending_count'],
+        'total_completed_sessions': counts['total_completed_sessions'],
         'monthly_revenue': monthly_revenue,
         'today_date': today_date,
         'is_masquerading': is_masquerading,
     })
 
 
+def _doctor_booking_page(request, counsellor, queryset, page_size, with_reviews=False):
+    """One page of dashboard bookings as the JSON the doctor dashboard renders."""
+    page_obj = Paginator(queryset, page_size).get_page(request.GET.get('page'))
+    bookings = list(page_obj.object_list)
+    _attach_session_message_counts(bookings, counsellor)
+    results = []
+    for b in bookings:
+        row = {
+            'id': b.id,
+            'patient_name': b.patient_display_name(),
+            'is_anonymous': b.is_anonymous,
+            'date': b.date.isoformat(),
+            'time_slot': b.time_slot.strftime('%H:%M'),
+            'status': b.status,
+            'is_instant': b.is_instant,
+            'include_chat': b.include_chat,
+            'include_video': b.include_video,
+            'session_message_count': b.session_message_count,
+            'chat_url': reverse('counsellor_chat', args=[b.id]) if b.include_chat else None,
+            'video_url': reverse('counsellor_video_call', args=[b.id]) if b.include_video else None,
+        }
+        if with_reviews:
+            review = _booking_review(b)
+            row['review'] = {'rating': review.rating, 'review_text': review.review_text} if review else None
+        results.append(row)
+    return JsonResponse({
+        'results': results,
+        'page': page_obj.number,
+        'num_pages': page_obj.paginator.num_pages,
+        'has_next': page_obj.has_next(),
+    })
+
+
+@login_required
+def doctor_booking_history_api(request):
+    """Completed bookings for the doctor dashboard, newest first, one page at a time."""
+    counsellor = get_counsellor_for_user(request)
+    if not counsellor:
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    return _doctor_booking_page(
+        request, counsellor,
+        _dashboard_bookings(counsellor).filter(status='completed').order_by('-date', '-time_slot', '-id'),
+        DOCTOR_HISTORY_PAGE_SIZE, with_reviews=True,
+    )
+
+
+@login_required
+def doctor_upcoming_bookings_api(request):
+    """Open bookings after today for the doctor dashboard, soonest first, one page at a time."""
+    counsellor = get_counsellor_for_user(request)
+    if not counsellor:
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    return _doctor_booking_page(
+        request, counsellor,
+        _upcoming_bookings(_dashboard_bookings(counsellor), timezone.localdate()),
+        DOCTOR_UPCOMING_PAGE_SIZE,
+    )
+
+
 @login_required
 @require_http_methods(['POST'])
 def doctor_booking_action(request, booking_id):
@@ -947,8 +901,11 @@ def doctor_booking_action(request, booking_id):
     }
     if action not in status_map:
         return JsonResponse({'error': 'Invalid action'}, status=400)
-    booking.status = status_map[action]
-    booking.save(update_fields=['status'])
+    if action == 'complete':
+        _do_complete_session(booking)
+    else:
+        booking.status = status_map[action]
+        booking.save(update_fields=['status'])
     messages.success(request, f'Booking status updated to {booking.status}.')
     return redirect('doctor_dashboard')
 
@@ -994,20 +951,10 @@ def emergency_cancel_booking(request, booking_id):
             razorpay_amount = booking.total_fee - wallet_used
 
             # Counsellor cancelled: patient gets FULL 100% refund — no platform fee deducted
-            if razorpay_amount > 0 and booking.razorpay_payment_id:
-                if razorpay_amount > 0:
-                    try:
-                        import razorpay
-                        from django.conf import settings
-                        client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
-                        client.refund.create({'payment_id': booking.razorpay_payment_id, 'amount': int(razorpay_amount * 100)})
-                    except Exception as e:
-                        print(f"Razorpay Refund Error: {e}")
-
-            patient_profile, _ = UserProfile.objects.get_or_create(user=booking.user)
-            
+            enqueue_refund(booking, razorpay_amount, 'counsellor-cancel')
+
             if wallet_used > 0:
-                patient_profile.wallet_balance += wallet_used
+                credit_cash(booking.user_id, wallet_used)
                 WalletTransaction.objects.create(
                     user=booking.user,
                     amount=wallet_used,
@@ -1017,14 +964,13 @@ def emergency_cancel_booking(request, booking_id):
                 )
 
             # Credit compensation as Bonus Credit Points (non-withdrawable, expires in 90 days)
-            add_bonus_credit(booking.user, compensation)
-            patient_profile.bonus_balance += compensation
-            patient_profile.save()
+            grant_bonus(booking.user_id, compensation)
             
             WalletTransaction.objects.create(
                 user=booking.user,
                 amount=compensation,
                 transaction_type='compensation',
+                bucket='bonus',
                 description=f"Compensation Credit Points for cancelled session with {booking.counsellor.name} (expires in 90 days)",
                 reference_id=str(booking.id)
             )
@@ -1179,7 +1125,7 @@ def booking_messages_api(request, booking_id):
             
         msg = CounsellorChatMessage.objects.create(booking=booking, sender=request.user, content=content)
         if request.user.id != booking.counsellor.user_id:
-            _notify_counsellor(
+            notify_counsellor(
                 booking.counsellor,
                 'chat_started' if is_first_message else 'message_received',
                 'Patient started chat' if is_first_message else 'New patient message',
@@ -1255,25 +1201,28 @@ def submit_review(request, booking_id):
 
 @login_required
 @require_http_methods(['GET', 'POST'])
-def checkout_payment(request, booking_id):
+def checkout_payment(request, token):
     """
+    Checkout for a held slot (see Mind_Mend.slot_holds).
     GET  → create a Razorpay order and render the payment page.
-    POST → (safety fallback) redirect back to GET.
+    POST → pay entirely from wallet/bonus balances, else redirect back to GET.
     """
-    sync_bonus_balance(request.user)
-    _cleanup_expired_pending_bookings()
-
     import razorpay
     from django.conf import settings
 
-    booking = get_object_or_404(CounsellorBooking, pk=booking_id, user=request.user)
+    booking = SlotHold.objects.select_related('counsellor').filter(token=token, user=request.user).first()
 
-    if booking.is_paid or booking.status != 'pending':
-        messages.info(request, "This booking has already been processed.")
+    if booking is None:
+        messages.info(request, "This booking has already been processed or its slot was released.")
         return redirect('my_bookings')
 
+    if booking.is_expired():
+        release_hold(booking)
+        messages.error(request, "This booking was not paid within 15 minutes and the slot has been released. Please book again.")
+        return redirect('counsellor_booking')
+
     apply_wallet = request.GET.get('apply_wallet', '1') == '1'
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    profile = request.user.profile
     cash_balance = profile.wallet_balance
     bonus_balance = profile.bonus_balance
     total_balance = cash_balance + bonus_balance
@@ -1282,52 +1231,56 @@ def checkout_payment(request, booking_id):
     if request.method == 'POST':
         apply_wallet_post = request.POST.get('apply_wallet', '1') == '1'
         if apply_wallet_post and total_balance >= original_fee:
-            with transaction.atomic():
-                bonus_to_use = min(bonus_balance, original_fee)
-                cash_to_use = original_fee - bonus_to_use
-                
-                deduct_bonus(request.user, bonus_to_use)
-                profile.wallet_balance -= cash_to_use
-                profile.bonus_balance -= bonus_to_use
-                profile.save()
+            try:
+                with transaction.atomic():
+                    profile = lock_balances(request.user.id)
+                    if profile.wallet_balance + profile.bonus_balance < original_fee:
+                        messages.error(request, "Your wallet balance no longer covers this session. Please pay the rest online.")
+                        return redirect('checkout_payment', token=token)
+                    bonus_to_use = min(profile.bonus_balance, original_fee)
+                    cash_to_use = original_fee - bonus_to_use
+
+                    booking, _ = convert_hold(token, wallet_used=cash_to_use, bonus_used=bonus_to_use)
+                    if booking is None:
+                        messages.error(request, "This slot was released before payment. Please book again.")
+                        return redirect('counsellor_booking')
+
+                    spend(request.user.id, cash=cash_to_use, bonus=bonus_to_use)
                 
-                if cash_to_use > 0:
-                    WalletTransaction.objects.create(
-                        user=request.user,
-                        amount=cash_to_use,
-                        transaction_type='session_booking',
-                        description=f"Paid for session with {booking.counsellor.name}",
-                        reference_id=str(booking.id)
-                    )
-                if bonus_to_use > 0:
-                    WalletTransaction.objects.create(
-                        user=request.user,
-                        amount=bonus_to_use,
-                        transaction_type='session_booking',
-                        description=f"Bonus used for session with {booking.counsellor.name}",
-                        reference_id=str(booking.id)
-                    )
+                    if cash_to_use > 0:
+                        WalletTransaction.objects.create(
+                            user=request.user,
+                            amount=cash_to_use,
+                            transaction_type='session_booking',
+                            description=f"Paid for session with {booking.counsellor.name}",
+                            reference_id=str(booking.id)
+                        )
+                    if bonus_to_use > 0:
+                        WalletTransaction.objects.create(
+                            user=request.user,
+                            amount=bonus_to_use,
+                            transaction_type='session_booking',
+                            bucket='bonus',
+                            description=f"Bonus used for session with {booking.counsellor.name}",
+                            reference_id=str(booking.id)
+                        )
 
-                booking.is_paid = True
-                booking.status = 'confirmed'
-                booking.wallet_used = cash_to_use
-                booking.bonus_used = bonus_to_use
-                booking.save(update_fields=['is_paid', 'status', 'wallet_used', 'bonus_used'])
-                
-                _notify_counsellor(
-                    booking.counsellor,
-                    'booking_created',
-                    'New appointment booked (Paid via Wallet)',
-                    f'{_booking_patient_name(booking)} booked {booking.date} at {booking.time_slot.strftime("%H:%M")}.',
-                    booking=booking,
-                    actor=request.user
-                )
+                    notify_counsellor(
+                        booking.counsellor,
+                        'booking_created',
+                        'New appointment booked (Paid via Wallet)',
+                        f'{_booking_patient_name(booking)} booked {booking.date} at {booking.time_slot.strftime("%H:%M")}.',
+                        booking=booking,
+                        actor=request.user
+                    )
                 
-                messages.success(request, f"Payment successful! You used ₹{original_fee} from your balances.")
-                if booking.is_instant:
-                    return redirect('instant_connect', booking_id=booking.id)
-                return redirect('my_bookings')
-        return redirect('checkout_payment', booking_id=booking_id)
+                    messages.success(request, f"Payment successful! You used ₹{original_fee} from your balances.")
+                    if booking.is_instant:
+                        return redirect('instant_connect', booking_id=booking.id)
+                    return redirect('my_bookings')
+            except InsufficientBonus:
+                messages.error(request, "Your bonus credits no longer cover this session. Please pay the rest online.")
+        return redirect('checkout_payment', token=token)
     
     amount_to_pay = original_fee
     wallet_used = decimal.Decimal('0.00')
@@ -1354,9 +1307,9 @@ def checkout_payment(request, booking_id):
             'amount': amount_paise,
             'currency': 'INR',
             'payment_capture': 1,
-            'receipt': f"booking_{booking.id}",
+            'receipt': f"hold_{booking.token.hex}",
             'notes': {
-                'booking_id': booking.id,
+                'hold': booking.token.hex,
                 'user_id': request.user.id,
                 'apply_wallet': '1' if apply_wallet else '0',
             },
@@ -1378,27 +1331,21 @@ def checkout_payment(request, booking_id):
         'amount_paise': amount_paise,
         'user_name': request.user.get_full_name() or request.user.username,
         'user_email': request.user.email,
-        'booking_timestamp': booking.created_at.timestamp(),
+        'booking_timestamp': booking.reserved_at.timestamp(),
     })
 
 
 @login_required
 @require_http_methods(['POST'])
-def razorpay_payment_verify(request, booking_id):
+def razorpay_payment_verify(request, token):
     """
     Called by our JS after Razorpay handler fires.
-    Verifies the payment signature and confirms the booking.
+    Verifies the payment signature and converts the slot hold into a confirmed booking.
     """
     import hmac
     import hashlib
     from django.conf import settings
 
-    booking = get_object_or_404(CounsellorBooking, pk=booking_id, user=request.user)
-
-    if booking.is_paid:
-        messages.info(request, "Payment already recorded.")
-        return redirect('my_bookings')
-
     razorpay_order_id   = request.POST.get('razorpay_order_id', '')
     razorpay_payment_id = request.POST.get('razorpay_payment_id', '')
     razorpay_signature  = request.POST.get('razorpay_signature', '')
@@ -1413,28 +1360,39 @@ def razorpay_payment_verify(request, booking_id):
 
     if not hmac.compare_digest(generated_signature, razorpay_signature):
         messages.error(request, "Payment verification failed. Please contact support.")
-        return redirect('checkout_payment', booking_id=booking_id)
+        return redirect('checkout_payment', token=token)
 
     # Signature valid — confirm booking
     apply_wallet = request.POST.get('apply_wallet', '0') == '1'
     
-    with transaction.atomic():
-        if apply_wallet:
-            profile, _ = UserProfile.objects.get_or_create(user=request.user)
-            bonus_balance = profile.bonus_balance
-            cash_balance = profile.wallet_balance
-            total_balance = bonus_balance + cash_balance
+    try:
+        with transaction.atomic():
+            hold = SlotHold.objects.filter(token=token, user=request.user).first()
+            wallet_fields = {}
+            if apply_wallet and hold is not None:
+                profile = lock_balances(request.user.id)
+                bonus_balance = profile.bonus_balance
+                cash_balance = profile.wallet_balance
+                total_balance = bonus_balance + cash_balance
+            
+                if total_balance > 0:
+                    amount_to_cover = min(total_balance, hold.total_fee)
+                    bonus_to_use = min(bonus_balance, amount_to_cover)
+                    cash_to_use = amount_to_cover - bonus_to_use
+                    wallet_fields = {'wallet_used': cash_to_use, 'bonus_used': bonus_to_use}
+
+            booking, created = convert_hold(token, razorpay_payment_id=razorpay_payment_id, **wallet_fields)
+            if booking is None:
+                # The hold lapsed and the slot went to someone else; the webhook credits the payment to the wallet.
+                messages.error(request, "Your slot was released before the payment completed. The amount paid will be credited to your MindMend wallet.")
+                return redirect('my_bookings')
+            if not created:
+                messages.info(request, "Payment already recorded.")
+                return redirect('my_bookings')
+
+            if wallet_fields:
+                spend(request.user.id, cash=cash_to_use, bonus=bonus_to_use)
             
-            if total_balance > 0:
-                amount_to_cover = min(total_balance, booking.total_fee)
-                bonus_to_use = min(bonus_balance, amount_to_cover)
-                cash_to_use = amount_to_cover - bonus_to_use
-                
-                deduct_bonus(request.user, bonus_to_use)
-                profile.bonus_balance -= bonus_to_use
-                profile.wallet_balance -= cash_to_use
-                profile.save()
-                
                 if cash_to_use > 0:
                     WalletTransaction.objects.create(
                         user=request.user,
@@ -1448,19 +1406,18 @@ def razorpay_payment_verify(request, booking_id):
                         user=request.user,
                         amount=bonus_to_use,
                         transaction_type='session_booking',
+                        bucket='bonus',
                         description=f"Bonus used for partial payment for session with {booking.counsellor.name}",
                         reference_id=str(booking.id)
                     )
-                    
-                booking.wallet_used = cash_to_use
-                booking.bonus_used = bonus_to_use
-
-        booking.is_paid = True
-        booking.status  = 'confirmed'
-        booking.razorpay_payment_id = razorpay_payment_id
-        booking.save(update_fields=['is_paid', 'status', 'razorpay_payment_id'])
+    except InsufficientBonus:
+        # Nothing was converted or spent; with the slot given back the webhook credits the payment to the wallet.
+        if hold is not None:
+            release_hold(hold)
+        messages.error(request, "We could not apply your bonus credits, so the booking was not made. The amount paid will be credited to your MindMend wallet.")
+        return redirect('my_bookings')
 
-    _notify_counsellor(
+    notify_counsellor(
         booking.counsellor,
         'booking_created',
         'New appointment booked',
@@ -1515,6 +1472,7 @@ def razorpay_webhook(request):
         order_entity = data.get('payload', {}).get('order', {}).get('entity', {})
         receipt = order_entity.get('receipt', '')
         
+        # booking_<id> receipts are orders placed against pending bookings, before slot holds.
         if receipt and receipt.startswith('booking_'):
             try:
                 booking_id = int(receipt.split('_')[1])
@@ -1526,7 +1484,7 @@ def razorpay_webhook(request):
                         booking.save(update_fields=['is_paid', 'status'])
                         
                         # Send notification if it wasn't already sent by browser view
-                        _notify_counsellor(
+                        notify_counsellor(
                             booking.counsellor,
                             'booking_created',
                             'Appointment Confirmed (via Webhook)',
@@ -1535,6 +1493,31 @@ def razorpay_webhook(request):
                         )
             except (ValueError, IndexError, CounsellorBooking.DoesNotExist):
                 pass
+        elif receipt.startswith('hold_'):
+            payment_entity = data.get('payload', {}).get('payment', {}).get('entity', {})
+            payment_id = payment_entity.get('id', '')
+            try:
+                token = uuid.UUID(receipt[len('hold_'):])
+            except ValueError:
+                return HttpResponse("Handled", status=200)
+            booking, created = convert_hold(token, razorpay_payment_id=payment_id)
+            if created:
+                notify_counsellor(
+                    booking.counsellor,
+                    'booking_created',
+                    'Appointment Confirmed (via Webhook)',
+                    f'Payment for booking on {booking.date} was confirmed via server notification.',
+                    booking=booking
+                )
+            elif booking is None and payment_id:
+                # Paid after the hold lapsed and another patient took the slot: credit the wallet instead.
+                user_id = order_entity.get('notes', {}).get('user_id')
+                amount = decimal.Decimal(order_entity.get('amount_paid', 0)) / 100
+                if user_id and amount > 0:
+                    credit_orphaned_payment(
+                        user_id, payment_id, amount,
+                        "Refund: the slot was released before your payment completed",
+                    )
 
     return HttpResponse("Handled", status=200)
 
@@ -1545,12 +1528,9 @@ def get_booked_slots(request, counsellor_id):
     """
     Returns the list of 30-minute blocked windows for a counsellor on a date.
     Query param: ?date=YYYY-MM-DD
-    Response: {"booked_slots": [{"start": "12:00", "end": "12:30"}, ...]}
+    Response: {"booked_slots": [{"start": "12:00", "end": "12:30"}, ...], "next_free": "12:30"}
     """
     from django.utils.dateparse import parse_date
-    from datetime import time
-
-    _cleanup_expired_pending_bookings()
 
     counsellor = get_object_or_404(Counsellor, pk=counsellor_id, is_active=True)
     date_str = request.GET.get('date', '')
@@ -1558,48 +1538,75 @@ def get_booked_slots(request, counsellor_id):
     if not booking_date:
         return JsonResponse({'error': 'Invalid or missing date parameter.'}, status=400)
 
-    SESSION_MINUTES = 30
-    session_delta = timedelta(minutes=SESSION_MINUTES)
+    availability = day_availability(counsellor, booking_date)
+    next_free = availability.next_free()
+    return JsonResponse({
+        'booked_slots': [
+            {'start': begin.strftime('%H:%M'), 'end': end.strftime('%H:%M')}
+            for begin, end in availability.slots(availability.blocked)
+        ],
+        'next_free': next_free.strftime('%H:%M') if next_free else None,
+    })
 
-    active_bookings = CounsellorBooking.objects.filter(
-        counsellor=counsellor,
-        date=booking_date,
-    ).exclude(status='cancelled').values_list('time_slot', flat=True)
-
-    booked_slots = []
-    for ts in active_bookings:
-        start_dt = datetime.combine(booking_date, ts)
-        end_dt = start_dt + session_delta
-        booked_slots.append({
-            'start': start_dt.strftime('%H:%M'),
-            'end': end_dt.strftime('%H:%M'),
-        })
 
-    # If the date is today, block past slots from being selected
-    now = timezone.localtime()
-    if booking_date == now.date():
-        current_time = now.time()
-        c_start_mins = counsellor.available_time_start.hour * 60 + counsellor.available_time_start.minute
-        c_end_mins = counsellor.available_time_end.hour * 60 + counsellor.available_time_end.minute
-        current_mins = current_time.hour * 60 + current_time.minute
-        
-        cur = c_start_mins
-        while cur + SESSION_MINUTES <= c_end_mins:
-            if cur < current_mins:
-                hr = cur // 60
-                mn = cur % 60
-                slot_time = time(hr, mn)
-                slot_start_str = slot_time.strftime('%H:%M')
-                if not any(s['start'] == slot_start_str for s in booked_slots):
-                    slot_end_time = (datetime.combine(booking_date, slot_time) + session_delta).time()
-                    booked_slots.append({
-                        'start': slot_start_str,
-                        'end': slot_end_time.strftime('%H:%M'),
-                    })
-            cur += SESSION_MINUTES
-
-    booked_slots.sort(key=lambda s: s['start'])
-    return JsonResponse({'booked_slots': booked_slots})
+MAX_AVAILABILITY_DAYS = 31
+MAX_AVAILABILITY_COUNSELLORS = 50
+
+
+@login_required
+@require_http_methods(['GET'])
+def get_availability(request):
+    """
+    Free slots for several counsellors over a date range in one response.
+    Query params: ?counsellors=1,2,3&start=YYYY-MM-DD&days=7 (counsellors defaults to all active)
+    Each day is a hex bitmap over the counsellor's slot grid: bit k set means the slot
+    starting first_slot + k * slot_minutes is free. Repeat requests with If-None-Match
+    get 304 while the calendars are unchanged.
+    """
+    import hashlib
+    from django.utils.dateparse import parse_date
+    from django.utils.http import quote_etag
+    from django.utils.cache import patch_cache_control
+
+    start = parse_date(request.GET.get('start', '')) or timezone.localdate()
+    try:
+        days = min(max(int(request.GET.get('days', 7)), 1), MAX_AVAILABILITY_DAYS)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid days parameter.'}, status=400)
+
+    counsellors = Counsellor.objects.filter(is_active=True).order_by('id')
+    ids = request.GET.get('counsellors', '')
+    if ids:
+        try:
+            counsellors = counsellors.filter(id__in=[int(i) for i in ids.split(',') if i.strip()])
+        except ValueError:
+            return JsonResponse({'error': 'Invalid counsellors parameter.'}, status=400)
+    counsellors = list(counsellors[:MAX_AVAILABILITY_COUNSELLORS])
+
+    calendars = range_availability(counsellors, start, days)
+    payload = {
+        'start': start.isoformat(),
+        'days': days,
+        'slot_minutes': SLOT_MINUTES,
+        'counsellors': [
+            {
+                'id': c.id,
+                'first_slot': c.available_time_start.strftime('%H:%M'),
+                'slots': calendars[c.id][0].n_slots,
+                'free': [format(day.free, 'x') for day in calendars[c.id]],
+            }
+            for c in counsellors
+        ],
+    }
+    body = json.dumps(payload, separators=(',', ':'))
+    etag = quote_etag(hashlib.sha1(body.encode('utf-8')).hexdigest())
+    if etag in [t.strip() for t in request.headers.get('If-None-Match', '').split(',')]:
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 def how_to_book(request):
@@ -1610,11 +1617,9 @@ def how_to_book(request):
 @login_required
 def counsellor_detail(request, counsellor_id):
     """View to show details of a specific counsellor."""
-    from django.db.models import Avg
+    from django.db.models import F
     counsellor = get_object_or_404(
-        Counsellor.objects.annotate(
-            avg_rating=Avg('counsellorbooking__counsellorreview__rating')
-        ),
+        Counsellor.objects.annotate(avg_rating=F('stats__avg_rating')),
         pk=counsellor_id,
         is_active=True
     )
@@ -1626,8 +1631,7 @@ def counsellor_detail(request, counsellor_id):
 
 @login_required
 def wallet_dashboard(request):
-    sync_bonus_balance(request.user)
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    profile = request.user.profile
     transactions = WalletTransaction.objects.filter(user=request.user).order_by('-created_at')
     from Mind_Mend.models import BonusCredit
     from django.utils import timezone
@@ -1713,9 +1717,7 @@ def add_money_verify(request):
     amount = decimal.Decimal(amount_str)
     
     with transaction.atomic():
-        profile, _ = UserProfile.objects.get_or_create(user=request.user)
-        profile.wallet_balance += amount
-        profile.save()
+        credit_cash(request.user.id, amount)
         
         WalletTransaction.objects.create(
             user=request.user,
@@ -1759,67 +1761,47 @@ def counsellor_earnings_dashboard(request):
         messages.success(request, 'Bank details updated successfully.')
         return redirect('counsellor_earnings_dashboard')
 
-    completed_bookings = CounsellorBooking.objects.filter(
-        counsellor=counsellor, 
-        status='completed'
-    ).order_by('-created_at')
-    
-    # 1. Financials — with fallback for old sessions where counsellor_earnings was never set
-    import datetime
-    def get_earnings(b):
-        if b.counsellor_earnings and b.counsellor_earnings > 0:
-            return b.counsellor_earnings
-        fee = getattr(b, 'total_fee', None) or (
-            b.counsellor.instant_session_fee if b.is_instant else b.counsellor.session_fee
-        )
-        return round((fee or 0) * decimal.Decimal('0.90'), 2)
-
-    # Backfill earnings on the fly and build template-safe dicts (no underscores)
+    # 1. Financials — running balances from the stats row; only the 24h hold window is summed here.
     now = timezone.now()
-    enriched_bookings = []
-    for b in completed_bookings:
-        earned = get_earnings(b)
-        # Save backfilled value to DB so future loads are correct
-        if (not b.counsellor_earnings or b.counsellor_earnings == 0) and earned > 0:
-            b.counsellor_earnings = earned
-            b.save(update_fields=['counsellor_earnings'])
-        # Determine payout hold status
-        completed_ts = b.completed_at or b.created_at
-        hours_since = (now - completed_ts).total_seconds() / 3600 if completed_ts else 999
-        on_hold = (not b.is_settled) and hours_since < 24
-        enriched_bookings.append({
+    stats = CounsellorStats.objects.filter(counsellor=counsellor).first() or CounsellorStats(counsellor=counsellor)
+    completed_bookings = CounsellorBooking.objects.filter(counsellor=counsellor, status='completed')
+    total_lifetime_earnings = stats.earnings
+    # Sessions still within the 24h dispute window
+    on_hold_amount = completed_bookings.filter(on_hold_q(now)).aggregate(
+        total=Sum('counsellor_earnings'))['total'] or decimal.Decimal('0.00')
+    pending_payout = stats.unsettled_earnings  # total unsettled
+    # Sessions past 24h window, not yet settled by admin
+    ready_for_payout = pending_payout - on_hold_amount
+
+    total_unpaid_penalties = stats.unsettled_penalties
+    total_deductions = total_unpaid_penalties + counsellor.outstanding_debt
+    net_pending_payout = max(decimal.Decimal('0.00'), pending_payout - total_deductions)
+    settled_payout = stats.settled_earnings
+
+    page_obj = Paginator(
+        completed_bookings.select_related('user').order_by('-created_at'), EARNINGS_PAGE_SIZE,
+    ).get_page(request.GET.get('page'))
+    hold_cutoff = now - PAYOUT_HOLD
+    enriched_bookings = [
+        {
             'booking': b,
-            'earned': earned,
-            'on_hold': on_hold,
+            'earned': b.counsellor_earnings,
+            'on_hold': not b.is_settled and (b.completed_at or b.created_at) > hold_cutoff,
             'is_settled': b.is_settled,
-            'is_anonymous': getattr(b, 'is_anonymous', False),
+            'is_anonymous': b.is_anonymous,
             'completed_at': b.completed_at,
             'created_at': b.created_at,
             'user': b.user,
             'is_disputed': b.is_disputed,
-        })
-
-    total_lifetime_earnings = sum(row['earned'] for row in enriched_bookings)
-    # Sessions still within the 24h dispute window
-    on_hold_amount = sum(row['earned'] for row in enriched_bookings if row['on_hold'])
-    # Sessions past 24h window, not yet settled by admin
-    ready_for_payout = sum(row['earned'] for row in enriched_bookings if not row['is_settled'] and not row['on_hold'])
-    pending_payout = on_hold_amount + ready_for_payout  # total unsettled
-
-    unsettled_cancellations = BookingCancellation.objects.filter(counsellor=counsellor).exclude(refund_status='Settled')
-    total_unpaid_penalties = sum(c.counsellor_penalty for c in unsettled_cancellations)
-    total_deductions = total_unpaid_penalties + counsellor.outstanding_debt
-    net_pending_payout = max(decimal.Decimal('0.00'), pending_payout - total_deductions)
-    settled_payout = total_lifetime_earnings - pending_payout
+        }
+        for b in page_obj.object_list
+    ]
 
     # 2. Performance Metrics
-    total_sessions = CounsellorBooking.objects.filter(counsellor=counsellor).exclude(status='pending').count()
-    completed_count = len(enriched_bookings)
+    total_sessions = stats.total_bookings - stats.pending_bookings
+    completed_count = stats.completed_sessions
     completion_rate = (completed_count / total_sessions * 100) if total_sessions > 0 else 0
-
-    from django.db.models import Avg
-    reviews = CounsellorReview.objects.filter(booking__counsellor=counsellor)
-    avg_rating = reviews.aggregate(Avg('rating'))['rating__avg'] or 0
+    avg_rating = stats.avg_rating or 0
 
     # Badge Logic
     badge = None
@@ -1838,6 +1820,7 @@ def counsellor_earnings_dashboard(request):
     return render(request, 'Mind_Mend/counsellor/earnings.html', {
         'counsellor': counsellor,
         'completed_bookings': enriched_bookings,
+        'page_obj': page_obj,
         'all_cancellations': all_cancellations,
         'total_lifetime_earnings': total_lifetime_earnings,
         'on_hold_amount': on_hold_amount,
@@ -1891,78 +1874,83 @@ def counsellor_payout_history(request):
         'settlements': settlements,
     })
 
+
+def _report_patients(counsellor):
+    """Users who booked this counsellor under their own name (anonymous bookings are excluded)."""
+    from django.contrib.auth.models import User
+    return User.objects.filter(
+        counsellorbooking__counsellor=counsellor,
+        counsellorbooking__is_anonymous=False,
+        counsellorbooking__status__in=('confirmed', 'completed'),
+    ).distinct().order_by('first_name', 'username')
+
+
+@login_required
+def counsellor_patient_reports(request):
+    """Queue progress reports for many patients at once; rendering happens in the report worker."""
+    counsellor = get_counsellor_for_user(request)
+    if not counsellor:
+        return redirect('home')
+
+    patients = list(_report_patients(counsellor))
+    if request.method == 'POST':
+        period = normalize_period(request.POST.get('period'))
+        selected = set(request.POST.getlist('patients'))
+        queued = 0
+        for patient in patients:
+            if str(patient.id) in selected:
+                request_report(patient, period, requested_by=request.user)
+                queued += 1
+        messages.success(request, f'Queued {queued} {period} report(s). They will appear below as they finish.')
+        return redirect('counsellor_patient_reports')
+
+    latest = {}
+    for report in ProgressReport.objects.filter(user__in=patients).order_by('-created_at'):
+        latest.setdefault(report.user_id, report)
+    for patient in patients:
+        patient.latest_report = latest.get(patient.id)
+    return render(request, 'Mind_Mend/counsellor/patient_reports.html', {
+        'counsellor': counsellor,
+        'patients': patients,
+    })
+
+
+@login_required
+def counsellor_download_patient_report(request, report_id):
+    counsellor = get_counsellor_for_user(request)
+    if not counsellor:
+        return redirect('home')
+    report = get_object_or_404(ProgressReport, id=report_id, status='ready', user__in=_report_patients(counsellor))
+    return FileResponse(report.file.open('rb'), as_attachment=True,
+                        filename=report.download_name(), content_type='application/pdf')
+
 from django.contrib.admin.views.decorators import staff_member_required
 
 @staff_member_required
 @require_http_methods(['GET'])
 def admin_revenue_dashboard(request):
     """Dashboard for platform owner to view and settle counsellor earnings."""
-    counsellors = Counsellor.objects.filter(is_active=True)
-    counsellor_data = []
-    
     current_time = timezone.now()
-    
-    for c in counsellors:
-        completed_bookings = CounsellorBooking.objects.filter(counsellor=c, status='completed')
-        
-        # 24 hour logic
-        cleared_for_payout = []
-        pending_verification = []
-        
-        for b in completed_bookings.filter(is_settled=False):
-            if b.is_disputed:
-                pending_verification.append(b)
-            else:
-                completion_time = b.completed_at or b.created_at
-                if completion_time and current_time >= completion_time + timedelta(hours=24):
-                    cleared_for_payout.append(b)
-                else:
-                    pending_verification.append(b)
-                
-        gross_payout = sum(b.counsellor_earnings for b in cleared_for_payout)
-        
-        unsettled_cancellations = BookingCancellation.objects.filter(counsellor=c).exclude(refund_status='Settled')
-        total_penalties = sum(canc.counsellor_penalty for canc in unsettled_cancellations)
-        total_deductions = total_penalties + c.outstanding_debt
-        
-        net_payout = max(decimal.Decimal('0.00'), gross_payout - total_deductions)
-        total_earnings = sum(b.counsellor_earnings for b in completed_bookings)
-        
-        counsellor_data.append({
-            'counsellor': c,
-            'cleared_payout': gross_payout,
-            'penalties': total_penalties,
-            'outstanding_debt': c.outstanding_debt,
-            'net_payout': net_payout,
-            'pending_verification_amount': sum(b.counsellor_earnings for b in pending_verification),
-            'total_earnings': total_earnings,
-            'cleared_count': len(cleared_for_payout),
-            'pending_count': len(pending_verification),
-            'bank_details': getattr(c, 'bank_details', None)
-        })
-        
-    counsellor_data.sort(key=lambda x: x['net_payout'], reverse=True)
-    
-    # Analytics
-    today = current_time.date()
-    today_revenue = sum((b.total_fee - b.counsellor_earnings) for b in CounsellorBooking.objects.filter(status='completed', completed_at__date=today))
-    month_revenue = sum((b.total_fee - b.counsellor_earnings) for b in CounsellorBooking.objects.filter(status='completed', completed_at__year=today.year, completed_at__month=today.month))
-    total_platform_revenue = sum((b.total_fee - b.counsellor_earnings) for b in CounsellorBooking.objects.filter(status='completed'))
-    
-    total_sessions = CounsellorBooking.objects.count()
-    total_cancellations = BookingCancellation.objects.count()
-    cancellation_rate = (total_cancellations / total_sessions * 100) if total_sessions > 0 else 0
-    
-    wallet_credits_issued = sum(tx.amount for tx in WalletTransaction.objects.filter(transaction_type__in=['compensation', 'refund']))
-        
     return render(request, 'Mind_Mend/admin/revenue_dashboard.html', {
-        'counsellor_data': counsellor_data,
-        'today_revenue': today_revenue,
-        'month_revenue': month_revenue,
-        'total_platform_revenue': total_platform_revenue,
-        'total_sessions': total_sessions,
-        'cancellation_rate': cancellation_rate,
-        'wallet_credits_issued': wallet_credits_issued,
+        'counsellor_data': payout_rows(current_time),
+        **platform_summary(current_time),
+        'recent_runs': SettlementRun.objects.select_related('started_by')[:5],
+        'settle_key': uuid.uuid4().hex,
+    })
+
+@staff_member_required
+@require_http_methods(['GET'])
+def admin_revenue_timeseries(request):
+    """Daily, weekly or monthly financial series from the rollups (?start=&end=&period=)."""
+    try:
+        start, end, period = parse_range(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'period': period,
+        'series': series(start, end, period),
     })
 
 @staff_member_required
@@ -2021,26 +2009,15 @@ def admin_resolve_dispute(request, dispute_id):
             bonus_used = booking.bonus_used
             razorpay_amount = booking.total_fee - (wallet_used + bonus_used)
             
-            if razorpay_amount > 0 and booking.razorpay_payment_id:
-                try:
-                    import razorpay
-                    from django.conf import settings
-                    client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
-                    client.refund.create({'payment_id': booking.razorpay_payment_id, 'amount': int(razorpay_amount * 100)})
-                except Exception as e:
-                    print(f"Razorpay Refund Error: {e}")
+            enqueue_refund(booking, razorpay_amount, 'dispute')
                     
-            patient_profile, _ = UserProfile.objects.get_or_create(user=booking.user)
-            if bonus_used > 0:
-                add_bonus_credit(booking.user, bonus_used)
-            patient_profile.wallet_balance += wallet_used
-            patient_profile.bonus_balance += bonus_used
-            patient_profile.save()
+            credit_cash(booking.user_id, wallet_used)
+            grant_bonus(booking.user_id, bonus_used)
             
             if wallet_used > 0:
                 WalletTransaction.objects.create(user=booking.user, amount=wallet_used, transaction_type='refund', description=f"Refund (Cash) for Dispute", reference_id=str(booking.id))
             if bonus_used > 0:
-                WalletTransaction.objects.create(user=booking.user, amount=bonus_used, transaction_type='refund', description=f"Refund (Bonus) for Dispute", reference_id=str(booking.id))
+                WalletTransaction.objects.create(user=booking.user, amount=bonus_used, transaction_type='refund', bucket='bonus', description=f"Refund (Bonus) for Dispute", reference_id=str(booking.id))
                 
             booking.status = 'cancelled'
             booking.cancelled_by = 'system'
@@ -2060,69 +2037,54 @@ def admin_resolve_dispute(request, dispute_id):
         
     return redirect('admin_disputes')
 
+def _settlement_key(request):
+    """Idempotency key posted by the dashboard form, so a double submit settles only once."""
+    return (request.POST.get('idempotency_key') or '').strip()[:64] or uuid.uuid4().hex
+
+
+def _settlement_message(run):
+    return (
+        f"{run.bookings_settled} sessions in {run.duration_ms} ms "
+        f"({run.bookings_per_second:.0f} sessions/s)"
+    )
+
+
 @staff_member_required
 @require_http_methods(['POST'])
 def admin_mark_settled(request, counsellor_id):
     """Mark all pending bookings for a counsellor as settled, and deduct penalties."""
     counsellor = get_object_or_404(Counsellor, id=counsellor_id)
-    current_time = timezone.now()
-    
-    with transaction.atomic():
-        pending_bookings = CounsellorBooking.objects.filter(
-            counsellor=counsellor, 
-            status='completed', 
-            is_settled=False
-        )
-        
-        # Identify bookings to settle
-        settle_bookings = []
-        for b in pending_bookings:
-            completion_time = b.completed_at or b.created_at
-            if not b.is_disputed and completion_time and current_time >= completion_time + timedelta(hours=24):
-                settle_bookings.append(b)
-                
-        total_settled = sum(b.counsellor_earnings for b in settle_bookings)
-        count = len(settle_bookings)
-                
-        # Identify penalties to settle
-        unsettled_cancellations = BookingCancellation.objects.filter(counsellor=counsellor).exclude(refund_status='Settled')
-        total_penalties = sum(c.counsellor_penalty for c in unsettled_cancellations)
-        
-        gross_earnings = total_settled
-        total_deductions = total_penalties + counsellor.outstanding_debt
-        
-        if gross_earnings >= total_deductions:
-            net_settled = gross_earnings - total_deductions
-            new_outstanding_debt = decimal.Decimal('0.00')
-        else:
-            net_settled = decimal.Decimal('0.00')
-            new_outstanding_debt = total_deductions - gross_earnings
-            
-        # Only create settlement if there's actually something being settled (earnings or penalties)
-        if count > 0 or total_penalties > 0:
-            settlement = PayoutSettlement.objects.create(
-                counsellor=counsellor,
-                settled_by=request.user,
-                gross_amount=gross_earnings,
-                total_deductions=total_deductions,
-                net_amount_paid=net_settled
-            )
-            
-            # Link bookings
-            for b in settle_bookings:
-                b.is_settled = True
-                b.payout_settlement = settlement
-                b.save(update_fields=['is_settled', 'payout_settlement'])
-                
-            # Link cancellations
-            unsettled_cancellations.update(refund_status='Settled', payout_settlement=settlement)
-            
-            counsellor.outstanding_debt = new_outstanding_debt
-            counsellor.save(update_fields=['outstanding_debt'])
-        
-    messages.success(request, f"Successfully settled ₹{net_settled} ({count} sessions, {total_penalties} penalties) for {counsellor.name}. Outstanding debt: ₹{counsellor.outstanding_debt}.")
+    run, created = run_settlement(_settlement_key(request), request.user, counsellor_ids=[counsellor.id])
+    if not created:
+        messages.info(request, f"Settlement run #{run.id} was already processed; nothing was settled twice.")
+        return redirect('admin_revenue_dashboard')
+
+    counsellor.refresh_from_db(fields=['outstanding_debt'])
+    messages.success(request, f"Successfully settled ₹{run.net_amount_paid} ({run.bookings_settled} sessions, ₹{run.total_deductions} deductions) for {counsellor.name}. Outstanding debt: ₹{counsellor.outstanding_debt}.")
     return redirect('admin_revenue_dashboard')
 
+
+@staff_member_required
+@require_http_methods(['POST'])
+def admin_settle_all(request):
+    """Settle every counsellor's cleared earnings and penalties in one run."""
+    run, created = run_settlement(_settlement_key(request), request.user)
+    if not created:
+        messages.info(request, f"Settlement run #{run.id} was already processed; nothing was settled twice.")
+    else:
+        messages.success(request, f"Settlement run #{run.id}: ₹{run.net_amount_paid} to {run.counsellors_settled} counsellors, {_settlement_message(run)}.")
+    return redirect('admin_revenue_dashboard')
+
+
+@staff_member_required
+@require_http_methods(['GET'])
+def admin_settlement_batch(request, run_id):
+    """NEFT/UPI bank batch file for one settlement run, streamed as CSV."""
+    run = get_object_or_404(SettlementRun, id=run_id)
+    response = StreamingHttpResponse(bank_batch_rows(run), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="mindmend-payouts-run-{run.id}-{run.created_at:%Y%m%d}.csv"'
+    return response
+
 @login_required
 def patient_cancel_booking(request, booking_id):
     booking = get_object_or_404(CounsellorBooking, id=booking_id, user=request.user)
@@ -2185,19 +2147,11 @@ def patient_cancel_booking(request, booking_id):
             if razorpay_refund_pool > 0 and booking.razorpay_payment_id:
                 platform_fee = round(razorpay_refund_pool * decimal.Decimal('0.05'), 2)
                 actual_razorpay_refund = razorpay_refund_pool - platform_fee
-                if actual_razorpay_refund > 0:
-                    try:
-                        import razorpay
-                        from django.conf import settings
-                        client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
-                        client.refund.create({'payment_id': booking.razorpay_payment_id, 'amount': int(actual_razorpay_refund * 100)})
-                    except Exception as e:
-                        print(f"Razorpay Refund Error: {e}")
+                enqueue_refund(booking, actual_razorpay_refund, 'patient-cancel')
                         
             if wallet_refund > 0 or bonus_refund > 0:
-                patient_profile, _ = UserProfile.objects.get_or_create(user=booking.user)
                 if wallet_refund > 0:
-                    patient_profile.wallet_balance += wallet_refund
+                    credit_cash(booking.user_id, wallet_refund)
                     WalletTransaction.objects.create(
                         user=booking.user,
                         amount=wallet_refund,
@@ -2206,16 +2160,15 @@ def patient_cancel_booking(request, booking_id):
                         reference_id=str(booking.id)
                     )
                 if bonus_refund > 0:
-                    add_bonus_credit(booking.user, bonus_refund)
-                    patient_profile.bonus_balance += bonus_refund
+                    grant_bonus(booking.user_id, bonus_refund)
                     WalletTransaction.objects.create(
                         user=booking.user,
                         amount=bonus_refund,
                         transaction_type='refund',
+                        bucket='bonus',
                         description=f"Refund (Bonus) for cancelled session with {booking.counsellor.name}",
                         reference_id=str(booking.id)
                     )
-                patient_profile.save()
                 
             BookingCancellation.objects.create(
                 booking=booking,
@@ -2282,28 +2235,17 @@ def report_counsellor_no_show(request, booking_id):
         bonus_used = booking.bonus_used
         razorpay_amount = booking.total_fee - (wallet_used + bonus_used)
         
-        if razorpay_amount > 0 and booking.razorpay_payment_id:
-            try:
-                import razorpay
-                from django.conf import settings
-                client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
-                client.refund.create({'payment_id': booking.razorpay_payment_id, 'amount': int(razorpay_amount * 100)})
-            except Exception as e:
-                print(f"Razorpay Refund Error: {e}")
+        enqueue_refund(booking, razorpay_amount, 'no-show')
                 
-        patient_profile, _ = UserProfile.objects.get_or_create(user=booking.user)
-        if (bonus_used + compensation) > 0:
-            add_bonus_credit(booking.user, bonus_used + compensation)
-        patient_profile.wallet_balance += wallet_used
-        patient_profile.bonus_balance += (bonus_used + compensation)
-        patient_profile.save()
+        credit_cash(booking.user_id, wallet_used)
+        grant_bonus(booking.user_id, bonus_used + compensation)
         
         if wallet_used > 0:
             WalletTransaction.objects.create(user=booking.user, amount=wallet_used, transaction_type='refund', description=f"Refund (Cash) for No-Show", reference_id=str(booking.id))
         if bonus_used > 0:
-            WalletTransaction.objects.create(user=booking.user, amount=bonus_used, transaction_type='refund', description=f"Refund (Bonus) for No-Show", reference_id=str(booking.id))
+            WalletTransaction.objects.create(user=booking.user, amount=bonus_used, transaction_type='refund', bucket='bonus', description=f"Refund (Bonus) for No-Show", reference_id=str(booking.id))
             
-        WalletTransaction.objects.create(user=booking.user, amount=compensation, transaction_type='compensation', description=f"Compensation for Counsellor No-Show", reference_id=str(booking.id))
+        WalletTransaction.objects.create(user=booking.user, amount=compensation, transaction_type='compensation', bucket='bonus', description=f"Compensation for Counsellor No-Show", reference_id=str(booking.id))
         
         BookingCancellation.objects.create(
             booking=booking, counsellor=booking.counsellor, reason='Counsellor No-Show',
@@ -0,0 +1,178 @@
+"""
+MindMend wallet and bonus balances.
+UserProfile.wallet_balance and bonus_balance are maintained in place: every grant, refund
+and spend moves them with an F() update in the same transaction as its ledger rows
+(WalletTransaction for cash, BonusCredit for bonus), so reading a balance is a plain profile
+read. Bonus is spent first-expiring-first with one locked UPDATE over the credits. Credits
+that reach their expiry are swept in bulk by the booking lifecycle job; a spend sweeps the
+spender's own lapsed credits first so it never draws on them.
+check_balances() compares the maintained balances against the ledgers.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import BonusCredit, UserProfile, WalletTransaction
+
+BONUS_VALIDITY = timedelta(days=90)
+EXPIRY_BATCH_SIZE = 500
+EXPIRED_DESCRIPTION = 'Bonus credits expired after 90 days'
+# Transaction types that add to a balance; every other type takes from it.
+CREDIT_TYPES = ('add_money', 'refund', 'compensation')
+
+_MONEY = DecimalField(max_digits=10, decimal_places=2)
+_ZERO = Value(Decimal('0.00'))
+
+
+class InsufficientBonus(Exception):
+    """The user's unexpired credits do not cover a bonus spend (bonus_balance is out of step with them)."""
+
+
+def _per_user(totals):
+    return Case(*[When(user_id=user_id, then=Value(total)) for user_id, total in totals.items()], output_field=_MONEY)
+
+
+def credit_cash(user_id, amount):
+    """Add refunded or deposited cash to the user's wallet balance."""
+    if amount > 0:
+        UserProfile.objects.filter(user_id=user_id).update(wallet_balance=F('wallet_balance') + amount)
+
+
+def grant_bonus(user_id, amount, now=None):
+    """Record a bonus credit expiring BONUS_VALIDITY from now and add it to the bonus balance."""
+    if amount <= 0:
+        return None
+    now = now or timezone.now()
+    credit = BonusCredit.objects.create(
+        user_id=user_id, initial_amount=amount, remaining_amount=amount, expires_at=now + BONUS_VALIDITY,
+    )
+    UserProfile.objects.filter(user_id=user_id).update(bonus_balance=F('bonus_balance') + amount)
+    return credit
+
+
+def _expire(lapsed):
+    """Zero the given lapsed credits, log one 'expired' transaction each and lower the balances.
+    Callers hold the owners' profile locks."""
+    rows = list(lapsed.select_for_update().order_by('id').values_list('id', 'user_id', 'remaining_amount'))
+    if not rows:
+        return 0
+    BonusCredit.objects.filter(pk__in=[credit_id for credit_id, _, _ in rows]).update(remaining_amount=0)
+    WalletTransaction.objects.bulk_create([
+        WalletTransaction(user_id=user_id, amount=amount, transaction_type='expired', bucket='bonus',
+                          description=EXPIRED_DESCRIPTION)
+        for _, user_id, amount in rows
+    ])
+    totals = defaultdict(Decimal)
+    for _, user_id, amount in rows:
+        totals[user_id] += amount
+    UserProfile.objects.filter(user_id__in=totals).update(bonus_balance=F('bonus_balance') - _per_user(totals))
+    return len(rows)
+
+
+def _lapsed(now):
+    return BonusCredit.objects.filter(remaining_amount__gt=0, expires_at__lte=now)
+
+
+def expire_bonus_credits(now=None, batch_size=EXPIRY_BATCH_SIZE):
+    """Sweep every credit past its expiry, batch_size credits per transaction; returns how many expired."""
+    now = now or timezone.now()
+    expired = 0
+    while True:
+        with transaction.atomic():
+            user_ids = set(_lapsed(now).order_by('expires_at', 'id').values_list('user_id', flat=True)[:batch_size])
+            if not user_ids:
+                return expired
+            # Profiles before credits, the same order a spend takes its locks in.
+            list(UserProfile.objects.select_for_update().filter(user_id__in=user_ids).order_by('user_id').values_list('id'))
+            expired += _expire(_lapsed(now).filter(user_id__in=user_ids))
+
+
+def lock_balances(user_id, now=None):
+    """Lock and return the user's profile for a spend, after sweeping their lapsed bonus credits.
+    Must be called inside a transaction."""
+    profile, _ = UserProfile.objects.select_for_update().get_or_create(user_id=user_id)
+    if _expire(_lapsed(now or timezone.now()).filter(user_id=user_id)):
+        profile.refresh_from_db(fields=['wallet_balance', 'bonus_balance'])
+    return profile
+
+
+def deduct_bonus(user_id, amount, now=None):
+    """Take amount from the user's unexpired credits, earliest expiry first, as one locked, set-based
+    write: lock the credits in FIFO order, give each the part of amount left once the running total
+    of the credits before it is taken, and UPDATE them all in one statement. Returns whatever part of
+    amount the credits could not cover. Must be called inside a transaction."""
+    if amount <= 0:
+        return Decimal('0.00')
+    now = now or timezone.now()
+    credits = (
+        BonusCredit.objects.select_for_update()
+        .filter(user_id=user_id, remaining_amount__gt=0, expires_at__gt=now)
+        .order_by('expires_at', 'id').values_list('id', 'remaining_amount')
+    )
+    taken = {}
+    before = Decimal('0.00')
+    for credit_id, remaining in credits:
+        if before >= amount:
+            break
+        taken[credit_id] = min(remaining, amount - before)
+        before += remaining
+    if taken:
+        BonusCredit.objects.filter(pk__in=taken).update(remaining_amount=F('remaining_amount') - Case(
+            *[When(pk=credit_id, then=Value(share)) for credit_id, share in taken.items()], output_field=_MONEY,
+        ))
+    return amount - sum(taken.values(), Decimal('0.00'))
+
+
+def spend(user_id, cash=Decimal('0.00'), bonus=Decimal('0.00'), now=None):
+    """Take cash and bonus from the user's balances, drawing bonus from the credits expiring first.
+    Call after lock_balances() in the same transaction. Raises InsufficientBonus, leaving the
+    caller to roll back, when the credits cannot cover bonus."""
+    shortfall = deduct_bonus(user_id, bonus, now)
+    if shortfall > 0:
+        raise InsufficientBonus(f'bonus credits of user {user_id} are {shortfall} short of {bonus}')
+    if cash > 0 or bonus > 0:
+        UserProfile.objects.filter(user_id=user_id).update(
+            wallet_balance=F('wallet_balance') - cash, bonus_balance=F('bonus_balance') - bonus,
+        )
+
+
+def _cash_ledger():
+    signed = Case(When(transaction_type__in=CREDIT_TYPES, then=F('amount')), default=-F('amount'), output_field=_MONEY)
+    totals = (
+        WalletTransaction.objects.filter(user=OuterRef('user'), bucket='cash')
+        .values('user').annotate(total=Sum(signed)).values('total')
+    )
+    return Coalesce(Subquery(totals, output_field=_MONEY), _ZERO, output_field=_MONEY)
+
+
+def _bonus_ledger():
+    totals = (
+        BonusCredit.objects.filter(user=OuterRef('user'), remaining_amount__gt=0)
+        .values('user').annotate(total=Sum('remaining_amount')).values('total')
+    )
+    return Coalesce(Subquery(totals, output_field=_MONEY), _ZERO, output_field=_MONEY)
+
+
+def check_balances(user_ids=None):
+    """Profiles whose maintained balances disagree with the ledgers, as dicts with the stored and
+    ledger figures: cash against the signed sum of cash transactions, bonus against the credits'
+    remaining amounts."""
+    profiles = UserProfile.objects.annotate(ledger_cash=_cash_ledger(), ledger_bonus=_bonus_ledger()).exclude(
+        wallet_balance=F('ledger_cash'), bonus_balance=F('ledger_bonus'),
+    )
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=user_ids)
+    return list(profiles.order_by('user_id').values(
+        'user_id', 'wallet_balance', 'ledger_cash', 'bonus_balance', 'ledger_bonus',
+    ))
+
+
+def repair_bonus_balances(user_ids):
+    """Reset bonus_balance to the credits' remaining amounts for the given users; returns rows updated."""
+    with transaction.atomic():
+        return UserProfile.objects.filter(user_id__in=user_ids).update(bonus_balance=_bonus_ledger())
@@ -6,6 +6,12 @@ set -o errexit
 echo "Running database migrations..."
 python manage.py migrate
 
+# Start the background workers (lifecycle sweeps, report PDFs, survey polling,
+# instant-queue dispatch, outbox delivery of Razorpay refunds and emails).
+# Set MINDMEND_START_WORKERS=false when they run as a separate worker service.
+if [ "${MINDMEND_START_WORKERS:-true}" = "true" ]; then
+    bash run_workers.sh &
+fi
 
 # Start the gunicorn server
 echo "Starting Gunicorn server..."
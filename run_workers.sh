@@ -0,0 +1,20 @@
+#!/usr/bin/env bash
+# Background workers for the jobs the web process does not run per request
+# (see "Maintenance Commands" in the README).
+
+# Run one worker, restarting it whenever it exits: beside gunicorn nothing else would.
+run() {
+    while true; do
+        python manage.py "$@"
+        echo "Worker '$*' exited with status $?; restarting in 5 seconds."
+        sleep 5
+    done
+}
+
+echo "Starting background workers..."
+run run_booking_lifecycle --watch &
+run render_reports --watch &
+run poll_survey --watch &
+run dispatch_instant_queue --watch &
+run run_outbox --watch &
+wait
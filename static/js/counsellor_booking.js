@@ -217,6 +217,47 @@
     return days[new Date(y, m - 1, d).getDay()];
   }
 
+  // ── Batched availability: one request covers a counsellor's next 7 days ─
+  const AVAILABILITY_DAYS = 7;
+  const AVAILABILITY_TTL_MS = 60 * 1000;
+  const availabilityCache = {};  // counsellor id -> { fetchedAt, data }
+
+  function dayOffset(start, date) {
+    const [y1, m1, d1] = start.split('-').map(Number);
+    const [y2, m2, d2] = date.split('-').map(Number);
+    return Math.round((Date.UTC(y2, m2 - 1, d2) - Date.UTC(y1, m1 - 1, d1)) / 86400000);
+  }
+
+  function fetchAvailability(cId, date) {
+    const cached = availabilityCache[cId];
+    if (cached && Date.now() - cached.fetchedAt < AVAILABILITY_TTL_MS) {
+      const offset = dayOffset(cached.data.start, date);
+      if (offset >= 0 && offset < cached.data.days) return Promise.resolve(cached.data);
+    }
+    // The response carries an ETag, so the browser revalidates and unchanged calendars come back as 304.
+    return fetch(`/api/counsellors/availability/?counsellors=${cId}&start=${date}&days=${AVAILABILITY_DAYS}`, {
+      headers: { 'X-Requested-With': 'XMLHttpRequest' }
+    })
+    .then(r => r.json())
+    .then(data => {
+      availabilityCache[cId] = { fetchedAt: Date.now(), data: data };
+      return data;
+    });
+  }
+
+  function bookedStartsFor(data, cId, date) {
+    // Each day is a hex bitmap: bit k set = slot (first_slot + k * slot_minutes) is free.
+    const booked = new Set();
+    const entry = (data.counsellors || []).find(c => String(c.id) === String(cId));
+    if (!entry) return booked;
+    const free = parseInt(entry.free[dayOffset(data.start, date)] || '0', 16);
+    const first = timeToMinutes(entry.first_slot);
+    for (let k = 0; k < entry.slots; k++) {
+      if (Math.floor(free / Math.pow(2, k)) % 2 === 0) booked.add(minutesToHHMM(first + k * data.slot_minutes));
+    }
+    return booked;
+  }
+
   // ── Fetch booked slots & rebuild grid ──────────────────────────────────
   function refresh() {
     const cId   = counsellorSel ? counsellorSel.value : null;
@@ -247,12 +288,9 @@
 
     slotGrid.innerHTML = '<p class="text-sm text-gray-400 animate-pulse">Loading slots…</p>';
 
-    fetch(`/api/counsellor/${cId}/booked-slots/?date=${date}`, {
-      headers: { 'X-Requested-With': 'XMLHttpRequest' }
-    })
-    .then(r => r.json())
+    fetchAvailability(cId, date)
     .then(data => {
-      bookedStartTimes = new Set((data.booked_slots || []).map(s => s.start));
+      bookedStartTimes = bookedStartsFor(data, cId, date);
       const allSlots = generateSlots(cData.start, cData.end);
       renderSlots(allSlots);
 
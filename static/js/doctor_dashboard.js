@@ -55,6 +55,106 @@
         });
     }
 
+    function escapeHtml(value) {
+        return String(value || '')
+            .replace(/&/g, '&amp;')
+            .replace(/</g, '&lt;')
+            .replace(/>/g, '&gt;')
+            .replace(/"/g, '&quot;')
+            .replace(/'/g, '&#39;');
+    }
+
+    var historyEl = document.getElementById('completedBookings');
+    var loadMoreBtn = document.getElementById('loadMoreHistoryBtn');
+    var pillClass = 'inline-block mt-3 px-3 py-1 text-xs rounded-full font-medium ';
+
+    function renderHistoryCard(b) {
+        var when = new Date(b.date + 'T00:00:00').toLocaleDateString(undefined, {
+            weekday: 'long', month: 'short', day: '2-digit', year: 'numeric'
+        });
+        var mode = b.include_chat && b.include_video ? '💬 Chat + 📹 Video' : (b.include_video ? '📹 Video' : '💬 Chat');
+        var html = '<div class="flex flex-wrap justify-between items-center gap-4"><div>' +
+            '<div class="flex flex-wrap items-center gap-2"><p class="text-white font-bold text-lg">' + escapeHtml(b.patient_name) + '</p>' +
+            (b.is_anonymous ? '<span class="px-2 py-1 rounded-full bg-white/5 border border-white/10 text-[10px] font-bold uppercase tracking-widest text-gray-400">Anonymous</span>' : '') +
+            '</div><p class="text-gray-400 text-sm">' + escapeHtml(when) + ' at ' + escapeHtml(b.time_slot) + '</p>' +
+            '<span class="' + pillClass + 'bg-gray-500/10 text-gray-300">Completed</span>' +
+            (b.is_instant ? ' <span class="' + pillClass + 'bg-purple-500/10 text-purple-300 border border-purple-500/20">⚡ Instant</span>' : '') +
+            ' <span class="' + pillClass + 'bg-white/5 text-gray-300 border border-white/10">' + mode + '</span>';
+        if (b.review) {
+            html += '<div class="mt-3 bg-white/5 p-3 rounded-xl border border-white/10">' +
+                '<p class="text-amber-400 font-medium">Feedback: ★ ' + escapeHtml(b.review.rating) + '/5</p>' +
+                (b.review.review_text ? '<p class="text-gray-400 text-sm mt-1">' + escapeHtml(b.review.review_text) + '</p>' : '') +
+                '</div>';
+        }
+        html += '</div><div class="flex flex-wrap gap-3">';
+        if (b.chat_url) {
+            html += '<a href="' + escapeHtml(b.chat_url) + '" class="relative inline-flex items-center gap-2 px-4 py-2 rounded-xl bg-[#00d1b2]/10 border border-[#00d1b2]/20 text-[#00d1b2] font-bold hover:bg-[#00d1b2] hover:text-black transition active:scale-95">Open Chat' +
+                (b.session_message_count > 0 ? ' <span class="inline-flex items-center justify-center h-5 min-w-[20px] px-1.5 rounded-full bg-[#00d1b2] text-[#04111d] text-[10px] font-black leading-none shadow-md shadow-[#00d1b2]/30">' + b.session_message_count + '</span>' : '') +
+                '</a>';
+        }
+        if (b.video_url) {
+            html += '<a href="' + escapeHtml(b.video_url) + '" class="px-4 py-2 rounded-xl bg-purple-500/10 border border-purple-500/20 text-purple-300 font-bold hover:bg-purple-500 hover:text-white transition active:scale-95">Join Call</a>';
+        }
+        html += '</div></div>';
+        var card = document.createElement('div');
+        card.className = 'bg-[#0a1428]/40 border border-white/10 p-6 rounded-3xl backdrop-blur-xl transition-all duration-300 hover:-translate-y-1 hover:shadow-2xl hover:shadow-[#00d1b2]/5 hover:border-white/30 group';
+        card.innerHTML = html;
+        return card;
+    }
+
+    function renderUpcomingCard(b) {
+        var when = new Date(b.date + 'T00:00:00').toLocaleDateString(undefined, {
+            weekday: 'long', month: 'short', day: '2-digit', year: 'numeric'
+        });
+        var mode = b.include_chat && b.include_video ? '💬 Chat + 📹 Video' : (b.include_video ? '📹 Video' : '💬 Chat');
+        var statusClass = b.status === 'confirmed' ? 'bg-green-500/10 text-green-400' : 'bg-yellow-500/10 text-yellow-400';
+        var pill = 'px-3 py-1 text-xs rounded-full font-medium ';
+        var html = '<div class="flex flex-wrap justify-between items-center gap-4"><div>' +
+            '<div class="flex flex-wrap items-center gap-2 mb-1"><p class="text-white font-bold text-base">' + escapeHtml(b.patient_name) + '</p>' +
+            (b.is_anonymous ? '<span class="px-2 py-0.5 rounded-full bg-white/5 border border-white/10 text-[10px] font-bold uppercase tracking-widest text-gray-400">Anonymous</span>' : '') +
+            '</div><p class="text-gray-400 text-sm">' + escapeHtml(when) + ' at ' + escapeHtml(b.time_slot) + '</p>' +
+            '<div class="flex flex-wrap gap-2 mt-2">' +
+            '<span class="' + pill + statusClass + '">' + escapeHtml(b.status.charAt(0).toUpperCase() + b.status.slice(1)) + '</span>' +
+            (b.is_instant ? '<span class="' + pill + 'bg-purple-500/10 text-purple-300 border border-purple-500/20">⚡ Instant</span>' : '') +
+            '<span class="' + pill + 'bg-white/5 text-gray-300 border border-white/10">' + mode + '</span>' +
+            '</div></div><div class="flex items-center gap-2 text-xs text-gray-500">Scheduled</div></div>';
+        var card = document.createElement('div');
+        card.className = 'bg-[#0a1428]/40 border border-white/10 p-5 rounded-2xl backdrop-blur-xl transition-all duration-300 hover:-translate-y-1 hover:shadow-xl hover:shadow-yellow-500/5 hover:border-white/30';
+        card.innerHTML = html;
+        return card;
+    }
+
+    // "Load more" buttons page through a list with ?page= and insert the new cards above the button.
+    function pageInto(listEl, button, url, render) {
+        if (!listEl || !button || !url) return;
+        button.addEventListener('click', function(e) {
+            e.preventDefault();
+            var page = button.getAttribute('data-next-page');
+            button.disabled = true;
+            fetch(url + '?page=' + encodeURIComponent(page), {
+                headers: { 'Accept': 'application/json' }
+            }).then(function(r) {
+                return r.json();
+            }).then(function(data) {
+                (data.results || []).forEach(function(b) {
+                    listEl.insertBefore(render(b), button);
+                });
+                if (data.has_next) {
+                    button.setAttribute('data-next-page', String(data.page + 1));
+                    button.disabled = false;
+                } else {
+                    button.remove();
+                }
+            }).catch(function() {
+                button.disabled = false;
+            });
+        });
+    }
+
+    pageInto(historyEl, loadMoreBtn, config.historyApiUrl, renderHistoryCard);
+    pageInto(document.getElementById('upcomingBookings'), document.getElementById('loadMoreUpcomingBtn'),
+        config.upcomingApiUrl, renderUpcomingCard);
+
     var protocol = window.location.protocol === 'https:' ? 'wss://' : 'ws://';
     var socket = new WebSocket(protocol + window.location.host + '/ws/doctor/notifications/');
 
@@ -66,10 +166,17 @@
                 // Only show booking-level events in the notifications panel.
                 // Chat message events (chat_started, message_received) are excluded
                 // because their counts appear on the "Open Chat" button instead.
-                if (evType === 'booking_created' || evType === 'booking_status') {
+                if (evType === 'booking_created' || evType === 'booking_status' || evType === 'instant_assigned') {
                     prependNotification(data.notification);
                 }
             }
         } catch (err) {}
     };
+
+    // Keeps this counsellor marked online for the instant-session dispatcher.
+    setInterval(function() {
+        if (socket.readyState === WebSocket.OPEN) {
+            socket.send(JSON.stringify({ type: 'heartbeat' }));
+        }
+    }, 30000);
 })();
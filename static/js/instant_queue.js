@@ -0,0 +1,29 @@
+// Instant queue page: polls the queue status and moves on to checkout once matched.
+(function () {
+  const config = window.INSTANT_QUEUE_CONFIG || {};
+  const waiting = document.getElementById('queueWaiting');
+  const ended = document.getElementById('queueEnded');
+  const position = document.getElementById('queuePosition');
+  if (!config.statusUrl || !waiting || waiting.classList.contains('hidden')) return;
+
+  function poll() {
+    fetch(config.statusUrl, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+      .then(r => r.json())
+      .then(data => {
+        if (data.checkout_url) {
+          window.location.href = data.checkout_url;
+          return;
+        }
+        if (data.status === 'waiting') {
+          if (position && data.position) position.textContent = data.position;
+          setTimeout(poll, 5000);
+          return;
+        }
+        waiting.classList.add('hidden');
+        ended.classList.remove('hidden');
+      })
+      .catch(() => setTimeout(poll, 10000));
+  }
+
+  setTimeout(poll, 5000);
+})();